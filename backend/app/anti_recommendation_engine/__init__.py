@@ -1,3 +1,6 @@
 from .anti_recommendation_engine import (
     AntiRecommendationEngine as AntiRecommendationEngine,
 )
+from .session_engine_registry import (
+    SessionEngineRegistry as SessionEngineRegistry,
+)
@@ -1,10 +1,10 @@
+from collections.abc import AsyncIterator, Collection
+
 from app.anti_recommenders import AntiRecommender
-from app.anti_recommenders.arkg.arkg_anti_recommender import ArkgAntiRecommender
-from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
-from app.models import Record, Settings
+from app.models import Record
 from app.models.anti_recommendations_selector import AntiRecommendationsSelector
-from app.models.types import AntiRecommenderType, RecordKey
-from app.readers import AllSourceReader
+from app.models.types import RecordKey
+from app.record_catalog import RecordCatalog
 from app.user import User
 
 
@@ -15,92 +15,182 @@ class AntiRecommendationEngine:
     An AntiRecommendationEngine reaches out to an AntiRecommender to retrieve anti-recommendations of a record_key.
 
     An AntiRecommendationEngine consists of:
-        - __anti_recommender: An AntiRecommender for the AntiRecommedationEngine.
+        - __anti_recommender: An AntiRecommender, that is shared by every AntiRecommendationEngine in a process.
         - __current_anti_recommendation_records: A list of Records that are currently used for anti-recommendations.
-        - __records_by_key: A dictionary of type RecordKey: Record, that holds Records obtained from storage.
+        - __record_catalog: The current version of the read-only RecordCatalog, that is shared by every AntiRecommendationEngine in a process.
         - __stack: A stack that stores a list of Records that were previously used for anti-recommendations.
         - __user: The User of the current session.
 
+    An AntiRecommendationEngine awaits its AntiRecommender and User, so that it never blocks the event loop.
+    Each request reads the version of the RecordCatalog that was current when it started, even if a new version is swapped in meanwhile.
+
     An AntiRecommendationEngine also:
-        - Returns a tuple of Records that match the anti-recommendations of the last record a User saw, or the first key in __records_by_key.
-        - Returns a tuple of Records that match the anti-recommendations of a record_key.
+        - Returns a tuple of Records that match the anti-recommendations of the last record a User saw, or the first key in __record_catalog.
+        - Returns a tuple of Records that match the anti-recommendations of a record_key, optionally filtered by category.
+        - Yields Records that match the anti-recommendations of a record_key, as soon as each anti-recommendation is generated, optionally filtered by category.
         - Returns a tuple of Records that matched the previous anti-recommendations.
     """
 
-    def __init__(self, *, user: User, settings: Settings) -> None:
+    def __init__(
+        self,
+        *,
+        anti_recommender: AntiRecommender,
+        record_catalog: RecordCatalog,
+        user: User,
+    ) -> None:
+        self.__anti_recommender = anti_recommender
         self.__current_anti_recommendation_records: list[Record] = []
-        self.__records_by_key: dict[RecordKey, Record] = {
-            record.key: record for record in AllSourceReader(settings=settings).read()
-        }
+        self.__record_catalog = record_catalog
         self.__stack: list[list[Record]] = []
         self.__user = user
-        self.__anti_recommender: AntiRecommender = self.__select_anti_recommender(
-            settings=settings
-        )
 
-    def __select_anti_recommender(self, *, settings: Settings) -> AntiRecommender:
-        """
-        Select and return an AntiRecommender based on values stored in settings.
+    async def initial_records(self) -> tuple[Record, ...]:
+        """Return an initial tuple of Records."""
 
-        An ArkgAntiRecommender is the default AntiRecommender selection.
-        """
+        last_seen_anti_recommendation_key = (
+            await self.__user.aget_last_seen_anti_recommendation_key()
+        )
 
-        if (
-            settings.anti_recommender_type == AntiRecommenderType.OPEN_AI
-            and settings.openai_api_key
-        ):
-            return NormalOpenaiAntiRecommender()
+        if last_seen_anti_recommendation_key:
+            return await self.next_records(record_key=last_seen_anti_recommendation_key)
 
-        return ArkgAntiRecommender(
-            file_path=settings.arkg_file_path,
-            mime_type=settings.arkg_mime_type,
-            record_keys=tuple(sorted(self.__records_by_key.keys())),
-            user=self.__user,
+        return await self.next_records(
+            record_key=self.__record_catalog.first_record_key
         )
 
-    def initial_records(self) -> tuple[Record, ...]:
-        """Return an initial tuple of Records."""
+    def replace_record_catalog(self, *, record_catalog: RecordCatalog) -> None:
+        """Read record_catalog in the requests that start from now on."""
 
-        last_seen_anti_recommendation_key = (
-            self.__user.last_seen_anti_recommendation_key
-        )
+        self.__record_catalog = record_catalog
 
-        if last_seen_anti_recommendation_key:
-            return self.next_records(record_key=last_seen_anti_recommendation_key)
+    @staticmethod
+    def __filter_record_keys(
+        *,
+        record_catalog: RecordCatalog,
+        record_keys: Collection[RecordKey],
+        include_categories: Collection[str],
+        exclude_categories: Collection[str],
+    ) -> Collection[RecordKey]:
+        """Return the RecordKeys of record_keys that pass the category filters, or record_keys itself if there are no filters."""
+
+        if not include_categories and not exclude_categories:
+            return record_keys
 
-        return self.next_records(record_key=next(iter(self.__records_by_key.keys())))
+        return record_catalog.category_index.filter(
+            record_keys=record_keys,
+            include_categories=include_categories,
+            exclude_categories=exclude_categories,
+        )
 
-    def next_records(self, *, record_key: RecordKey) -> tuple[Record, ...]:
-        """Return a tuple of Records that have the same key as the anti-recommendations of record_key."""
+    async def next_records(
+        self,
+        *,
+        record_key: RecordKey,
+        include_categories: Collection[str] = (),
+        exclude_categories: Collection[str] = (),
+    ) -> tuple[Record, ...]:
+        """
+        Return a tuple of Records that have the same key as the anti-recommendations of record_key.
 
+        If include_categories is not empty, only Records that have at least one of them are returned.
+        Records that have any of exclude_categories are never returned.
+        """
+
+        record_catalog = self.__record_catalog
         records_of_anti_recommendations: list[Record] = []
 
         if self.__anti_recommender:
+            anti_recommendation_keys = [
+                anti_recommendation.key
+                for anti_recommendation in await self.__anti_recommender.agenerate_anti_recommendations(
+                    record_key=record_key, user=self.__user
+                )
+                if anti_recommendation.key in record_catalog
+            ]
+
             # Retrieve Records that have the same key as the generated AntiRecommendations.
             records_of_anti_recommendations = [
-                self.__records_by_key[anti_recommendation.key]
-                for anti_recommendation in self.__anti_recommender.generate_anti_recommendations(
-                    record_key=record_key
+                record_catalog[anti_recommendation_key]
+                for anti_recommendation_key in self.__filter_record_keys(
+                    record_catalog=record_catalog,
+                    record_keys=anti_recommendation_keys,
+                    include_categories=include_categories,
+                    exclude_categories=exclude_categories,
                 )
-                if anti_recommendation.key in self.__records_by_key
             ]
 
-        if records_of_anti_recommendations:
-            if self.__current_anti_recommendation_records:
-                self.__stack.append(self.__current_anti_recommendation_records)
+        await self.__replace_current_anti_recommendation_records(
+            record_catalog=record_catalog,
+            record_key=record_key,
+            records_of_anti_recommendations=records_of_anti_recommendations,
+        )
 
-            self.__current_anti_recommendation_records = [
-                self.__records_by_key[record_key],
-                *records_of_anti_recommendations,
-            ]
+        return tuple(records_of_anti_recommendations)
 
-            self.__user.add_anti_recommendation_to_history(
-                anti_recommendation_key=records_of_anti_recommendations[0].key
-            )
+    async def stream_next_records(
+        self,
+        *,
+        record_key: RecordKey,
+        include_categories: Collection[str] = (),
+        exclude_categories: Collection[str] = (),
+    ) -> AsyncIterator[Record]:
+        """
+        Yield Records that have the same key as the anti-recommendations of record_key, as soon as each anti-recommendation is generated.
 
-        return tuple(records_of_anti_recommendations)
+        Records are filtered by category as they are by next_records.
+        The previous and current Records are only updated once every Record has been yielded, as they are by next_records.
+        """
+
+        record_catalog = self.__record_catalog
+        records_of_anti_recommendations: list[Record] = []
+
+        async for (
+            anti_recommendation
+        ) in self.__anti_recommender.astream_anti_recommendations(
+            record_key=record_key, user=self.__user
+        ):
+            if anti_recommendation.key in record_catalog and self.__filter_record_keys(
+                record_catalog=record_catalog,
+                record_keys=(anti_recommendation.key,),
+                include_categories=include_categories,
+                exclude_categories=exclude_categories,
+            ):
+                record = record_catalog[anti_recommendation.key]
+                records_of_anti_recommendations.append(record)
+
+                yield record
+
+        await self.__replace_current_anti_recommendation_records(
+            record_catalog=record_catalog,
+            record_key=record_key,
+            records_of_anti_recommendations=records_of_anti_recommendations,
+        )
+
+    async def __replace_current_anti_recommendation_records(
+        self,
+        *,
+        record_catalog: RecordCatalog,
+        record_key: RecordKey,
+        records_of_anti_recommendations: list[Record],
+    ) -> None:
+        """Push the current Records onto __stack, and replace them with the Records of record_key's anti-recommendations, if there are any."""
+
+        if not records_of_anti_recommendations:
+            return
+
+        if self.__current_anti_recommendation_records:
+            self.__stack.append(self.__current_anti_recommendation_records)
+
+        self.__current_anti_recommendation_records = [
+            record_catalog[record_key],
+            *records_of_anti_recommendations,
+        ]
+
+        await self.__user.aadd_anti_recommendation_to_history(
+            anti_recommendation_key=records_of_anti_recommendations[0].key
+        )
 
-    def previous_records(self) -> tuple[Record, ...]:
+    async def previous_records(self) -> tuple[Record, ...]:
         """
         Return a tuple of Records that matched the previous anti-recommendations.
 
@@ -109,7 +199,7 @@ class AntiRecommendationEngine:
 
         if self.__stack:
             # Remove the last 2 anti-recommendations from a user's history.
-            self.__user.remove_anti_recommendations_from_history(
+            await self.__user.aremove_anti_recommendations_from_history(
                 selector=AntiRecommendationsSelector.LAST_TWO_RECORDS
             )
 
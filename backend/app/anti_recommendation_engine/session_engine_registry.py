@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.anti_recommendation_engine import AntiRecommendationEngine
+from app.anti_recommenders import AntiRecommender
+from app.models import Settings
+from app.models.types import UserId
+from app.record_catalog import RecordCatalog
+from app.user import User, UserService, UserServiceException
+
+
+class SessionEngineRegistry:
+    """
+    A registry of per-session AntiRecommendationEngines, keyed by User ID.
+
+    Each AntiRecommendationEngine only holds the navigation state of one User,
+    and shares the AntiRecommender and RecordCatalog of the registry.
+
+    A SessionEngineRegistry consists of:
+        - __engines: An ordered dictionary of type UserId: (last access time, AntiRecommendationEngine), ordered from least to most recently used.
+        - __idle_ttl: The number of seconds after which an idle AntiRecommendationEngine is evicted.
+        - __max_count: The maximum number of AntiRecommendationEngines. The least recently used engine is evicted when the registry is full.
+
+    The UserService is told when the session of an evicted User ends.
+
+    A new version of the RecordCatalog replaces the current one in the registry and in every registered AntiRecommendationEngine.
+    """
+
+    def __init__(
+        self,
+        *,
+        anti_recommender: AntiRecommender,
+        record_catalog: RecordCatalog,
+        user_service: UserService,
+        settings: Settings,
+    ) -> None:
+        self.__anti_recommender = anti_recommender
+        self.__record_catalog = record_catalog
+        self.__user_service = user_service
+        self.__idle_ttl = settings.session_engines_idle_ttl
+        self.__max_count = settings.session_engines_max_count
+
+        self.__engines: OrderedDict[UserId, tuple[float, AntiRecommendationEngine]] = (
+            OrderedDict()
+        )
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__engines)
+
+    def __register_engine(self, *, user: User) -> AntiRecommendationEngine:
+        """
+        Create a new AntiRecommendationEngine for a User, and register it as the User's most recently used engine.
+
+        Callers must hold __lock.
+        """
+
+        engine = AntiRecommendationEngine(
+            anti_recommender=self.__anti_recommender,
+            record_catalog=self.__record_catalog,
+            user=user,
+        )
+        self.__engines[user.id] = (time.monotonic(), engine)
+        self.__engines.move_to_end(user.id)
+
+        return engine
+
+    def __evict_engines(self) -> tuple[UserId, ...]:
+        """
+        Evict idle AntiRecommendationEngines, and the least recently used engines that do not fit in the registry.
+
+        Return the User IDs of evicted engines. Callers must hold __lock.
+        """
+
+        evicted_user_ids: list[UserId] = []
+        idle_time = time.monotonic() - self.__idle_ttl
+
+        while self.__engines:
+            user_id, (last_access_time, _) = next(iter(self.__engines.items()))
+
+            if len(self.__engines) <= self.__max_count and last_access_time > idle_time:
+                break
+
+            del self.__engines[user_id]
+            evicted_user_ids.append(user_id)
+
+        return tuple(evicted_user_ids)
+
+    def __end_user_sessions(self, *, user_ids: tuple[UserId, ...]) -> None:
+        """Tell the UserService that the sessions of user_ids have ended."""
+
+        for user_id in user_ids:
+            try:
+                self.__user_service.end_user_session(user_id=user_id)
+            except UserServiceException:
+                # The UserService keeps the User's state, and retries writing it later.
+                continue
+
+    async def __aend_user_sessions(self, *, user_ids: tuple[UserId, ...]) -> None:
+        """Tell the UserService that the sessions of user_ids have ended, without blocking the event loop."""
+
+        for user_id in user_ids:
+            try:
+                await self.__user_service.aend_user_session(user_id=user_id)
+            except UserServiceException:
+                continue
+
+    def __replace_engine(
+        self, *, user: User
+    ) -> tuple[AntiRecommendationEngine, tuple[UserId, ...]]:
+        """Register a new AntiRecommendationEngine for a User, and return it with the User IDs of evicted engines."""
+
+        with self.__lock:
+            engine = self.__register_engine(user=user)
+            return engine, self.__evict_engines()
+
+    def __touch_engine(
+        self, *, user_id: UserId
+    ) -> tuple[AntiRecommendationEngine, tuple[UserId, ...]]:
+        """Return the AntiRecommendationEngine of a User, creating one if needed, with the User IDs of evicted engines."""
+
+        with self.__lock:
+            if user_id in self.__engines:
+                _, engine = self.__engines[user_id]
+                self.__engines[user_id] = (time.monotonic(), engine)
+                self.__engines.move_to_end(user_id)
+            else:
+                engine = self.__register_engine(
+                    user=self.__user_service.create_user_from_id(user_id=user_id)
+                )
+
+            return engine, self.__evict_engines()
+
+    def create_engine(self, *, user: User) -> AntiRecommendationEngine:
+        """Return a new AntiRecommendationEngine for a User, replacing any engine the User already has."""
+
+        engine, evicted_user_ids = self.__replace_engine(user=user)
+        self.__end_user_sessions(user_ids=evicted_user_ids)
+
+        return engine
+
+    async def acreate_engine(self, *, user: User) -> AntiRecommendationEngine:
+        """Return a new AntiRecommendationEngine for a User without blocking the event loop, replacing any engine the User already has."""
+
+        engine, evicted_user_ids = self.__replace_engine(user=user)
+        await self.__aend_user_sessions(user_ids=evicted_user_ids)
+
+        return engine
+
+    def get_engine(self, *, user_id: UserId) -> AntiRecommendationEngine:
+        """Return the AntiRecommendationEngine of a User, and create one if the User does not have one yet."""
+
+        engine, evicted_user_ids = self.__touch_engine(user_id=user_id)
+        self.__end_user_sessions(user_ids=evicted_user_ids)
+
+        return engine
+
+    async def aget_engine(self, *, user_id: UserId) -> AntiRecommendationEngine:
+        """Return the AntiRecommendationEngine of a User without blocking the event loop, and create one if the User does not have one yet."""
+
+        engine, evicted_user_ids = self.__touch_engine(user_id=user_id)
+        await self.__aend_user_sessions(user_ids=evicted_user_ids)
+
+        return engine
+
+    def replace_record_catalog(self, *, record_catalog: RecordCatalog) -> None:
+        """Share record_catalog with every AntiRecommendationEngine, instead of the current RecordCatalog."""
+
+        with self.__lock:
+            self.__record_catalog = record_catalog
+
+            for _, engine in self.__engines.values():
+                engine.replace_record_catalog(record_catalog=record_catalog)
+
+    def close(self) -> None:
+        """Evict every AntiRecommendationEngine, and end the session of every User."""
+
+        with self.__lock:
+            evicted_user_ids = tuple(self.__engines.keys())
+            self.__engines.clear()
+
+        self.__end_user_sessions(user_ids=evicted_user_ids)
@@ -1 +1,9 @@
 from .anti_recommender import AntiRecommender as AntiRecommender
+from .anti_recommender_exception import (
+    AntiRecommenderException as AntiRecommenderException,
+)
+
+from .create_anti_recommender import (  # isort: skip
+    create_anti_recommender as create_anti_recommender,
+    find_arkg_anti_recommender as find_arkg_anti_recommender,
+)
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Iterable
+from typing import Self
 
+from app.concurrency import run_in_thread_pool
 from app.models.anti_recommendation import AntiRecommendation
 from app.models.types import RecordKey
+from app.user import User
 
 
 class AntiRecommender(ABC):
@@ -10,7 +13,49 @@ class AntiRecommender(ABC):
 
     @abstractmethod
     def generate_anti_recommendations(
-        self, *, record_key: RecordKey
+        self, *, record_key: RecordKey, user: User
     ) -> Iterable[AntiRecommendation]:
-        """Generate anti-recommendations of a record_key."""
+        """Generate anti-recommendations of a record_key for a User."""
         raise NotImplementedError
+
+    async def agenerate_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> tuple[AntiRecommendation, ...]:
+        """
+        Return anti-recommendations of a record_key for a User, without blocking the event loop.
+
+        By default, generate_anti_recommendations runs to completion on the bounded thread pool.
+        """
+
+        return await run_in_thread_pool(
+            lambda: tuple(
+                self.generate_anti_recommendations(record_key=record_key, user=user)
+            )
+        )
+
+    async def astream_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> AsyncIterator[AntiRecommendation]:
+        """
+        Yield anti-recommendations of a record_key for a User as soon as each one is available.
+
+        By default, every anti-recommendation is yielded once agenerate_anti_recommendations has returned.
+        """
+
+        for anti_recommendation in await self.agenerate_anti_recommendations(
+            record_key=record_key, user=user
+        ):
+            yield anti_recommendation
+
+    async def __aenter__(self) -> Self:
+        """Return the AntiRecommender. Nothing is started by default."""
+
+        return self
+
+    async def __aexit__(self, *exception_info: object) -> None:
+        """Release any resources that are held by the AntiRecommender."""
+
+        await self.aclose()
+
+    async def aclose(self) -> None:  # noqa: B027
+        """Release any resources that are held by the AntiRecommender. Nothing is held by default."""
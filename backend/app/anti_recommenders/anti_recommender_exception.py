@@ -0,0 +1,2 @@
+class AntiRecommenderException(BaseException):
+    """An exception encountered when an AntiRecommender cannot generate anti-recommendations."""
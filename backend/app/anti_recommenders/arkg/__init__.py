@@ -1 +1,6 @@
 from .arkg_anti_recommender import ArkgAntiRecommender as ArkgAntiRecommender
+from .arkg_index import ArkgIndex as ArkgIndex
+from .persistent_arkg_store import (
+    open_persistent_arkg_store as open_persistent_arkg_store,
+)
+from .seen_record_keys import SeenRecordKeys as SeenRecordKeys
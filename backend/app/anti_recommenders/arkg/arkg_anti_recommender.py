@@ -1,3 +1,6 @@
+import threading
+import time
+import weakref
 from collections.abc import Iterable
 from pathlib import Path
 from typing import override
@@ -7,37 +10,131 @@ from pydantic import AnyUrl
 from pydantic_extra_types.language_code import LanguageAlpha2
 
 from app.anti_recommenders import AntiRecommender
+from app.anti_recommenders.arkg.arkg_index import ArkgIndex
+from app.anti_recommenders.arkg.persistent_arkg_store import (
+    open_persistent_arkg_store,
+)
+from app.anti_recommenders.arkg.seen_record_keys import SeenRecordKeys
+from app.caches import TtlCache
+from app.concurrency import run_in_thread_pool
 from app.constants import WIKIPEDIA_BASE_URL
-from app.models import AntiRecommendation
-from app.models.types import RdfMimeType, RecordKey
-from app.namespaces import SCHEMA
+from app.models import AntiRecommendation, ArkgReloadMetrics
+from app.models.types import RdfMimeType, RecordKey, UserId
+from app.namespaces import DELTA, SCHEMA
 from app.user import User
 
 
+class _ArkgVersion:
+    """
+    A version of an ARKG, that is loaded and indexed as a whole, and read as a whole by each request.
+
+    An _ArkgVersion consists of:
+        - arkg_index: The precomputed ArkgIndex of the version, or None if anti-recommendations are queried from its Store.
+        - delta_file_paths: A tuple of the paths of the delta files that were applied to the ARKG file, in order.
+        - file_path: The path of the ARKG file the version was loaded from.
+        - number: The number of the version, starting from 1.
+        - store: The Store of the version, which is only kept when it has no ArkgIndex.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "arkg_index",
+        "delta_file_paths",
+        "file_path",
+        "number",
+        "store",
+    )
+
+    def __init__(
+        self,
+        *,
+        arkg_index: ArkgIndex | None,
+        delta_file_paths: tuple[Path, ...],
+        file_path: Path,
+        number: int,
+        store: ox.Store | None,
+    ) -> None:
+        self.arkg_index = arkg_index
+        self.delta_file_paths = delta_file_paths
+        self.file_path = file_path
+        self.number = number
+        self.store = store
+
+
 class ArkgAntiRecommender(AntiRecommender):
     """
     A concrete implementation of AntiRecommender.
 
     An ArkgAntiRecommender uses information stored in an Anti-Recommendation Knowledge Graph to generate anti-recommendations.
+
+    An ARKG can be reloaded while anti-recommendations are generated, from a new ARKG file or from a delta file of added and
+    removed triples. Each reload loads and indexes a new _ArkgVersion, and swaps it in by replacing a single reference.
+    Each request reads the version that was current when it started, and a previous version is released once no request reads it.
+
+    A delta file is a TriG or N-Quads file, whose triples in the DELTA.ADDED graph are added to the ARKG, and whose triples in the
+    DELTA.REMOVED graph are removed from it. Delta files are applied in order on top of the ARKG file, every time a version is loaded.
+    They can't be applied to a persistent Store, which is read-only.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         *,
         file_path: Path,
         mime_type: RdfMimeType,
         record_keys: tuple[RecordKey, ...],
-        user: User,
+        precompute_index: bool = True,
+        store_directory_path: Path | None = None,
+        seen_record_keys_cache_max_size: int = 10_000,
+        seen_record_keys_cache_ttl: float = 3600.0,
     ) -> None:
-        self.__record_keys: tuple[RecordKey, ...] = record_keys
-        self.__store: ox.Store = self.__load_store(
-            file_path=file_path, mime_type=mime_type
+        self.__language = LanguageAlpha2("en")
+        # The RecordKeys and their positions are replaced together, so that a request never reads the keys of one catalog with the positions of another.
+        self.__record_keys_and_positions = self.__index_record_keys(
+            record_keys=record_keys
+        )
+
+        # SeenRecordKeys of Users that have been idle for too long are rebuilt from their history on their next request.
+        self.__seen_record_keys_by_user_id: TtlCache[UserId, SeenRecordKeys] = TtlCache(
+            max_size=seen_record_keys_cache_max_size,
+            ttl=seen_record_keys_cache_ttl,
+        )
+
+        self.__mime_type = mime_type
+        self.__precompute_index = precompute_index
+        self.__store_directory_path = store_directory_path
+
+        self.__reload_lock = threading.Lock()
+        self.__reload_metrics: ArkgReloadMetrics | None = None
+        self.__version = self.__load_version(
+            file_path=file_path, delta_file_paths=(), number=1
         )
-        self.__user = user
 
     @staticmethod
-    def __load_store(*, file_path: Path, mime_type: RdfMimeType) -> ox.Store:
-        """Load an ARKG serialization into an RDF Store."""
+    def __index_record_keys(
+        *, record_keys: tuple[RecordKey, ...]
+    ) -> tuple[tuple[RecordKey, ...], dict[RecordKey, int]]:
+        """Return record_keys with a dictionary of type RecordKey: int, that holds the position of each RecordKey."""
+
+        return record_keys, {
+            record_key: position for position, record_key in enumerate(record_keys)
+        }
+
+    @staticmethod
+    def __load_store(
+        *, file_path: Path, mime_type: RdfMimeType, store_directory_path: Path | None
+    ) -> ox.Store:
+        """
+        Load an ARKG serialization into an RDF Store.
+
+        A persistent, read-only Store is opened if store_directory_path is set, and an in-memory Store is loaded otherwise.
+        """
+
+        if store_directory_path:
+            return open_persistent_arkg_store(
+                file_path=file_path,
+                mime_type=mime_type,
+                store_directory_path=store_directory_path,
+            )
 
         store = ox.Store()
         store.load(
@@ -46,22 +143,153 @@ class ArkgAntiRecommender(AntiRecommender):
         )
         return store
 
+    @staticmethod
+    def __apply_delta(*, store: ox.Store, delta_file_path: Path) -> None:
+        """Add the triples of the DELTA.ADDED graph of a delta file to store, and remove the triples of its DELTA.REMOVED graph, in order."""
+
+        mime_type = (
+            RdfMimeType.N_QUADS if delta_file_path.suffix == ".nq" else RdfMimeType.TRIG
+        )
+
+        for quad in ox.parse(input=delta_file_path, mime_type=mime_type.value):
+            if not isinstance(quad, ox.Quad):
+                continue
+
+            triple = ox.Quad(quad.subject, quad.predicate, quad.object)
+
+            if quad.graph_name == DELTA.ADDED:
+                store.add(triple)
+            elif quad.graph_name == DELTA.REMOVED:
+                store.remove(triple)
+
+    def __load_version(
+        self, *, file_path: Path, delta_file_paths: tuple[Path, ...], number: int
+    ) -> _ArkgVersion:
+        """Load an ARKG file and apply delta_file_paths to it, index it if the ArkgAntiRecommender precomputes an index, and return it as a new _ArkgVersion."""
+
+        if delta_file_paths and self.__store_directory_path:
+            message = "Delta files can't be applied to a persistent ARKG Store."
+            raise ValueError(message)
+
+        store = self.__load_store(
+            file_path=file_path,
+            mime_type=self.__mime_type,
+            store_directory_path=self.__store_directory_path,
+        )
+        for delta_file_path in delta_file_paths:
+            self.__apply_delta(store=store, delta_file_path=delta_file_path)
+
+        # The Store is only kept when anti-recommendations are queried with SPARQL on every request.
+        arkg_index = (
+            ArkgIndex(store=store, language=self.__language)
+            if self.__precompute_index
+            else None
+        )
+
+        return _ArkgVersion(
+            arkg_index=arkg_index,
+            delta_file_paths=delta_file_paths,
+            file_path=file_path,
+            number=number,
+            store=None if arkg_index else store,
+        )
+
+    def __release_previous_version(self, *, number: int, swap_time: float) -> None:
+        """Record that the version before version number was released, if the metrics of that reload are still the last ones."""
+
+        if (
+            self.__reload_metrics is not None
+            and self.__reload_metrics.version == number
+        ):
+            self.__reload_metrics = self.__reload_metrics.model_copy(
+                update={
+                    "previous_version_released": True,
+                    "previous_version_release_seconds": time.perf_counter() - swap_time,
+                }
+            )
+
+    @staticmethod
+    def __create_anti_recommendation(
+        *, anti_recommendation_key: RecordKey
+    ) -> AntiRecommendation:
+        """Return an AntiRecommendation of a Wikipedia article with the key anti_recommendation_key."""
+
+        return AntiRecommendation(
+            key=anti_recommendation_key,
+            url=AnyUrl(WIKIPEDIA_BASE_URL + anti_recommendation_key),
+        )
+
+    def __retrieve_anti_recommendations(
+        self, *, record_key: RecordKey, version: _ArkgVersion
+    ) -> tuple[AntiRecommendation, ...]:
+        """
+        Return a tuple of AntiRecommendations of record_key in a version of the ARKG.
+
+        AntiRecommendations are looked up in the precomputed ArkgIndex if there is one, and queried from the ARKG Store otherwise.
+        """
+
+        if version.arkg_index:
+            return version.arkg_index.anti_recommendations(record_key=record_key)
+
+        return tuple(
+            self.__create_anti_recommendation(
+                anti_recommendation_key=anti_recommendation_key
+            )
+            for anti_recommendation_key in self.__retrieve_anti_recommendations_from_store(
+                record_key=record_key, language=self.__language, store=version.store
+            )
+        )
+
+    @staticmethod
     def __retrieve_anti_recommendations_from_store(
-        self, *, record_key: RecordKey, language: LanguageAlpha2
+        *, record_key: RecordKey, language: LanguageAlpha2, store: ox.Store | None
     ) -> tuple[RecordKey, ...]:
         """Return a tuple of anti-recommendations that have been retrieved from an ARKG Store."""
 
+        if not store:
+            return ()
+
         return tuple(
             binding["name"].value
-            for binding in self.__store.query(  # type: ignore[union-attr]
+            for binding in store.query(  # type: ignore[union-attr]
                 query=f'SELECT ?name WHERE {{ {{ ?uuid <{SCHEMA.ABOUT.value}> ?entity {{ ?entity_article <{SCHEMA.ABOUT.value}> ?entity {{?entity_article <{SCHEMA.NAME.value}> "{record_key}"@{language} }} }} . \
                                                  ?uuid <{SCHEMA.ITEM_REVIEWED.value}> ?anti_recommendation {{?anti_recommendation_article <{SCHEMA.ABOUT.value}> ?anti_recommendation {{?anti_recommendation_article <{SCHEMA.NAME.value}> ?name}} }} }} }}'
             )
         )
 
+    def __seen_record_keys(
+        self,
+        *,
+        user_id: UserId,
+        anti_recommendations_history: tuple[RecordKey, ...],
+    ) -> SeenRecordKeys:
+        """Return the SeenRecordKeys of a User, synchronized with the User's anti-recommendations history."""
+
+        seen_record_keys = self.__seen_record_keys_by_user_id.get(user_id)
+        record_keys, position_by_record_key = self.__record_keys_and_positions
+
+        # SeenRecordKeys of RecordKeys that have since been replaced are rebuilt, even if a request put them back in the cache meanwhile.
+        if not seen_record_keys or seen_record_keys.record_keys is not record_keys:
+            seen_record_keys = SeenRecordKeys(
+                record_keys=record_keys,
+                position_by_record_key=position_by_record_key,
+            )
+
+        # Refresh the entry, so that only idle Users are evicted.
+        self.__seen_record_keys_by_user_id.set(user_id, seen_record_keys)
+
+        seen_record_keys.synchronize(
+            anti_recommendations_history=anti_recommendations_history
+        )
+
+        return seen_record_keys
+
+    @staticmethod
     def __select_primary_anti_recommendation_key(
-        self, *, anti_recommendation_keys: tuple[RecordKey, ...]
-    ) -> RecordKey:
+        *,
+        anti_recommendation_keys: tuple[RecordKey, ...],
+        seen_record_keys: SeenRecordKeys,
+    ) -> RecordKey | None:
         """
         Select and return a primary anti-recommendation key.
 
@@ -69,31 +297,59 @@ class ArkgAntiRecommender(AntiRecommender):
 
         A primary anti-recommendation key is first looked for in anti_recommendation_keys.
 
-        If no unseen key is found in anti_recommendation_keys, the first unseen key in __record_keys is returned.
+        If no unseen key is found in anti_recommendation_keys, the first unseen key in the sorted Record keys is returned.
         """
 
-        anti_recommendations_history = list(self.__user.anti_recommendations_history)
-        primary_anti_recommendation_keys = [
-            unseen_anti_recommendation_key
-            for unseen_anti_recommendation_key in anti_recommendation_keys
-            if unseen_anti_recommendation_key not in anti_recommendations_history
-        ]
+        for anti_recommendation_key in anti_recommendation_keys:
+            if anti_recommendation_key not in seen_record_keys:
+                return anti_recommendation_key
+
+        return seen_record_keys.first_unseen_record_key()
+
+    def __order_anti_recommendations(
+        self,
+        *,
+        anti_recommendations: tuple[AntiRecommendation, ...],
+        seen_record_keys: SeenRecordKeys,
+    ) -> tuple[AntiRecommendation, ...]:
+        """Return anti_recommendations, led by an anti-recommendation that has not yet been seen by a User."""
+
+        remaining_anti_recommendations = list(anti_recommendations)
 
-        if not primary_anti_recommendation_keys:
-            primary_anti_recommendation_keys = [
-                unseen_anti_recommendation_key
-                for unseen_anti_recommendation_key in self.__record_keys
-                if unseen_anti_recommendation_key not in anti_recommendations_history
-            ]
+        primary_anti_recommendation_key = self.__select_primary_anti_recommendation_key(
+            anti_recommendation_keys=tuple(
+                anti_recommendation.key for anti_recommendation in anti_recommendations
+            ),
+            seen_record_keys=seen_record_keys,
+        )
+
+        if primary_anti_recommendation_key:
+            primary_anti_recommendation = next(
+                (
+                    anti_recommendation
+                    for anti_recommendation in remaining_anti_recommendations
+                    if anti_recommendation.key == primary_anti_recommendation_key
+                ),
+                None,
+            )
+
+            if primary_anti_recommendation:
+                remaining_anti_recommendations.remove(primary_anti_recommendation)
+            else:
+                primary_anti_recommendation = self.__create_anti_recommendation(
+                    anti_recommendation_key=primary_anti_recommendation_key
+                )
+
+            return (primary_anti_recommendation, *remaining_anti_recommendations)
 
-        return primary_anti_recommendation_keys[0]
+        return ()
 
     @override
     def generate_anti_recommendations(
-        self, *, record_key: RecordKey
+        self, *, record_key: RecordKey, user: User
     ) -> Iterable[AntiRecommendation]:
         """
-        Generate AntiRecommendations of a record_key.
+        Generate AntiRecommendations of a record_key for a User.
 
         Anti-recommendations are obtained from an ARKG.
 
@@ -102,28 +358,143 @@ class ArkgAntiRecommender(AntiRecommender):
         All other anti-recommendations may or may not have been seen by a User.
         """
 
-        anti_recommendation_keys = list(
-            self.__retrieve_anti_recommendations_from_store(
-                record_key=record_key, language=LanguageAlpha2("en")
+        return self.__order_anti_recommendations(
+            anti_recommendations=self.__retrieve_anti_recommendations(
+                record_key=record_key, version=self.__version
+            ),
+            seen_record_keys=self.__seen_record_keys(
+                user_id=user.id,
+                anti_recommendations_history=user.anti_recommendations_history,
+            ),
+        )
+
+    @override
+    async def agenerate_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> tuple[AntiRecommendation, ...]:
+        """
+        Return AntiRecommendations of a record_key for a User, without blocking the event loop.
+
+        Lookups in a precomputed ArkgIndex run on the event loop. SPARQL queries run on the bounded thread pool.
+        """
+
+        version = self.__version
+        anti_recommendations = (
+            version.arkg_index.anti_recommendations(record_key=record_key)
+            if version.arkg_index
+            else await run_in_thread_pool(
+                self.__retrieve_anti_recommendations,
+                record_key=record_key,
+                version=version,
             )
         )
 
-        primary_anti_recommendation_key = self.__select_primary_anti_recommendation_key(
-            anti_recommendation_keys=tuple(anti_recommendation_keys)
+        return self.__order_anti_recommendations(
+            anti_recommendations=anti_recommendations,
+            seen_record_keys=self.__seen_record_keys(
+                user_id=user.id,
+                anti_recommendations_history=await user.aget_anti_recommendations_history(),
+            ),
         )
 
-        if primary_anti_recommendation_key:
-            if primary_anti_recommendation_key in anti_recommendation_keys:
-                anti_recommendation_keys.remove(primary_anti_recommendation_key)
+    @property
+    def reload_metrics(self) -> ArkgReloadMetrics | None:
+        """The metrics of the last reload of the ARKG, or None if it has not been reloaded."""
 
-            anti_recommendation_keys.insert(0, primary_anti_recommendation_key)
+        return self.__reload_metrics
 
-            return (
-                AntiRecommendation(
-                    key=anti_recommendation_key,
-                    url=AnyUrl(WIKIPEDIA_BASE_URL + anti_recommendation_key),
-                )
-                for anti_recommendation_key in anti_recommendation_keys
+    @property
+    def version(self) -> int:
+        """The number of the current version of the ARKG, starting from 1."""
+
+        return self.__version.number
+
+    def replace_record_keys(self, *, record_keys: tuple[RecordKey, ...]) -> None:
+        """
+        Offer record_keys as anti-recommendations that have not been seen, instead of the current RecordKeys.
+
+        The SeenRecordKeys of every User are rebuilt from the User's history on the User's next request.
+        """
+
+        self.__record_keys_and_positions = self.__index_record_keys(
+            record_keys=record_keys
+        )
+        self.__seen_record_keys_by_user_id.clear()
+
+    def __reload(
+        self,
+        *,
+        file_path: Path | None,
+        delta_file_path: Path | None,
+        request_time: float,
+    ) -> ArkgReloadMetrics:
+        """Reload the ARKG like reload does, and measure the latency of the swap from request_time."""
+
+        if file_path is not None and delta_file_path is not None:
+            message = "An ARKG is reloaded from either an ARKG file or a delta file, not both."
+            raise ValueError(message)
+
+        with self.__reload_lock:
+            previous_version = self.__version
+
+            load_start_time = time.perf_counter()
+            version = self.__load_version(
+                file_path=file_path or previous_version.file_path,
+                delta_file_paths=(*previous_version.delta_file_paths, delta_file_path)
+                if delta_file_path is not None
+                else (),
+                number=previous_version.number + 1,
             )
+            load_seconds = time.perf_counter() - load_start_time
 
-        return ()
+            self.__version = version
+            swap_time = time.perf_counter()
+
+            self.__reload_metrics = ArkgReloadMetrics(
+                load_seconds=load_seconds,
+                previous_version_released=False,
+                previous_version_release_seconds=None,
+                swap_seconds=swap_time - request_time - load_seconds,
+                version=version.number,
+            )
+            weakref.finalize(
+                previous_version,
+                self.__release_previous_version,
+                number=version.number,
+                swap_time=swap_time,
+            )
+            del previous_version
+
+        # The previous version is usually released as soon as it is no longer referenced, unless requests still read it.
+        return self.__reload_metrics
+
+    def reload(
+        self, *, file_path: Path | None = None, delta_file_path: Path | None = None
+    ) -> ArkgReloadMetrics:
+        """
+        Load and index a new version of the ARKG on the calling thread, swap it in, and return the metrics of the reload.
+
+        If delta_file_path is set, it is applied on top of the current version. Otherwise, file_path is loaded without any delta files,
+        or the ARKG file of the current version is loaded again if file_path is not set either.
+
+        Reloads run one at a time, so a reload waits for an earlier one to finish before it loads its version.
+        """
+
+        return self.__reload(
+            file_path=file_path,
+            delta_file_path=delta_file_path,
+            request_time=time.perf_counter(),
+        )
+
+    async def areload(
+        self, *, file_path: Path | None = None, delta_file_path: Path | None = None
+    ) -> ArkgReloadMetrics:
+        """Reload the ARKG like reload does, on a worker thread, without blocking the event loop."""
+
+        # The wait for a worker thread delays the swap as well, so it counts towards the swap latency.
+        return await run_in_thread_pool(
+            self.__reload,
+            file_path=file_path,
+            delta_file_path=delta_file_path,
+            request_time=time.perf_counter(),
+        )
@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+import pyoxigraph as ox
+from pydantic import AnyUrl
+from pydantic_extra_types.language_code import LanguageAlpha2
+
+from app.constants import WIKIPEDIA_BASE_URL
+from app.models import AntiRecommendation
+from app.models.types import RecordKey
+from app.namespaces import SCHEMA
+
+# Any RDF term that can appear in the subject or object position of an ARKG triple.
+Term = ox.NamedNode | ox.BlankNode | ox.Literal | ox.Triple
+
+
+class ArkgIndex:
+    """
+    A precomputed adjacency index of an Anti-Recommendation Knowledge Graph.
+
+    An ArkgIndex resolves every schema:about, schema:itemReviewed and schema:name chain of an ARKG Store in a single pass,
+    and maps each RecordKey to a tuple of AntiRecommendations with ready-built URLs.
+    """
+
+    def __init__(self, *, store: ox.Store, language: LanguageAlpha2) -> None:
+        self.__anti_recommendations_by_key: dict[
+            RecordKey, tuple[AntiRecommendation, ...]
+        ] = self.__build_index(store=store, language=language)
+
+    @staticmethod
+    def __build_index(
+        *, store: ox.Store, language: LanguageAlpha2
+    ) -> dict[RecordKey, tuple[AntiRecommendation, ...]]:
+        """Resolve the anti-recommendations of every named article in store, and return them by RecordKey."""
+
+        names_by_article: dict[Term, list[ox.Literal]] = defaultdict(list)
+        for quad in store.quads_for_pattern(None, SCHEMA.NAME, None):
+            if isinstance(quad.object, ox.Literal):
+                names_by_article[quad.subject].append(quad.object)
+
+        # Articles and anti-recommendations are both linked to an entity with schema:about.
+        names_by_entity: dict[Term, list[ox.Literal]] = defaultdict(list)
+        entities_by_subject: dict[Term, list[Term]] = defaultdict(list)
+        for quad in store.quads_for_pattern(None, SCHEMA.ABOUT, None):
+            names_by_entity[quad.object].extend(names_by_article.get(quad.subject, ()))
+            entities_by_subject[quad.subject].append(quad.object)
+
+        anti_recommendation_by_name: dict[str, AntiRecommendation] = {}
+        anti_recommendations_by_key: dict[
+            RecordKey, dict[RecordKey, AntiRecommendation]
+        ] = defaultdict(dict)
+
+        for quad in store.quads_for_pattern(None, SCHEMA.ITEM_REVIEWED, None):
+            for entity in entities_by_subject.get(quad.subject, ()):
+                for record_name in names_by_entity.get(entity, ()):
+                    if record_name.language != language:
+                        continue
+
+                    for anti_recommendation_name in names_by_entity.get(
+                        quad.object, ()
+                    ):
+                        name = anti_recommendation_name.value
+                        if name not in anti_recommendation_by_name:
+                            anti_recommendation_by_name[name] = AntiRecommendation(
+                                key=name, url=AnyUrl(WIKIPEDIA_BASE_URL + name)
+                            )
+
+                        anti_recommendation = anti_recommendation_by_name[name]
+                        anti_recommendations_by_key[record_name.value][
+                            anti_recommendation.key
+                        ] = anti_recommendation
+
+        return {
+            record_key: tuple(anti_recommendations.values())
+            for record_key, anti_recommendations in anti_recommendations_by_key.items()
+        }
+
+    def anti_recommendations(
+        self, *, record_key: RecordKey
+    ) -> tuple[AntiRecommendation, ...]:
+        """Return the AntiRecommendations of record_key, or an empty tuple if record_key is not in the index."""
+
+        return self.__anti_recommendations_by_key.get(record_key, ())
@@ -0,0 +1,112 @@
+import fcntl
+import hashlib
+import shutil
+from pathlib import Path
+from typing import TextIO
+
+import pyoxigraph as ox
+
+from app.models.types import RdfMimeType
+
+# The files that hold a shared lock on every Store this process has opened, keyed by Store path.
+# They stay open until the process exits, so that no other process removes a Store that may still be read.
+_store_lock_files: dict[Path, TextIO] = {}
+
+
+def _hash_file(*, file_path: Path) -> str:
+    """Return the SHA-256 hex digest of the file at file_path."""
+
+    with file_path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def _bulk_load_store(
+    *, file_path: Path, mime_type: RdfMimeType, store_path: Path
+) -> None:
+    """Bulk load an ARKG serialization into a new on-disk Store at store_path."""
+
+    building_store_path = store_path.with_name(store_path.name + ".building")
+    shutil.rmtree(building_store_path, ignore_errors=True)
+
+    store = ox.Store(str(building_store_path))
+    store.bulk_load(input=file_path, mime_type=mime_type.value)
+    store.optimize()
+    store.flush()
+    del store
+
+    # A Store only becomes visible under its final name once it has been fully loaded.
+    building_store_path.rename(store_path)
+
+
+def _store_lock_file_path(*, store_path: Path) -> Path:
+    """Return the path of the file that readers of the Store at store_path hold a shared lock on."""
+
+    return store_path.with_name(store_path.name + ".lock")
+
+
+def _lock_store(*, store_path: Path) -> None:
+    """Hold a shared lock on the Store at store_path until the process exits."""
+
+    if store_path in _store_lock_files:
+        return
+
+    store_lock_file = _store_lock_file_path(store_path=store_path).open("w")
+    fcntl.flock(store_lock_file, fcntl.LOCK_SH)
+    _store_lock_files[store_path] = store_lock_file
+
+
+def _remove_outdated_stores(*, store_directory_path: Path, store_path: Path) -> None:
+    """Remove the Stores in store_directory_path other than store_path that no process holds a lock on."""
+
+    for outdated_store_path in store_directory_path.iterdir():
+        if not outdated_store_path.is_dir() or outdated_store_path == store_path:
+            continue
+
+        outdated_store_lock_file_path = _store_lock_file_path(
+            store_path=outdated_store_path
+        )
+        with outdated_store_lock_file_path.open("w") as outdated_store_lock_file:
+            try:
+                fcntl.flock(outdated_store_lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process still reads this Store.
+                continue
+
+            shutil.rmtree(outdated_store_path, ignore_errors=True)
+            outdated_store_lock_file_path.unlink()
+
+
+def open_persistent_arkg_store(
+    *, file_path: Path, mime_type: RdfMimeType, store_directory_path: Path
+) -> ox.Store:
+    """
+    Open a read-only, on-disk Store that contains the ARKG serialized at file_path.
+
+    Stores live in store_directory_path, under the SHA-256 hash of the ARKG file they were loaded from.
+
+    The ARKG file is bulk loaded once, the first time a Store is opened for its hash. Later calls reopen the existing Store.
+
+    A process holds a shared lock on every Store it opens until it exits.
+    Stores of previous versions of the ARKG file are removed whenever a Store is opened, unless a process still holds a lock on them.
+    """
+
+    store_directory_path.mkdir(parents=True, exist_ok=True)
+    store_path = store_directory_path / _hash_file(file_path=file_path)
+
+    # Hold an exclusive lock so that only one worker process loads a Store.
+    with (store_directory_path / ".lock").open("w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        if not store_path.exists():
+            _bulk_load_store(
+                file_path=file_path, mime_type=mime_type, store_path=store_path
+            )
+
+        # The Store is locked before outdated Stores are removed, and both happen under the exclusive lock,
+        # so that no process removes a Store between another process choosing it and locking it.
+        _lock_store(store_path=store_path)
+        _remove_outdated_stores(
+            store_directory_path=store_directory_path, store_path=store_path
+        )
+
+        return ox.Store.read_only(str(store_path))
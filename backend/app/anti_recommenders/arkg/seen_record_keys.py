@@ -0,0 +1,106 @@
+from collections.abc import Iterable, Mapping
+
+from app.models.types import RecordKey
+
+_FULL_BYTE = 0xFF
+
+
+class SeenRecordKeys:
+    """
+    The Record keys that a User has seen.
+
+    A SeenRecordKeys consists of:
+        - __anti_recommendations_history: The anti-recommendations history that SeenRecordKeys was last synchronized with.
+        - __cursor: The position of the first unseen key in __record_keys.
+        - __position_by_record_key: A dictionary of type RecordKey: int, that holds the position of each key in __record_keys.
+        - __record_keys: A sorted tuple of every Record key that can be anti-recommended.
+        - __seen_record_keys: A set of every Record key that has been seen.
+        - __seen_positions: A bitmap over __record_keys, in which the bit of a seen key is set.
+
+    SeenRecordKeys also:
+        - Tests if a Record key has been seen in constant time.
+        - Returns the first unseen key in __record_keys in amortized constant time.
+    """
+
+    def __init__(
+        self,
+        *,
+        record_keys: tuple[RecordKey, ...],
+        position_by_record_key: Mapping[RecordKey, int],
+    ) -> None:
+        self.__record_keys = record_keys
+        self.__position_by_record_key = position_by_record_key
+        self.__anti_recommendations_history: tuple[RecordKey, ...] = ()
+        self.__clear()
+
+    def __contains__(self, record_key: object) -> bool:
+        return record_key in self.__seen_record_keys
+
+    def __clear(self) -> None:
+        """Mark every Record key as unseen."""
+
+        self.__cursor = 0
+        self.__seen_record_keys: set[RecordKey] = set()
+        self.__seen_positions = bytearray((len(self.__record_keys) + 7) // 8)
+
+    def __add(self, *, record_keys: Iterable[RecordKey]) -> None:
+        """Mark record_keys as seen."""
+
+        for record_key in record_keys:
+            self.__seen_record_keys.add(record_key)
+
+            position = self.__position_by_record_key.get(record_key)
+            if position is not None:
+                self.__seen_positions[position >> 3] |= 1 << (position & 7)
+
+    @property
+    def record_keys(self) -> tuple[RecordKey, ...]:
+        """The sorted tuple of every Record key that can be anti-recommended."""
+
+        return self.__record_keys
+
+    def synchronize(
+        self, *, anti_recommendations_history: tuple[RecordKey, ...]
+    ) -> None:
+        """
+        Synchronize the seen Record keys with a User's anti-recommendations history.
+
+        Keys that were appended to the history since the last synchronization are added incrementally.
+
+        The seen Record keys are rebuilt if keys were removed from the history.
+        """
+
+        synchronized_history_length = len(self.__anti_recommendations_history)
+
+        if (
+            anti_recommendations_history[:synchronized_history_length]
+            != self.__anti_recommendations_history
+        ):
+            self.__clear()
+            synchronized_history_length = 0
+
+        self.__add(
+            record_keys=anti_recommendations_history[synchronized_history_length:]
+        )
+        self.__anti_recommendations_history = anti_recommendations_history
+
+    def first_unseen_record_key(self) -> RecordKey | None:
+        """Return the first unseen key in the sorted tuple of Record keys, or None if every key has been seen."""
+
+        record_keys_length = len(self.__record_keys)
+
+        while self.__cursor < record_keys_length:
+            seen_positions_byte = self.__seen_positions[self.__cursor >> 3]
+
+            # Skip over a whole byte of seen keys at once.
+            if seen_positions_byte == _FULL_BYTE:
+                self.__cursor = (self.__cursor | 7) + 1
+            elif seen_positions_byte & (1 << (self.__cursor & 7)):
+                self.__cursor += 1
+            else:
+                break
+
+        if self.__cursor < record_keys_length:
+            return self.__record_keys[self.__cursor]
+
+        return None
@@ -0,0 +1,91 @@
+from app.anti_recommenders.anti_recommender import AntiRecommender
+from app.anti_recommenders.arkg import ArkgAntiRecommender
+from app.anti_recommenders.hedged import HedgedAntiRecommender
+from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
+from app.models import Settings
+from app.models.types import AntiRecommenderType
+from app.record_catalog import RecordCatalog
+
+
+def _create_arkg_anti_recommender(
+    *, record_catalog: RecordCatalog, settings: Settings
+) -> ArkgAntiRecommender:
+    """Return an ArkgAntiRecommender that is configured by settings."""
+
+    return ArkgAntiRecommender(
+        file_path=settings.arkg_file_path,
+        mime_type=settings.arkg_mime_type,
+        record_keys=record_catalog.sorted_record_keys,
+        precompute_index=settings.arkg_precompute_index,
+        store_directory_path=settings.arkg_store_directory_path,
+        seen_record_keys_cache_max_size=settings.session_engines_max_count,
+        seen_record_keys_cache_ttl=settings.session_engines_idle_ttl,
+    )
+
+
+def _create_openai_anti_recommender(
+    *, settings: Settings
+) -> NormalOpenaiAntiRecommender:
+    """Return a NormalOpenaiAntiRecommender that is configured by settings."""
+
+    return NormalOpenaiAntiRecommender(
+        model_name=settings.openai_model_name,
+        api_key=settings.openai_api_key,
+        base_url=str(settings.openai_base_url) if settings.openai_base_url else None,
+        cache_max_size=settings.openai_cache_max_size,
+        cache_ttl=settings.openai_cache_ttl,
+        cache_database_path=settings.openai_cache_database_path,
+        cache_database_max_size=settings.openai_cache_database_max_size,
+        http_max_connections=settings.openai_http_max_connections,
+        http_keepalive_expiry=settings.openai_http_keepalive_expiry,
+        request_timeout=settings.openai_request_timeout,
+        max_concurrent_requests=settings.openai_max_concurrent_requests,
+        max_waiting_requests=settings.openai_max_waiting_requests,
+        wait_timeout=settings.openai_wait_timeout,
+    )
+
+
+def create_anti_recommender(
+    *, record_catalog: RecordCatalog, settings: Settings
+) -> AntiRecommender:
+    """
+    Select and return an AntiRecommender based on values stored in settings.
+
+    An ArkgAntiRecommender is the default AntiRecommender selection, and is also selected when there is no OpenAI API key.
+
+    A HedgedAntiRecommender prefers a NormalOpenaiAntiRecommender, and falls back to an ArkgAntiRecommender after settings.hedged_deadline seconds.
+
+    The AntiRecommender is shared by every AntiRecommendationEngine in a process.
+    """
+
+    if settings.openai_api_key:
+        match settings.anti_recommender_type:
+            case AntiRecommenderType.OPEN_AI:
+                return _create_openai_anti_recommender(settings=settings)
+            case AntiRecommenderType.HEDGED:
+                return HedgedAntiRecommender(
+                    primary=_create_openai_anti_recommender(settings=settings),
+                    fallback=_create_arkg_anti_recommender(
+                        record_catalog=record_catalog, settings=settings
+                    ),
+                    deadline=settings.hedged_deadline,
+                    max_workers=settings.hedged_max_workers,
+                )
+
+    return _create_arkg_anti_recommender(
+        record_catalog=record_catalog, settings=settings
+    )
+
+
+def find_arkg_anti_recommender(
+    *, anti_recommender: AntiRecommender
+) -> ArkgAntiRecommender | None:
+    """Return the ArkgAntiRecommender that anti_recommender is, or falls back to, or None if it does not use an ARKG."""
+
+    if isinstance(anti_recommender, ArkgAntiRecommender):
+        return anti_recommender
+
+    if isinstance(anti_recommender, HedgedAntiRecommender):
+        return find_arkg_anti_recommender(anti_recommender=anti_recommender.fallback)
+
+    return None
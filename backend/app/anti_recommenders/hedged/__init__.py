@@ -0,0 +1 @@
+from .hedged_anti_recommender import HedgedAntiRecommender as HedgedAntiRecommender
@@ -0,0 +1,197 @@
+import functools
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING, Self, override
+
+import anyio
+
+from app.anti_recommenders import AntiRecommender, AntiRecommenderException
+from app.models import AntiRecommendation
+from app.models.types import RecordKey
+from app.user import User
+
+if TYPE_CHECKING:
+    from anyio.abc import TaskGroup
+
+
+class _PrimaryCall:
+    """The outcome of a call to a primary AntiRecommender, that is set once the call is done."""
+
+    def __init__(self) -> None:
+        self.anti_recommendations: tuple[AntiRecommendation, ...] = ()
+        self.done = anyio.Event()
+        self.exception: BaseException | None = None
+
+    async def run(
+        self, *, anti_recommender: AntiRecommender, record_key: RecordKey, user: User
+    ) -> None:
+        """Keep the anti-recommendations that anti_recommender returns. A failed call keeps its exception instead."""
+
+        try:
+            self.anti_recommendations = (
+                await anti_recommender.agenerate_anti_recommendations(
+                    record_key=record_key, user=user
+                )
+            )
+        # Any failure falls back, and must not tear down the background TaskGroup the call may run in.
+        except (AntiRecommenderException, Exception) as exception:
+            self.exception = exception
+        finally:
+            self.done.set()
+
+
+class HedgedAntiRecommender(AntiRecommender):
+    """
+    A composite implementation of AntiRecommender.
+
+    A HedgedAntiRecommender calls a slow primary AntiRecommender and a fast fallback AntiRecommender concurrently.
+    It returns the primary's anti-recommendations if they arrive within a deadline, and the fallback's otherwise.
+
+    A HedgedAntiRecommender consists of:
+        - __background_task_group: A TaskGroup that primary calls keep running in after their deadline, so that they populate the primary's cache.
+        - __deadline: The number of seconds to wait for the primary AntiRecommender.
+        - __exit_stack: An AsyncExitStack that closes __background_task_group and both AntiRecommenders.
+        - __fallback: The AntiRecommender that is returned when the primary misses its deadline, fails, or returns nothing.
+        - __primary: The AntiRecommender that is preferred when it is fast enough.
+        - __thread_pool: A ThreadPoolExecutor of at most max_workers threads that runs the primary's synchronous calls past their deadline.
+
+    __background_task_group only exists while the HedgedAntiRecommender is entered as an async context manager.
+    Outside of it, a primary call that misses its deadline is cancelled.
+    """
+
+    def __init__(
+        self,
+        *,
+        primary: AntiRecommender,
+        fallback: AntiRecommender,
+        deadline: float,
+        max_workers: int,
+    ) -> None:
+        self.__background_task_group: TaskGroup | None = None
+        self.__deadline = deadline
+        self.__exit_stack: AsyncExitStack | None = None
+        self.__fallback = fallback
+        self.__primary = primary
+        self.__thread_pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hedged-primary"
+        )
+
+    @override
+    def generate_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> Iterable[AntiRecommendation]:
+        """
+        Return the primary's anti-recommendations of a record_key if they arrive within the deadline, and the fallback's otherwise.
+
+        A primary call that is still queued for a thread at its deadline is dropped, so that the queue cannot grow without bound.
+        """
+
+        deadline_time = time.monotonic() + self.__deadline
+
+        primary_future = self.__thread_pool.submit(
+            lambda: tuple(
+                self.__primary.generate_anti_recommendations(
+                    record_key=record_key, user=user
+                )
+            )
+        )
+        fallback_anti_recommendations = tuple(
+            self.__fallback.generate_anti_recommendations(
+                record_key=record_key, user=user
+            )
+        )
+
+        try:
+            primary_anti_recommendations = primary_future.result(
+                timeout=max(0.0, deadline_time - time.monotonic())
+            )
+        except FutureTimeoutError:
+            primary_future.cancel()
+            return fallback_anti_recommendations
+        # Any failure falls back, as it does in agenerate_anti_recommendations.
+        except (AntiRecommenderException, Exception):
+            return fallback_anti_recommendations
+
+        return primary_anti_recommendations or fallback_anti_recommendations
+
+    @override
+    async def agenerate_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> tuple[AntiRecommendation, ...]:
+        """
+        Return the primary's anti-recommendations of a record_key if they arrive within the deadline, and the fallback's otherwise.
+
+        The fallback is awaited while the primary runs, so a response never takes much longer than the deadline.
+        """
+
+        deadline_time = anyio.current_time() + self.__deadline
+        primary_call = _PrimaryCall()
+
+        async with anyio.create_task_group() as task_group:
+            (self.__background_task_group or task_group).start_soon(
+                functools.partial(
+                    primary_call.run,
+                    anti_recommender=self.__primary,
+                    record_key=record_key,
+                    user=user,
+                )
+            )
+
+            fallback_anti_recommendations = (
+                await self.__fallback.agenerate_anti_recommendations(
+                    record_key=record_key, user=user
+                )
+            )
+
+            with anyio.move_on_after(max(0.0, deadline_time - anyio.current_time())):
+                await primary_call.done.wait()
+
+            # A primary call that runs in this task group has no cache to populate after its deadline.
+            task_group.cancel_scope.cancel()
+
+        return primary_call.anti_recommendations or fallback_anti_recommendations
+
+    @property
+    def fallback(self) -> AntiRecommender:
+        """The AntiRecommender that is returned when the primary misses its deadline, fails, or returns nothing."""
+
+        return self.__fallback
+
+    @override
+    async def __aenter__(self) -> Self:
+        """Enter both AntiRecommenders, and open the TaskGroup that primary calls keep running in after their deadline."""
+
+        async with AsyncExitStack() as exit_stack:
+            await exit_stack.enter_async_context(self.__primary)
+            await exit_stack.enter_async_context(self.__fallback)
+            self.__background_task_group = await exit_stack.enter_async_context(
+                anyio.create_task_group()
+            )
+            self.__exit_stack = exit_stack.pop_all()
+
+        return self
+
+    @override
+    async def __aexit__(self, *exception_info: object) -> None:
+        """Cancel the primary calls that are still running, and close both AntiRecommenders."""
+
+        if self.__background_task_group is not None:
+            self.__background_task_group.cancel_scope.cancel()
+            self.__background_task_group = None
+
+        if self.__exit_stack is not None:
+            await self.__exit_stack.aclose()
+            self.__exit_stack = None
+
+        self.__thread_pool.shutdown(wait=False, cancel_futures=True)
+
+    @override
+    async def aclose(self) -> None:
+        """Close both AntiRecommenders, and stop the thread pool of synchronous primary calls."""
+
+        await self.__primary.aclose()
+        await self.__fallback.aclose()
+        self.__thread_pool.shutdown(wait=False, cancel_futures=True)
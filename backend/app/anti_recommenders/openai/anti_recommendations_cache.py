@@ -0,0 +1,141 @@
+import hashlib
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from app.caches import SqliteCache, TtlCache
+from app.concurrency import run_in_thread_pool
+from app.models import AntiRecommendation
+from app.models.types import RecordKey
+
+_ANTI_RECOMMENDATIONS_ADAPTER = TypeAdapter(tuple[AntiRecommendation, ...])
+
+
+class AntiRecommendationsCache:
+    """
+    A two-tier cache of the parsed AntiRecommendations that a large language model returned for a Record key.
+
+    An AntiRecommendationsCache consists of:
+        - __disk_cache: An optional SqliteCache, that holds AntiRecommendations as JSON and outlives the process.
+        - __key_prefix: The hash of the prompt template and the model name, that prefixes every cache key.
+        - __memory_cache: An in-process TtlCache, that is checked before __disk_cache.
+
+    Entries from __disk_cache are promoted to __memory_cache when they are read.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        template: str,
+        model_name: str,
+        max_size: int,
+        ttl: float,
+        database_path: Path | None = None,
+        database_max_size: int = 100_000,
+    ) -> None:
+        template_hash = hashlib.sha256(template.encode()).hexdigest()
+
+        self.__key_prefix = f"{template_hash}:{model_name}:"
+        self.__memory_cache: TtlCache[str, tuple[AntiRecommendation, ...]] = TtlCache(
+            max_size=max_size, ttl=ttl
+        )
+        self.__disk_cache: SqliteCache | None = (
+            SqliteCache(
+                database_path=database_path, max_size=database_max_size, ttl=ttl
+            )
+            if database_path is not None
+            else None
+        )
+
+    def __cache_key(self, *, record_key: RecordKey) -> str:
+        """Return the key that the AntiRecommendations of record_key are cached under."""
+
+        return self.__key_prefix + record_key
+
+    def __get_from_disk(
+        self, *, cache_key: str
+    ) -> tuple[AntiRecommendation, ...] | None:
+        """Return the AntiRecommendations cached on disk under cache_key, and promote them to the in-process cache."""
+
+        if self.__disk_cache is None:
+            return None
+
+        anti_recommendations_json = self.__disk_cache.get(cache_key)
+        if anti_recommendations_json is None:
+            return None
+
+        anti_recommendations = _ANTI_RECOMMENDATIONS_ADAPTER.validate_json(
+            anti_recommendations_json
+        )
+        self.__memory_cache.set(cache_key, anti_recommendations)
+
+        return anti_recommendations
+
+    def __set_on_disk(
+        self, *, cache_key: str, anti_recommendations: tuple[AntiRecommendation, ...]
+    ) -> None:
+        """Cache anti_recommendations on disk under cache_key."""
+
+        if self.__disk_cache is not None:
+            self.__disk_cache.set(
+                cache_key,
+                _ANTI_RECOMMENDATIONS_ADAPTER.dump_json(anti_recommendations).decode(),
+            )
+
+    def get(self, *, record_key: RecordKey) -> tuple[AntiRecommendation, ...] | None:
+        """Return the cached AntiRecommendations of record_key, or None if they are not cached."""
+
+        cache_key = self.__cache_key(record_key=record_key)
+
+        anti_recommendations = self.__memory_cache.get(cache_key)
+        if anti_recommendations is not None:
+            return anti_recommendations
+
+        return self.__get_from_disk(cache_key=cache_key)
+
+    async def aget(
+        self, *, record_key: RecordKey
+    ) -> tuple[AntiRecommendation, ...] | None:
+        """Return the cached AntiRecommendations of record_key without blocking the event loop, or None if they are not cached."""
+
+        cache_key = self.__cache_key(record_key=record_key)
+
+        anti_recommendations = self.__memory_cache.get(cache_key)
+        if anti_recommendations is not None or self.__disk_cache is None:
+            return anti_recommendations
+
+        return await run_in_thread_pool(self.__get_from_disk, cache_key=cache_key)
+
+    def set(
+        self,
+        *,
+        record_key: RecordKey,
+        anti_recommendations: tuple[AntiRecommendation, ...],
+    ) -> None:
+        """Cache the AntiRecommendations of record_key in both tiers."""
+
+        cache_key = self.__cache_key(record_key=record_key)
+
+        self.__memory_cache.set(cache_key, anti_recommendations)
+        self.__set_on_disk(
+            cache_key=cache_key, anti_recommendations=anti_recommendations
+        )
+
+    async def aset(
+        self,
+        *,
+        record_key: RecordKey,
+        anti_recommendations: tuple[AntiRecommendation, ...],
+    ) -> None:
+        """Cache the AntiRecommendations of record_key in both tiers, without blocking the event loop."""
+
+        cache_key = self.__cache_key(record_key=record_key)
+
+        self.__memory_cache.set(cache_key, anti_recommendations)
+
+        if self.__disk_cache is not None:
+            await run_in_thread_pool(
+                self.__set_on_disk,
+                cache_key=cache_key,
+                anti_recommendations=anti_recommendations,
+            )
@@ -1,17 +1,33 @@
+import functools
+import threading
 import typing
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Iterable
+from pathlib import Path
 
+import httpx
 from langchain.prompts import PromptTemplate
 from langchain.schema import StrOutputParser
 from langchain.schema.runnable import RunnablePassthrough, RunnableSerializable
 from langchain_openai import OpenAI
-from pydantic import AnyUrl
+from openai import OpenAIError
+from pydantic import AnyUrl, SecretStr, ValidationError
 
+from app.anti_recommenders import AntiRecommenderException
 from app.anti_recommenders.openai import OpenaiAntiRecommender
+from app.anti_recommenders.openai.anti_recommendations_cache import (
+    AntiRecommendationsCache,
+)
+from app.concurrency import (
+    ConcurrencyLimiter,
+    ConcurrencyLimitException,
+    SingleFlight,
+)
+from app.constants import DEFAULT_OPENAI_MODEL_NAME
 from app.models import AntiRecommendation
 from app.models.types import NonBlankString as ModelQuery
 from app.models.types import NonBlankString as ModelResponse
 from app.models.types import RecordKey, RecordType
+from app.user import User
 
 
 class NormalOpenaiAntiRecommender(OpenaiAntiRecommender):
@@ -21,15 +37,95 @@ class NormalOpenaiAntiRecommender(OpenaiAntiRecommender):
     A NormalOpenaiAntiRecommender relies solely on the large language model's parametric knowledge to generate anti-recommendations.
     """
 
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        model_name: str = DEFAULT_OPENAI_MODEL_NAME,
+        api_key: SecretStr | None = None,
+        base_url: str | None = None,
+        cache_max_size: int = 1_000,
+        cache_ttl: float = 604_800.0,
+        cache_database_path: Path | None = None,
+        cache_database_max_size: int = 100_000,
+        http_max_connections: int = 100,
+        http_keepalive_expiry: float = 30.0,
+        request_timeout: float = 60.0,
+        max_concurrent_requests: int = 16,
+        max_waiting_requests: int = 256,
+        wait_timeout: float = 10.0,
+    ) -> None:
+        super().__init__()
+
+        self.__api_key = api_key
+        self.__base_url = base_url
+        self.__model_name = model_name
+        self.__anti_recommendations_cache = AntiRecommendationsCache(
+            template=self._template,
+            model_name=model_name,
+            max_size=cache_max_size,
+            ttl=cache_ttl,
+            database_path=cache_database_path,
+            database_max_size=cache_database_max_size,
+        )
+
+        # Pooled HTTP clients keep connections to the OpenAI API alive between requests.
+        http_limits = httpx.Limits(
+            max_connections=http_max_connections,
+            max_keepalive_connections=http_max_connections,
+            keepalive_expiry=http_keepalive_expiry,
+        )
+        self.__http_client = httpx.Client(limits=http_limits, timeout=request_timeout)
+        self.__http_async_client = httpx.AsyncClient(
+            limits=http_limits, timeout=request_timeout
+        )
+
+        self.__chain: RunnableSerializable | None = None
+        self.__chain_lock = threading.Lock()
+
+        self.__concurrency_limiter = ConcurrencyLimiter(
+            max_concurrency=max_concurrent_requests,
+            max_waiting=max_waiting_requests,
+            wait_timeout=wait_timeout,
+        )
+        self.__single_flight: SingleFlight[
+            RecordKey, tuple[AntiRecommendation, ...]
+        ] = SingleFlight()
+
     def _build_chain(self) -> RunnableSerializable:
         """Build a chain that consists of an OpenAI prompt, large language model and an output parser."""
 
-        model = OpenAI()
+        # The API key and base URL are only passed when set, so that OpenAI falls back to its environment variables.
+        optional_model_arguments: dict[str, typing.Any] = {}
+        if self.__api_key:
+            optional_model_arguments["api_key"] = self.__api_key.get_secret_value()
+        if self.__base_url:
+            optional_model_arguments["base_url"] = self.__base_url
+
+        model = OpenAI(
+            model=self.__model_name,
+            http_client=self.__http_client,
+            http_async_client=self.__http_async_client,
+            **optional_model_arguments,
+        )
 
         prompt = PromptTemplate.from_template(self._template)
 
         return {"question": RunnablePassthrough()} | prompt | model | StrOutputParser()
 
+    def __shared_chain(self) -> RunnableSerializable:
+        """
+        Return the chain that is shared by every request, and build it on first use.
+
+        A chain holds no per-request state, so it can be invoked by concurrent requests.
+        """
+
+        if self.__chain is None:
+            with self.__chain_lock:
+                if self.__chain is None:
+                    self.__chain = self._build_chain()
+
+        return self.__chain
+
     def _generate_llm_response(
         self, open_ai_query: ModelQuery, open_ai_chain: RunnableSerializable
     ) -> ModelResponse:
@@ -37,39 +133,215 @@ class NormalOpenaiAntiRecommender(OpenaiAntiRecommender):
 
         return str(open_ai_chain.invoke(open_ai_query))
 
+    async def _agenerate_llm_response(
+        self, open_ai_query: ModelQuery, open_ai_chain: RunnableSerializable
+    ) -> ModelResponse:
+        """Invoke the OpenAI large language model without blocking the event loop, and generate a response."""
+
+        return str(await open_ai_chain.ainvoke(open_ai_query))
+
+    async def _astream_llm_response(
+        self, open_ai_query: ModelQuery, open_ai_chain: RunnableSerializable
+    ) -> AsyncIterator[str]:
+        """Invoke the OpenAI large language model without blocking the event loop, and yield its response as it is generated."""
+
+        async for llm_response_chunk in open_ai_chain.astream(open_ai_query):
+            yield str(llm_response_chunk)
+
+    def _parse_llm_response_line(self, line: str) -> AntiRecommendation | None:
+        """
+        Extract an anti-recommendation from a line of an OpenAI large language model's response, or return None if the line holds none.
+
+        A line whose title or URL is not valid holds no anti-recommendation, so that it is skipped rather than failing the whole response.
+        """
+
+        model_response_length = 3
+
+        line_chunk = line.strip().split("-")
+
+        if len(line_chunk) != model_response_length:
+            return None
+
+        title = line_chunk[1].strip()
+
+        url = ""
+        if RecordType.WIKIPEDIA in line_chunk[2]:
+            url = line_chunk[2].strip()
+
+        try:
+            return AntiRecommendation(key=title, url=AnyUrl(url))
+        except ValidationError:
+            return None
+
     def _parse_llm_response(
         self, open_ai_llm_response: ModelResponse
     ) -> Iterable[AntiRecommendation]:
         """Extract anti-recommendations from open_ai_llm_response, and yield anti-recommendations."""
 
-        model_response_length = 3
+        for line in open_ai_llm_response.strip().split("\n"):
+            anti_recommendation = self._parse_llm_response_line(line)
 
-        response_list = open_ai_llm_response.strip().split("\n")
+            if anti_recommendation is not None:
+                yield anti_recommendation
 
-        for line in response_list:
-            line_chunk = line.strip().split("-")
+    @typing.override
+    def generate_anti_recommendations(
+        self,
+        *,
+        record_key: RecordKey,
+        user: User,
+    ) -> Iterable[AntiRecommendation]:
+        """
+        Return anti-recommendations of a given record_key.
 
-            if len(line_chunk) != model_response_length:
-                continue
+        The anti-recommendations of a record_key are the same for every User, and are cached once they have been parsed.
+        """
 
-            title = line_chunk[1].strip()
+        anti_recommendations = self.__anti_recommendations_cache.get(
+            record_key=record_key
+        )
+        if anti_recommendations is not None:
+            return anti_recommendations
 
-            url = ""
-            if RecordType.WIKIPEDIA in line_chunk[2]:
-                url = line_chunk[2].strip()
+        anti_recommendations = tuple(
+            self._generate_anti_recommendendations(
+                record_key=record_key,
+                build_chain=self.__shared_chain,
+                create_query=self._create_query,
+                generate_llm_response=self._generate_llm_response,
+                parse_llm_response=self._parse_llm_response,
+            )
+        )
 
-            yield AntiRecommendation(key=title, url=AnyUrl(url))
+        # A response without any anti-recommendations is not cached, so that it is retried.
+        if anti_recommendations:
+            self.__anti_recommendations_cache.set(
+                record_key=record_key, anti_recommendations=anti_recommendations
+            )
+
+        return anti_recommendations
 
     @typing.override
-    def generate_anti_recommendations(
+    async def agenerate_anti_recommendations(
+        self,
+        *,
+        record_key: RecordKey,
+        user: User,
+    ) -> tuple[AntiRecommendation, ...]:
+        """
+        Return anti-recommendations of a given record_key, without blocking the event loop.
+
+        The anti-recommendations of a record_key are the same for every User, and are cached once they have been parsed.
+        """
+
+        return await self.agenerate_shared_anti_recommendations(record_key=record_key)
+
+    async def agenerate_shared_anti_recommendations(
         self, *, record_key: RecordKey
-    ) -> Iterable[AntiRecommendation]:
-        """Yield anti-recommendations of a given record_key."""
-
-        yield from self._generate_anti_recommendendations(
-            record_key=record_key,
-            build_chain=self._build_chain,
-            create_query=self._create_query,
-            generate_llm_response=self._generate_llm_response,
-            parse_llm_response=self._parse_llm_response,
+    ) -> tuple[AntiRecommendation, ...]:
+        """
+        Return the anti-recommendations of a given record_key that every User shares, without blocking the event loop.
+
+        An AntiRecommenderException is raised if there is no turn available, or if the OpenAI API fails.
+        """
+
+        anti_recommendations = await self.__anti_recommendations_cache.aget(
+            record_key=record_key
+        )
+        if anti_recommendations is not None:
+            return anti_recommendations
+
+        # Concurrent requests for the same record_key share a single completion.
+        return await self.__single_flight.run(
+            record_key,
+            functools.partial(
+                self.__agenerate_uncached_anti_recommendations, record_key=record_key
+            ),
         )
+
+    async def __agenerate_uncached_anti_recommendations(
+        self, *, record_key: RecordKey
+    ) -> tuple[AntiRecommendation, ...]:
+        """
+        Wait for a turn to invoke the large language model, and cache the anti-recommendations it returns.
+
+        An AntiRecommenderException is raised if there is no turn available, or if the OpenAI API fails.
+        """
+
+        # A previous single flight may have cached the anti-recommendations since they were last looked up.
+        anti_recommendations = await self.__anti_recommendations_cache.aget(
+            record_key=record_key
+        )
+        if anti_recommendations is not None:
+            return anti_recommendations
+
+        try:
+            async with self.__concurrency_limiter.limit():
+                anti_recommendations = await self._agenerate_anti_recommendations(
+                    record_key=record_key,
+                    build_chain=self.__shared_chain,
+                    create_query=self._create_query,
+                    agenerate_llm_response=self._agenerate_llm_response,
+                    parse_llm_response=self._parse_llm_response,
+                )
+        except (ConcurrencyLimitException, OpenAIError) as exception:
+            raise AntiRecommenderException from exception
+
+        if anti_recommendations:
+            await self.__anti_recommendations_cache.aset(
+                record_key=record_key, anti_recommendations=anti_recommendations
+            )
+
+        return anti_recommendations
+
+    @typing.override
+    async def astream_anti_recommendations(
+        self,
+        *,
+        record_key: RecordKey,
+        user: User,
+    ) -> AsyncIterator[AntiRecommendation]:
+        """
+        Yield anti-recommendations of a given record_key as soon as their line of the large language model's response is complete.
+
+        Cached anti-recommendations are yielded at once, and anti-recommendations are cached once the response is complete.
+
+        An AntiRecommenderException is raised if there is no turn available, or if the OpenAI API fails.
+        """
+
+        cached_anti_recommendations = await self.__anti_recommendations_cache.aget(
+            record_key=record_key
+        )
+        if cached_anti_recommendations is not None:
+            for anti_recommendation in cached_anti_recommendations:
+                yield anti_recommendation
+            return
+
+        anti_recommendations: list[AntiRecommendation] = []
+
+        try:
+            async with self.__concurrency_limiter.limit():
+                async for anti_recommendation in self._astream_anti_recommendations(
+                    record_key=record_key,
+                    build_chain=self.__shared_chain,
+                    create_query=self._create_query,
+                    astream_llm_response=self._astream_llm_response,
+                    parse_llm_response_line=self._parse_llm_response_line,
+                ):
+                    anti_recommendations.append(anti_recommendation)
+                    yield anti_recommendation
+        except (ConcurrencyLimitException, OpenAIError) as exception:
+            raise AntiRecommenderException from exception
+
+        if anti_recommendations:
+            await self.__anti_recommendations_cache.aset(
+                record_key=record_key,
+                anti_recommendations=tuple(anti_recommendations),
+            )
+
+    @typing.override
+    async def aclose(self) -> None:
+        """Close the pooled HTTP clients."""
+
+        self.__http_client.close()
+        await self.__http_async_client.aclose()
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from collections.abc import Callable, Iterable
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
 
 from langchain.schema.runnable import RunnableSerializable
 
@@ -8,6 +8,7 @@ from app.models import AntiRecommendation
 from app.models.types import NonBlankString as ModelQuery
 from app.models.types import NonBlankString as ModelResponse
 from app.models.types import RecordKey
+from app.user import User
 
 
 class OpenaiAntiRecommender(AntiRecommender):
@@ -58,9 +59,67 @@ class OpenaiAntiRecommender(AntiRecommender):
 
         yield from parse_llm_response(generate_open_ai_llm_response)
 
+    async def _agenerate_anti_recommendations(
+        self,
+        *,
+        record_key: RecordKey,
+        build_chain: Callable[[], RunnableSerializable],
+        create_query: Callable[[RecordKey], ModelQuery],
+        agenerate_llm_response: Callable[
+            [ModelQuery, RunnableSerializable], Awaitable[ModelResponse]
+        ],
+        parse_llm_response: Callable[[ModelResponse], Iterable[AntiRecommendation]],
+    ) -> tuple[AntiRecommendation, ...]:
+        """Create a generalized workflow that awaits a large language model, and returns anti-recommendations."""
+
+        open_ai_chain = build_chain()
+        open_ai_query = create_query(record_key)
+        open_ai_llm_response = await agenerate_llm_response(
+            open_ai_query, open_ai_chain
+        )
+
+        return tuple(parse_llm_response(open_ai_llm_response))
+
+    async def _astream_anti_recommendations(
+        self,
+        *,
+        record_key: RecordKey,
+        build_chain: Callable[[], RunnableSerializable],
+        create_query: Callable[[RecordKey], ModelQuery],
+        astream_llm_response: Callable[
+            [ModelQuery, RunnableSerializable], AsyncIterator[str]
+        ],
+        parse_llm_response_line: Callable[[str], AntiRecommendation | None],
+    ) -> AsyncIterator[AntiRecommendation]:
+        """
+        Create a generalized workflow that streams a large language model's response, and yields anti-recommendations.
+
+        Chunks of the response are buffered until a line is complete, so that each anti-recommendation is yielded as soon as its line arrives.
+        """
+
+        open_ai_chain = build_chain()
+        open_ai_query = create_query(record_key)
+
+        incomplete_line = ""
+        async for llm_response_chunk in astream_llm_response(
+            open_ai_query, open_ai_chain
+        ):
+            *complete_lines, incomplete_line = (
+                incomplete_line + llm_response_chunk
+            ).split("\n")
+
+            for line in complete_lines:
+                anti_recommendation = parse_llm_response_line(line)
+                if anti_recommendation is not None:
+                    yield anti_recommendation
+
+        anti_recommendation = parse_llm_response_line(incomplete_line)
+        if anti_recommendation is not None:
+            yield anti_recommendation
+
     @abstractmethod
     def generate_anti_recommendations(
-        self, *, record_key: RecordKey
+        self, *, record_key: RecordKey, user: User
     ) -> Iterable[AntiRecommendation]:
-        """Generate anti-recommendations of a record_key."""
+        """Generate anti-recommendations of a record_key for a User."""
         raise NotImplementedError
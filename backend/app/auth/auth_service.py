@@ -1,11 +1,17 @@
 from abc import ABC, abstractmethod
 
 from app.auth import AuthResponse, UserResponse
+from app.concurrency import run_in_thread_pool
 from app.models import AuthToken, Credentials
 
 
 class AuthService(ABC):
-    """An interface to authenticate a User on the NerdSwipe backend."""
+    """
+    An interface to authenticate a User on the NerdSwipe backend.
+
+    Every method has an async counterpart that does not block the event loop.
+    By default, an async counterpart runs its synchronous method on the bounded thread pool.
+    """
 
     @abstractmethod
     def get_user(self, *, authentication_token: AuthToken) -> UserResponse:
@@ -26,3 +32,34 @@ class AuthService(ABC):
     @abstractmethod
     def sign_up(self, *, authentication_credentials: Credentials) -> AuthResponse:
         raise NotImplementedError
+
+    def revoke(self, *, authentication_token: AuthToken) -> None:  # noqa: B027
+        """Reject authentication_token from now on. By default, access tokens are not revoked locally."""
+
+    async def aget_user(self, *, authentication_token: AuthToken) -> UserResponse:
+        return await run_in_thread_pool(
+            self.get_user, authentication_token=authentication_token
+        )
+
+    async def asign_in(
+        self, *, authentication_credentials: Credentials
+    ) -> AuthResponse:
+        return await run_in_thread_pool(
+            self.sign_in, authentication_credentials=authentication_credentials
+        )
+
+    async def asign_in_anonymously(self) -> AuthResponse:
+        return await run_in_thread_pool(self.sign_in_anonymously)
+
+    async def asign_out(self) -> None:
+        await run_in_thread_pool(self.sign_out)
+
+    async def arevoke(self, *, authentication_token: AuthToken) -> None:
+        await run_in_thread_pool(self.revoke, authentication_token=authentication_token)
+
+    async def asign_up(
+        self, *, authentication_credentials: Credentials
+    ) -> AuthResponse:
+        return await run_in_thread_pool(
+            self.sign_up, authentication_credentials=authentication_credentials
+        )
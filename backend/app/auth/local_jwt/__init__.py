@@ -0,0 +1,4 @@
+# isort: skip_file
+
+from .local_jwt_user_response import LocalJwtUserResponse as LocalJwtUserResponse
+from .local_jwt_auth_service import LocalJwtAuthService as LocalJwtAuthService
@@ -0,0 +1,328 @@
+import hashlib
+import heapq
+import threading
+import time
+from typing import Any, override
+from uuid import UUID
+
+import jwt
+
+from app.auth import (
+    AuthException,
+    AuthResponse,
+    AuthService,
+    UserResponse,
+)
+from app.auth.local_jwt import LocalJwtUserResponse
+from app.caches import TtlCache
+from app.concurrency import run_in_thread_pool
+from app.models import AuthToken, Credentials, Settings
+
+
+class _RevokedAccessTokens:
+    """
+    The hashes of revoked access tokens, each kept until its access token expires.
+
+    A _RevokedAccessTokens consists of:
+        - __expiry_times: A dictionary of type str: float, that holds the expiry time of each revoked access token hash, in seconds since the epoch.
+        - __expiry_heap: A heap of (expiry time, access token hash) tuples, that finds the revocations to drop once their access tokens have expired.
+        - __lock: A lock that guards both.
+
+    Entries are never evicted to make room, so a revoked access token is rejected for as long as its signature would be accepted.
+    Only access tokens whose signature and expiry have been verified are added, so their number is bounded by the access tokens that were issued.
+    """
+
+    def __init__(self) -> None:
+        self.__expiry_times: dict[str, float] = {}
+        self.__expiry_heap: list[tuple[float, str]] = []
+        self.__lock = threading.Lock()
+
+    def is_revoked(self, *, access_token_hash: str) -> bool:
+        """Return whether the access token of access_token_hash is revoked, and has not expired."""
+
+        with self.__lock:
+            expiry_time = self.__expiry_times.get(access_token_hash)
+
+        return expiry_time is not None and expiry_time > time.time()
+
+    def add(self, *, access_token_hash: str, expiry_time: float) -> None:
+        """Revoke an access token until expiry_time, and drop the revocations of access tokens that have expired."""
+
+        with self.__lock:
+            now = time.time()
+            while self.__expiry_heap and self.__expiry_heap[0][0] <= now:
+                _, expired_access_token_hash = heapq.heappop(self.__expiry_heap)
+                if self.__expiry_times.get(expired_access_token_hash, now) <= now:
+                    self.__expiry_times.pop(expired_access_token_hash, None)
+
+            if expiry_time > self.__expiry_times.get(access_token_hash, now):
+                self.__expiry_times[access_token_hash] = expiry_time
+                heapq.heappush(self.__expiry_heap, (expiry_time, access_token_hash))
+
+
+class LocalJwtAuthService(AuthService):
+    """
+    A concrete implementation of AuthService.
+
+    A LocalJwtAuthService verifies the signature, expiry and audience of access tokens locally,
+    and delegates every other operation to another AuthService.
+
+    Access tokens are verified against a shared secret, or against the signing keys of a cached JWKS.
+    The other AuthService is only asked for a User when neither is configured, or when an access token is empty.
+
+    Verified users are kept in a bounded TTL cache that is keyed by the hash of an access token,
+    and revoked access tokens are rejected until they expire.
+
+    Revocations are held in the memory of the process, so an access token that is revoked in one worker process is still accepted by the others.
+    """
+
+    def __init__(self, *, auth_service: AuthService, settings: Settings) -> None:
+        self.__auth_service = auth_service
+        self.__audience = settings.auth_jwt_audience
+        self.__cache_ttl = settings.auth_cache_ttl
+        self.__secret = settings.auth_jwt_secret
+        self.__jwks_client: jwt.PyJWKClient | None = (
+            jwt.PyJWKClient(str(settings.auth_jwks_url), cache_keys=True)
+            if settings.auth_jwks_url
+            else None
+        )
+        self.__user_responses: TtlCache[str, UserResponse] = TtlCache(
+            max_size=settings.auth_cache_max_size, ttl=settings.auth_cache_ttl
+        )
+        self.__revoked_access_tokens = _RevokedAccessTokens()
+
+    @staticmethod
+    def __hash_access_token(*, access_token: str) -> str:
+        """Return the SHA-256 hex digest of an access token."""
+
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    @staticmethod
+    def __seconds_until_expiry(*, access_token: str) -> float | None:
+        """Return the number of seconds until an access token expires, or None if it has no expiry claim."""
+
+        try:
+            expiry_time = jwt.decode(
+                access_token, options={"verify_signature": False}
+            ).get("exp")
+        except jwt.PyJWTError:
+            return None
+
+        return float(expiry_time) - time.time() if expiry_time else None
+
+    def __verify_access_token(self, *, access_token: str) -> dict[str, Any] | None:
+        """
+        Verify the signature, expiry and audience of an access token, and return its claims.
+
+        None is returned if no secret or JWKS is configured.
+        """
+
+        if self.__secret:
+            key: Any = self.__secret.get_secret_value()
+            algorithms = ["HS256"]
+        elif self.__jwks_client:
+            try:
+                key = self.__jwks_client.get_signing_key_from_jwt(access_token).key
+            except jwt.PyJWTError as exception:
+                raise AuthException from exception
+            algorithms = ["RS256", "ES256"]
+        else:
+            return None
+
+        try:
+            claims: dict[str, Any] = jwt.decode(
+                access_token,
+                key,
+                algorithms=algorithms,
+                audience=self.__audience,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as exception:
+            raise AuthException from exception
+
+        try:
+            UUID(claims["sub"])
+        except (KeyError, TypeError, ValueError) as exception:
+            raise AuthException from exception
+
+        return claims
+
+    def __cached_user_response(self, *, access_token_hash: str) -> UserResponse | None:
+        """Return the cached user of an access token, or None if it is not cached. An AuthException is raised if the access token was revoked."""
+
+        if self.__revoked_access_tokens.is_revoked(access_token_hash=access_token_hash):
+            raise AuthException
+
+        return self.__user_responses.get(access_token_hash)
+
+    def __cache_user_response(
+        self, *, access_token: str, access_token_hash: str, user_response: UserResponse
+    ) -> None:
+        """Cache a verified user. A cached user never outlives the access token it was verified from, nor the cache's time-to-live."""
+
+        seconds_until_expiry = self.__seconds_until_expiry(access_token=access_token)
+        if seconds_until_expiry is None:
+            self.__user_responses.set(access_token_hash, user_response)
+        elif seconds_until_expiry > 0:
+            self.__user_responses.set(
+                access_token_hash,
+                user_response,
+                ttl=min(self.__cache_ttl, seconds_until_expiry),
+            )
+
+    @override
+    def get_user(self, *, authentication_token: AuthToken) -> UserResponse:
+        """Return a UserResponse containing the user that corresponds to authentication_token."""
+
+        access_token = authentication_token.access_token.get_secret_value()
+
+        if not access_token:
+            return self.__auth_service.get_user(
+                authentication_token=authentication_token
+            )
+
+        access_token_hash = self.__hash_access_token(access_token=access_token)
+
+        user_response = self.__cached_user_response(access_token_hash=access_token_hash)
+        if user_response:
+            return user_response
+
+        claims = self.__verify_access_token(access_token=access_token)
+        user_response = (
+            LocalJwtUserResponse(claims=claims)
+            if claims
+            else self.__auth_service.get_user(authentication_token=authentication_token)
+        )
+
+        self.__cache_user_response(
+            access_token=access_token,
+            access_token_hash=access_token_hash,
+            user_response=user_response,
+        )
+
+        return user_response
+
+    @override
+    async def aget_user(self, *, authentication_token: AuthToken) -> UserResponse:
+        """
+        Return a UserResponse containing the user that corresponds to authentication_token, without blocking the event loop.
+
+        Cached users and access tokens that are verified against a shared secret are handled on the event loop.
+        """
+
+        access_token = authentication_token.access_token.get_secret_value()
+
+        if not access_token:
+            return await self.__auth_service.aget_user(
+                authentication_token=authentication_token
+            )
+
+        access_token_hash = self.__hash_access_token(access_token=access_token)
+
+        user_response = self.__cached_user_response(access_token_hash=access_token_hash)
+        if user_response:
+            return user_response
+
+        # Fetching the signing keys of a JWKS may block on the network.
+        claims = (
+            await run_in_thread_pool(
+                self.__verify_access_token, access_token=access_token
+            )
+            if self.__jwks_client and not self.__secret
+            else self.__verify_access_token(access_token=access_token)
+        )
+        user_response = (
+            LocalJwtUserResponse(claims=claims)
+            if claims
+            else await self.__auth_service.aget_user(
+                authentication_token=authentication_token
+            )
+        )
+
+        self.__cache_user_response(
+            access_token=access_token,
+            access_token_hash=access_token_hash,
+            user_response=user_response,
+        )
+
+        return user_response
+
+    @override
+    def revoke(self, *, authentication_token: AuthToken) -> None:
+        """
+        Reject authentication_token until it expires, even though its signature is still valid.
+
+        An AuthException is raised if the signature, expiry or audience of authentication_token is not valid, so that only issued access tokens are held.
+        If access tokens are not verified locally, only the cached user of authentication_token is dropped.
+        """
+
+        access_token = authentication_token.access_token.get_secret_value()
+        access_token_hash = self.__hash_access_token(access_token=access_token)
+
+        claims = self.__verify_access_token(access_token=access_token)
+
+        self.__user_responses.pop(access_token_hash)
+        if claims:
+            self.__revoked_access_tokens.add(
+                access_token_hash=access_token_hash, expiry_time=float(claims["exp"])
+            )
+
+    @override
+    def sign_in(self, *, authentication_credentials: Credentials) -> AuthResponse:
+        """Sign in with authentication_credentials."""
+
+        return self.__auth_service.sign_in(
+            authentication_credentials=authentication_credentials
+        )
+
+    @override
+    def sign_in_anonymously(self) -> AuthResponse:
+        """Sign in anonymously."""
+
+        return self.__auth_service.sign_in_anonymously()
+
+    @override
+    def sign_out(self) -> None:
+        """Sign out."""
+
+        self.__auth_service.sign_out()
+
+    @override
+    def sign_up(self, *, authentication_credentials: Credentials) -> AuthResponse:
+        """Sign up with authentication_credentials."""
+
+        return self.__auth_service.sign_up(
+            authentication_credentials=authentication_credentials
+        )
+
+    @override
+    async def asign_in(
+        self, *, authentication_credentials: Credentials
+    ) -> AuthResponse:
+        """Sign in with authentication_credentials, without blocking the event loop."""
+
+        return await self.__auth_service.asign_in(
+            authentication_credentials=authentication_credentials
+        )
+
+    @override
+    async def asign_in_anonymously(self) -> AuthResponse:
+        """Sign in anonymously, without blocking the event loop."""
+
+        return await self.__auth_service.asign_in_anonymously()
+
+    @override
+    async def asign_out(self) -> None:
+        """Sign out, without blocking the event loop."""
+
+        await self.__auth_service.asign_out()
+
+    @override
+    async def asign_up(
+        self, *, authentication_credentials: Credentials
+    ) -> AuthResponse:
+        """Sign up with authentication_credentials, without blocking the event loop."""
+
+        return await self.__auth_service.asign_up(
+            authentication_credentials=authentication_credentials
+        )
@@ -0,0 +1,20 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from app.auth import UserResponse
+from app.models.types import UserId
+
+
+@dataclass(frozen=True)
+class LocalJwtUserResponse(UserResponse):
+    """A dataclass containing the verified claims of a JWT access token."""
+
+    claims: Mapping[str, Any]
+
+    @property
+    def user_id(self) -> UserId:
+        """The user ID in the subject claim of the access token."""
+
+        return UUID(self.claims["sub"])
@@ -0,0 +1,4 @@
+from .precompute_checkpoint import PrecomputeCheckpoint as PrecomputeCheckpoint
+from .precompute_result import PrecomputeResult as PrecomputeResult
+from .arkg_precomputer import ArkgPrecomputer as ArkgPrecomputer
+from .export_arkg import export_arkg as export_arkg
@@ -0,0 +1,245 @@
+import functools
+import io
+import uuid
+from collections.abc import Iterable
+from pathlib import Path
+from urllib.parse import quote
+
+import anyio
+import pyoxigraph as ox
+from anyio.abc import ObjectReceiveStream
+from pydantic_extra_types.language_code import LanguageAlpha2
+
+from app.anti_recommenders import AntiRecommenderException
+from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
+from app.batch.precompute_checkpoint import PrecomputeCheckpoint
+from app.batch.precompute_result import PrecomputeResult
+from app.constants import WIKIPEDIA_BASE_URL
+from app.models import AntiRecommendation
+from app.models.types import RdfMimeType, RecordKey
+from app.namespaces import RDF, SCHEMA
+
+
+class ArkgPrecomputer:
+    """
+    A batch job that asks a NormalOpenaiAntiRecommender for the anti-recommendations of many Record keys,
+    and appends them to an N-Triples file in the shape that ArkgAntiRecommender reads.
+
+    An ArkgPrecomputer consists of:
+        - __anti_recommender: The NormalOpenaiAntiRecommender that generates anti-recommendations.
+        - __arkg_base_iri: The base IRI of the schema:Recommendation and schema:Thing nodes that are written.
+        - __checkpoint: A PrecomputeCheckpoint of the Record keys whose anti-recommendations have been written, or have failed.
+        - __described_record_keys: The Record keys whose article and entity have been written during the run.
+        - __language: The language of every schema:name literal.
+        - __max_attempts: The number of times a Record key is tried before it is reported as failed.
+        - __max_concurrency: The number of Record keys that are generated concurrently.
+        - __output_file: The N-Triples file, opened for appending.
+        - __retry_delay: The number of seconds to wait before the first retry. Later retries wait twice as long as the one before.
+
+    IRIs are derived from Record keys, so triples written again after an interrupted run are identical to the originals.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        anti_recommender: NormalOpenaiAntiRecommender,
+        arkg_base_iri: ox.NamedNode,
+        output_file_path: Path,
+        checkpoint_file_path: Path,
+        max_concurrency: int,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+    ) -> None:
+        output_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.__anti_recommender = anti_recommender
+        self.__arkg_base_iri = arkg_base_iri
+        self.__checkpoint = PrecomputeCheckpoint(file_path=checkpoint_file_path)
+        self.__described_record_keys: set[RecordKey] = set()
+        self.__language = LanguageAlpha2("en")
+        self.__max_attempts = max_attempts
+        self.__max_concurrency = max_concurrency
+        self.__output_file = output_file_path.open("ab")
+        self.__retry_delay = retry_delay
+
+    def __article(self, *, record_key: RecordKey) -> ox.NamedNode:
+        return ox.NamedNode(WIKIPEDIA_BASE_URL + quote(record_key))
+
+    def __entity(self, *, record_key: RecordKey) -> ox.NamedNode:
+        return ox.NamedNode(
+            self.__arkg_base_iri.value + "entity/" + quote(record_key, safe="")
+        )
+
+    def __recommendation(self, *, record_key: RecordKey) -> ox.NamedNode:
+        return ox.NamedNode(
+            self.__arkg_base_iri.value
+            + f"uuid:{uuid.uuid5(uuid.NAMESPACE_URL, self.__article(record_key=record_key).value)}"
+        )
+
+    def __description_triples(self, *, record_key: RecordKey) -> list[ox.Triple]:
+        """Return the triples that name the article and entity of record_key, unless they have been written during the run."""
+
+        if record_key in self.__described_record_keys:
+            return []
+        self.__described_record_keys.add(record_key)
+
+        article = self.__article(record_key=record_key)
+        entity = self.__entity(record_key=record_key)
+
+        return [
+            ox.Triple(entity, RDF.TYPE, SCHEMA.THING),
+            ox.Triple(article, RDF.TYPE, SCHEMA.ARTICLE),
+            ox.Triple(article, SCHEMA.ABOUT, entity),
+            ox.Triple(
+                article, SCHEMA.NAME, ox.Literal(record_key, language=self.__language)
+            ),
+        ]
+
+    def __anti_recommendation_triples(
+        self,
+        *,
+        record_key: RecordKey,
+        anti_recommendations: tuple[AntiRecommendation, ...],
+    ) -> list[ox.Triple]:
+        """Return the schema:Recommendation of record_key, and the descriptions of every article it refers to."""
+
+        recommendation = self.__recommendation(record_key=record_key)
+
+        triples = [
+            ox.Triple(recommendation, RDF.TYPE, SCHEMA.RECOMMENDATION),
+            ox.Triple(
+                recommendation, SCHEMA.ABOUT, self.__entity(record_key=record_key)
+            ),
+            *self.__description_triples(record_key=record_key),
+        ]
+
+        for anti_recommendation in anti_recommendations:
+            triples.append(
+                ox.Triple(
+                    recommendation,
+                    SCHEMA.ITEM_REVIEWED,
+                    self.__entity(record_key=anti_recommendation.key),
+                )
+            )
+            triples.extend(
+                self.__description_triples(record_key=anti_recommendation.key)
+            )
+
+        return triples
+
+    def __write(
+        self,
+        *,
+        record_key: RecordKey,
+        anti_recommendations: tuple[AntiRecommendation, ...],
+    ) -> None:
+        """Append the triples of record_key to the output file, and only then mark record_key as finished."""
+
+        n_triples = io.BytesIO()
+        ox.serialize(
+            self.__anti_recommendation_triples(
+                record_key=record_key, anti_recommendations=anti_recommendations
+            ),
+            n_triples,
+            RdfMimeType.N_TRIPLES.value,
+        )
+        self.__output_file.write(n_triples.getvalue())
+        self.__output_file.flush()
+
+        self.__checkpoint.add(record_key=record_key)
+
+    async def __generate_anti_recommendations(
+        self, *, record_key: RecordKey
+    ) -> tuple[AntiRecommendation, ...] | None:
+        """
+        Return the anti-recommendations of record_key, or None if every attempt failed.
+
+        An attempt fails if the anti-recommender raises, or if no line of its response parses as an anti-recommendation.
+        """
+
+        for attempt in range(self.__max_attempts):
+            if attempt:
+                await anyio.sleep(self.__retry_delay * 2 ** (attempt - 1))
+
+            try:
+                anti_recommendations = (
+                    await self.__anti_recommender.agenerate_shared_anti_recommendations(
+                        record_key=record_key
+                    )
+                )
+            except AntiRecommenderException:
+                continue
+
+            if anti_recommendations:
+                return anti_recommendations
+
+        return None
+
+    async def __precompute_worker(
+        self,
+        *,
+        record_keys: ObjectReceiveStream[RecordKey],
+        precomputed_record_keys: list[RecordKey],
+        failed_record_keys: list[RecordKey],
+    ) -> None:
+        """Precompute the anti-recommendations of Record keys from record_keys until it is closed."""
+
+        async with record_keys:
+            async for record_key in record_keys:
+                anti_recommendations = await self.__generate_anti_recommendations(
+                    record_key=record_key
+                )
+
+                if anti_recommendations is None:
+                    self.__checkpoint.add_failed(record_key=record_key)
+                    failed_record_keys.append(record_key)
+                    continue
+
+                # Nothing is awaited while writing, so the triples of concurrent workers never interleave.
+                self.__write(
+                    record_key=record_key, anti_recommendations=anti_recommendations
+                )
+                precomputed_record_keys.append(record_key)
+
+    async def run(self, *, record_keys: Iterable[RecordKey]) -> PrecomputeResult:
+        """Precompute the anti-recommendations of every Record key in record_keys that the checkpoint does not hold yet."""
+
+        precomputed_record_keys: list[RecordKey] = []
+        failed_record_keys: list[RecordKey] = []
+        skipped_count = 0
+
+        send_stream, receive_stream = anyio.create_memory_object_stream[RecordKey](
+            max_buffer_size=self.__max_concurrency
+        )
+
+        async with anyio.create_task_group() as task_group:
+            for _ in range(self.__max_concurrency):
+                task_group.start_soon(
+                    functools.partial(
+                        self.__precompute_worker,
+                        record_keys=receive_stream.clone(),
+                        precomputed_record_keys=precomputed_record_keys,
+                        failed_record_keys=failed_record_keys,
+                    )
+                )
+            receive_stream.close()
+
+            async with send_stream:
+                for record_key in record_keys:
+                    if record_key in self.__checkpoint:
+                        skipped_count += 1
+                        continue
+
+                    await send_stream.send(record_key)
+
+        return PrecomputeResult(
+            precomputed_count=len(precomputed_record_keys),
+            skipped_count=skipped_count,
+            failed_record_keys=tuple(failed_record_keys),
+        )
+
+    def close(self) -> None:
+        """Close the output and checkpoint files."""
+
+        self.__output_file.close()
+        self.__checkpoint.close()
@@ -0,0 +1,44 @@
+"""
+Compile the Records of every output file into a catalog snapshot, that the app memory maps on startup instead of reading the output files.
+
+The snapshot holds the SHA-256 hash of every output file it was compiled from, and the app only uses it while the output files still match.
+
+Run with: poetry run compile-catalog
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.models import Settings
+from app.readers import AllSourceReader
+from app.record_catalog import compile_catalog_snapshot
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument(
+        "--output-file-path",
+        type=Path,
+        help="The file to write the snapshot to. Defaults to CATALOG_SNAPSHOT_FILE_PATH.",
+    )
+    arguments = argument_parser.parse_args()
+
+    settings = Settings()
+    snapshot_file_path = (
+        arguments.output_file_path or settings.catalog_snapshot_file_path
+    )
+    if snapshot_file_path is None:
+        sys.exit("Either --output-file-path or CATALOG_SNAPSHOT_FILE_PATH is required.")
+
+    records_count = compile_catalog_snapshot(
+        records=AllSourceReader(settings=settings).read(),
+        source_file_paths=settings.output_file_paths,
+        snapshot_file_path=snapshot_file_path,
+    )
+
+    print(f"compiled={records_count} snapshot={snapshot_file_path}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pyoxigraph as ox
+
+from app.models.types import RdfMimeType
+
+
+def export_arkg(
+    *, n_triples_file_path: Path, output_file_path: Path, mime_type: RdfMimeType
+) -> None:
+    """
+    Serialize the ARKG in the N-Triples file at n_triples_file_path to output_file_path, in the format of mime_type.
+
+    Duplicate triples that were appended by resumed runs are removed.
+
+    The ARKG is written to a temporary file first, so that output_file_path only ever holds a complete ARKG.
+    """
+
+    store = ox.Store()
+    store.bulk_load(input=n_triples_file_path, mime_type=RdfMimeType.N_TRIPLES.value)
+
+    exporting_file_path = output_file_path.with_name(
+        output_file_path.name + ".exporting"
+    )
+    store.dump(str(exporting_file_path), mime_type.value, from_graph=ox.DefaultGraph())
+    exporting_file_path.replace(output_file_path)
@@ -0,0 +1,116 @@
+"""
+Precompute the OpenAI anti-recommendations of every Record in the catalog, and write them as an ARKG that ArkgAntiRecommender can serve.
+
+Record keys that have been written are kept in a checkpoint file, so an interrupted run resumes where it stopped when it is started again.
+
+The OpenAI API key and base URL are read from Settings, so the job can run against a local stub completion endpoint by setting OPENAI_BASE_URL.
+
+Run with: poetry run precompute-arkg --output-file-path wikipedia_arkg_file.ttl
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import anyio
+
+from app.anti_recommenders import create_anti_recommender
+from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
+from app.batch import ArkgPrecomputer, PrecomputeResult, export_arkg
+from app.models import Settings
+from app.models.types import AntiRecommenderType, RdfMimeType, RecordKey
+from app.record_catalog import create_record_catalog
+
+
+async def _precompute(
+    *,
+    anti_recommender: NormalOpenaiAntiRecommender,
+    arguments: argparse.Namespace,
+    n_triples_file_path: Path,
+    record_keys: tuple[RecordKey, ...],
+    settings: Settings,
+) -> PrecomputeResult:
+    """Run an ArkgPrecomputer over record_keys, and release its files and the AntiRecommender's HTTP clients afterwards."""
+
+    arkg_precomputer = ArkgPrecomputer(
+        anti_recommender=anti_recommender,
+        arkg_base_iri=settings.arkg_base_iri,
+        output_file_path=n_triples_file_path,
+        checkpoint_file_path=arguments.checkpoint_file_path
+        or arguments.output_file_path.with_name(
+            arguments.output_file_path.name + ".checkpoint"
+        ),
+        max_concurrency=arguments.concurrency,
+        max_attempts=arguments.max_attempts,
+    )
+
+    try:
+        return await arkg_precomputer.run(record_keys=record_keys)
+    finally:
+        arkg_precomputer.close()
+        await anti_recommender.aclose()
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--output-file-path", type=Path, required=True)
+    argument_parser.add_argument("--checkpoint-file-path", type=Path)
+    argument_parser.add_argument(
+        "--mime-type",
+        type=RdfMimeType,
+        choices=list(RdfMimeType),
+        default=RdfMimeType.TURTLE,
+    )
+    argument_parser.add_argument("--concurrency", type=int, default=16)
+    argument_parser.add_argument("--max-attempts", type=int, default=3)
+    argument_parser.add_argument("--limit", type=int)
+    arguments = argument_parser.parse_args()
+
+    # The AntiRecommender's own limit is raised to the job's concurrency, so that no request is turned away.
+    settings = Settings()
+    record_catalog = create_record_catalog(settings=settings)
+    anti_recommender = create_anti_recommender(
+        record_catalog=record_catalog,
+        settings=settings.model_copy(
+            update={
+                "anti_recommender_type": AntiRecommenderType.OPEN_AI,
+                "openai_max_concurrent_requests": arguments.concurrency,
+                "openai_max_waiting_requests": arguments.concurrency,
+            }
+        ),
+    )
+    if not isinstance(anti_recommender, NormalOpenaiAntiRecommender):
+        sys.exit("An OpenAI API key is required to precompute anti-recommendations.")
+
+    n_triples_file_path = arguments.output_file_path.with_name(
+        arguments.output_file_path.name + ".partial.nt"
+    )
+
+    precompute_result = anyio.run(
+        lambda: _precompute(
+            anti_recommender=anti_recommender,
+            arguments=arguments,
+            n_triples_file_path=n_triples_file_path,
+            record_keys=record_catalog.sorted_record_keys[: arguments.limit],
+            settings=settings,
+        )
+    )
+
+    print(  # noqa: T201
+        f"precomputed={precompute_result.precomputed_count} "
+        f"skipped={precompute_result.skipped_count} "
+        f"failed={len(precompute_result.failed_record_keys)}"
+    )
+
+    if precompute_result.failed_record_keys:
+        sys.exit("Some Record keys failed. Run the job again to retry them.")
+
+    export_arkg(
+        n_triples_file_path=n_triples_file_path,
+        output_file_path=arguments.output_file_path,
+        mime_type=arguments.mime_type,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import TextIO
+
+from app.models.types import RecordKey
+
+_FAILED_STATUS = "failed"
+
+
+class PrecomputeCheckpoint:
+    """
+    An append-only file of the Record keys that a batch job has finished, or has failed.
+
+    A PrecomputeCheckpoint consists of:
+        - __completed_record_keys: The finished Record keys that were read from the file, or added since it was opened.
+        - __failed_record_keys: The failed Record keys that were read from the file, or added since it was opened.
+        - __file: The checkpoint file, opened for appending. It holds one Record key per line, followed by a tab and "failed" if the Record key failed.
+
+    A Record key is flushed to the file as soon as it is added, so that a job that stops can resume where it left off.
+    Failed Record keys are not finished, so they are retried when the job is resumed.
+    """
+
+    def __init__(self, *, file_path: Path) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.__completed_record_keys: set[RecordKey] = set()
+        self.__failed_record_keys: set[RecordKey] = set()
+        if file_path.exists():
+            with file_path.open(encoding="utf-8") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+
+                    record_key, _, status = line.rstrip("\n").partition("\t")
+                    if status == _FAILED_STATUS:
+                        self.__failed_record_keys.add(record_key)
+                    else:
+                        self.__completed_record_keys.add(record_key)
+
+        self.__file: TextIO = file_path.open("a", encoding="utf-8")
+
+    def __contains__(self, record_key: object) -> bool:
+        return record_key in self.__completed_record_keys
+
+    def __len__(self) -> int:
+        return len(self.__completed_record_keys)
+
+    @property
+    def failed_record_keys(self) -> frozenset[RecordKey]:
+        """The Record keys that have failed, and have not been finished since."""
+
+        return frozenset(self.__failed_record_keys - self.__completed_record_keys)
+
+    def add(self, *, record_key: RecordKey) -> None:
+        """Mark record_key as finished, and flush it to the checkpoint file."""
+
+        self.__completed_record_keys.add(record_key)
+        self.__file.write(record_key + "\n")
+        self.__file.flush()
+
+    def add_failed(self, *, record_key: RecordKey) -> None:
+        """Mark record_key as failed, and flush it to the checkpoint file."""
+
+        self.__failed_record_keys.add(record_key)
+        self.__file.write(f"{record_key}\t{_FAILED_STATUS}\n")
+        self.__file.flush()
+
+    def close(self) -> None:
+        """Close the checkpoint file."""
+
+        self.__file.close()
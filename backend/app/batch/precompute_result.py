@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+from app.models.types import RecordKey
+
+
+@dataclass(frozen=True)
+class PrecomputeResult:
+    """
+    A dataclass containing the outcome of an ArkgPrecomputer run.
+
+    `precomputed_count` is the number of Record keys whose anti-recommendations were written during the run.
+
+    `skipped_count` is the number of Record keys that a previous run had already finished.
+
+    `failed_record_keys` are the Record keys that still failed after every attempt. They are retried when the run is resumed.
+    """
+
+    precomputed_count: int
+    skipped_count: int
+    failed_record_keys: tuple[RecordKey, ...]
@@ -0,0 +1,69 @@
+"""
+Measure how long CategoryIndex.filter takes to filter a set of candidate Records by broad and narrow categories.
+
+A CategoryIndex of --records synthetic RecordKeys is built, where each Record is in a broad category that holds every Record,
+a category that holds one Record in ten, and one of many narrow categories. --candidates random RecordKeys are then
+filtered --iterations times by each kind of filter.
+
+Run with: poetry run python -m app.benchmarks.category_index_benchmark
+"""
+
+import argparse
+import random
+import time
+
+from app.record_catalog import CategoryIndex
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--records", type=int, default=1_000_000)
+    argument_parser.add_argument("--candidates", type=int, default=10)
+    argument_parser.add_argument("--iterations", type=int, default=10_000)
+    arguments = argument_parser.parse_args()
+
+    record_keys = tuple(
+        sorted(f"Article_{index}" for index in range(arguments.records))
+    )
+    narrow_categories = [f"Narrow {index}" for index in range(10_000)]
+
+    start_time = time.perf_counter()
+    category_index = CategoryIndex(
+        sorted_record_keys=record_keys,
+        record_category_texts=(
+            [
+                "Broad",
+                *(["Tenth"] if position % 10 == 0 else []),
+                narrow_categories[position % len(narrow_categories)],
+            ]
+            for position in range(len(record_keys))
+        ),
+    )
+    print(  # noqa: T201
+        f"{arguments.records} records, built in {time.perf_counter() - start_time:.2f} s"
+    )
+
+    candidates = random.sample(record_keys, arguments.candidates)
+
+    for name, include_categories, exclude_categories in (
+        ("include broad", ("Broad",), ()),
+        ("include tenth", ("Tenth",), ()),
+        ("include narrow", ("Narrow 1", "Narrow 2", "Narrow 3"), ()),
+        ("broad - tenth", ("Broad",), ("Tenth",)),
+    ):
+        start_time = time.perf_counter()
+        for _ in range(arguments.iterations):
+            category_index.filter(
+                record_keys=candidates,
+                include_categories=include_categories,
+                exclude_categories=exclude_categories,
+            )
+        elapsed_time = time.perf_counter() - start_time
+
+        print(  # noqa: T201
+            f"{name:<15} {elapsed_time / arguments.iterations * 1_000_000:8.1f} us per filter"
+        )
+
+
+if __name__ == "__main__":
+    main()
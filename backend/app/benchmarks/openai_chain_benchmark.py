@@ -0,0 +1,123 @@
+"""
+Compare rebuilding a LangChain chain and OpenAI client for every request with NormalOpenaiAntiRecommender's shared chain.
+
+Both variants call a local StubCompletionServer, so only client-side overhead and connection setup are measured.
+
+Run with: poetry run python -m app.benchmarks.openai_chain_benchmark
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.prompts import PromptTemplate
+from langchain.schema import StrOutputParser
+from langchain.schema.runnable import RunnablePassthrough, RunnableSerializable
+from langchain_openai import OpenAI
+from pydantic import SecretStr
+
+from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
+from app.benchmarks.stub_completion_server import (
+    StubCompletionServer,
+    run_stub_completion_server,
+)
+from app.models.types import RecordKey
+from app.user import User
+
+STUB_API_KEY = "sk-stub"
+
+
+def _rebuild_chain_per_request(
+    *, anti_recommender: NormalOpenaiAntiRecommender, server: StubCompletionServer
+) -> Callable[[RecordKey], object]:
+    """Return a function that builds a new chain and OpenAI client for every request, like NormalOpenaiAntiRecommender used to."""
+
+    def generate(record_key: RecordKey) -> object:
+        chain: RunnableSerializable = (
+            {"question": RunnablePassthrough()}
+            | PromptTemplate.from_template(anti_recommender._template)  # noqa: SLF001
+            | OpenAI(api_key=STUB_API_KEY, base_url=server.base_url)  # type: ignore[arg-type]
+            | StrOutputParser()
+        )
+        return chain.invoke(anti_recommender._create_query(record_key))  # noqa: SLF001
+
+    return generate
+
+
+def _reuse_shared_chain(
+    *, anti_recommender: NormalOpenaiAntiRecommender
+) -> Callable[[RecordKey], object]:
+    """Return a function that generates anti-recommendations with the shared chain of anti_recommender."""
+
+    user = User(id=None, _service=None)  # type: ignore[arg-type]
+
+    def generate(record_key: RecordKey) -> object:
+        return anti_recommender.generate_anti_recommendations(
+            record_key=record_key, user=user
+        )
+
+    return generate
+
+
+def _run(
+    *,
+    name: str,
+    generate: Callable[[RecordKey], object],
+    server: StubCompletionServer,
+    requests_count: int,
+    concurrency: int,
+) -> None:
+    """Send requests_count requests with generate from concurrency threads, and print the throughput and new connections."""
+
+    connections_count = server.connections_count
+    # Every request uses a new record key, so that no anti-recommendations are served from the cache.
+    record_keys = [
+        f"{name}_{time.monotonic_ns()}_{index}" for index in range(requests_count)
+    ]
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        tuple(executor.map(generate, record_keys))
+    elapsed_time = time.perf_counter() - start_time
+
+    print(  # noqa: T201
+        f"{name:<24} concurrency={concurrency:<3} "
+        f"{requests_count / elapsed_time:8.1f} requests/s "
+        f"{elapsed_time / requests_count * 1000:7.2f} ms/request "
+        f"{server.connections_count - connections_count:5} new connections"
+    )
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--requests", type=int, default=500)
+    argument_parser.add_argument("--response-delay", type=float, default=0.0)
+    arguments = argument_parser.parse_args()
+
+    with run_stub_completion_server(response_delay=arguments.response_delay) as server:
+        anti_recommender = NormalOpenaiAntiRecommender(
+            api_key=SecretStr(STUB_API_KEY), base_url=server.base_url
+        )
+
+        for concurrency in (1, 16):
+            _run(
+                name="rebuild per request",
+                generate=_rebuild_chain_per_request(
+                    anti_recommender=anti_recommender, server=server
+                ),
+                server=server,
+                requests_count=arguments.requests,
+                concurrency=concurrency,
+            )
+            _run(
+                name="shared chain",
+                generate=_reuse_shared_chain(anti_recommender=anti_recommender),
+                server=server,
+                requests_count=arguments.requests,
+                concurrency=concurrency,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compare reading a large Wikipedia output file in process with reading it in a pool of worker processes.
+
+A synthetic output file of --records records is written to a temporary directory, and read by AllSourceReader with each --max-workers value.
+
+Run with: poetry run python -m app.benchmarks.reader_benchmark
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.models import Settings
+from app.readers import AllSourceReader
+
+
+def write_wikipedia_output_file(*, file_path: Path, records_count: int) -> None:
+    """Write a Wikipedia output file of records_count records, shaped like the output of the Wikipedia scraper."""
+
+    with file_path.open("w", encoding="utf-8") as output_file:
+        output_file.write(json.dumps({"type": "STATE", "value": {}}) + "\n")
+
+        for index in range(records_count):
+            title = f"Article_{index}"
+            output_file.write(
+                json.dumps(
+                    {
+                        "type": "RECORD",
+                        "record": {
+                            "abstract_info": {
+                                "title": title,
+                                "abstract": f"The abstract of Article {index}, with a touch of ümlaut and café.",
+                                "url": f"https://en.wikipedia.org/wiki/{title}",
+                            },
+                            "categories": [
+                                {
+                                    "text": f"Category {index % 100}",
+                                    "link": f"https://en.wikipedia.org/wiki/Category:Category_{index % 100}",
+                                },
+                                {
+                                    "text": f"Personnalités de l'Île-de-France {index % 50}",
+                                    "link": f"https://fr.wikipedia.org/wiki/Catégorie:Île-de-France_{index % 50}",
+                                },
+                                {
+                                    "text": f"{1800 + index % 200} births",
+                                    "link": f"https://en.wikipedia.org/wiki/Category:{1800 + index % 200}_births",
+                                },
+                            ],
+                            "externallinks": [
+                                {
+                                    "title": "X",
+                                    "link": "https://en.wikipedia.org/wiki/X",
+                                }
+                            ],
+                        },
+                    }
+                )
+                + "\n"
+            )
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--records", type=int, default=200_000)
+    argument_parser.add_argument(
+        "--max-workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    arguments = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        file_path = Path(directory_name) / "wikipedia.output.txt"
+        write_wikipedia_output_file(
+            file_path=file_path, records_count=arguments.records
+        )
+
+        for max_workers in arguments.max_workers:
+            settings = Settings(reader_max_workers=max_workers)
+            # The validator of output_file_paths resolves file names in the data directory, so the path is set afterwards.
+            settings.output_file_paths = frozenset([file_path])
+
+            start_time = time.perf_counter()
+            records_count = sum(1 for _ in AllSourceReader(settings=settings).read())
+            elapsed_time = time.perf_counter() - start_time
+
+            print(  # noqa: T201
+                f"max_workers={max_workers:<3} {records_count} records "
+                f"{elapsed_time:7.2f} s {records_count / elapsed_time:10.0f} records/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Compare the memory that a RecordCatalog of every Record read holds with the memory that a RecordCatalog of a CompactRecordStore,
+a LazyRecordStore or a CatalogSnapshot holds.
+
+A synthetic output file of --records records is written to a temporary directory, and each RecordCatalog is built from it
+while tracemalloc traces the Python heap. The LazyRecordStore is built twice: once scanning the file, and once from its sidecar index. The CatalogSnapshot is compiled from the Records of the first RecordCatalog.
+Memory maps are not on the Python heap, so they are not counted.
+
+Run with: poetry run python -m app.benchmarks.record_store_benchmark
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from app.benchmarks.reader_benchmark import write_wikipedia_output_file
+from app.readers.reader import WikipediaReader
+from app.record_catalog import (
+    CatalogSnapshot,
+    CompactRecordStore,
+    LazyRecordStore,
+    RecordCatalog,
+    compile_catalog_snapshot,
+)
+
+
+def _measure(
+    *, name: str, create_record_catalog: Callable[[], RecordCatalog]
+) -> RecordCatalog:
+    """Print the time it takes to build a RecordCatalog, the heap memory it holds in total and per million Records, and the time it takes to get every Record once."""
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    record_catalog = create_record_catalog()
+    elapsed_time = time.perf_counter() - start_time
+    memory_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start_time = time.perf_counter()
+    for record_key in record_catalog.sorted_record_keys:
+        record_catalog[record_key]
+    get_time = time.perf_counter() - start_time
+
+    print(  # noqa: T201
+        f"{name:<14} build {elapsed_time:7.2f} s  "
+        f"resident {memory_size / 1024 / 1024:8.1f} MiB "
+        f"({memory_size / len(record_catalog) * 1_000_000 / 1024 / 1024:8.1f} MiB per million)  "
+        f"get all {get_time:7.2f} s"
+    )
+
+    return record_catalog
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--records", type=int, default=200_000)
+    argument_parser.add_argument("--cache-max-size", type=int, default=10_000)
+    arguments = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        file_path = Path(directory_name) / "wikipedia.output.txt"
+        write_wikipedia_output_file(
+            file_path=file_path, records_count=arguments.records
+        )
+        print(  # noqa: T201
+            f"{arguments.records} records, {file_path.stat().st_size / 1024 / 1024:.1f} MiB output file"
+        )
+
+        record_catalog = _measure(
+            name="eager",
+            create_record_catalog=lambda: RecordCatalog(
+                records=WikipediaReader(file_path=file_path).read()
+            ),
+        )
+        _measure(
+            name="compact",
+            create_record_catalog=lambda: RecordCatalog(
+                records=CompactRecordStore(
+                    records=WikipediaReader(file_path=file_path).read(),
+                    cache_max_size=arguments.cache_max_size,
+                )
+            ),
+        )
+        _measure(
+            name="lazy, scanned",
+            create_record_catalog=lambda: RecordCatalog(
+                records=LazyRecordStore(
+                    file_paths=[file_path],
+                    cache_max_size=arguments.cache_max_size,
+                    index_directory_path=Path(directory_name),
+                )
+            ),
+        )
+        _measure(
+            name="lazy, indexed",
+            create_record_catalog=lambda: RecordCatalog(
+                records=LazyRecordStore(
+                    file_paths=[file_path],
+                    cache_max_size=arguments.cache_max_size,
+                    index_directory_path=Path(directory_name),
+                )
+            ),
+        )
+
+        snapshot_file_path = Path(directory_name) / "catalog.snapshot"
+        compile_catalog_snapshot(
+            records=record_catalog.values(),
+            source_file_paths=[file_path],
+            snapshot_file_path=snapshot_file_path,
+        )
+        del record_catalog
+
+        def create_snapshot_record_catalog() -> RecordCatalog:
+            catalog_snapshot = CatalogSnapshot.open(
+                file_path=snapshot_file_path,
+                source_file_paths=[file_path],
+                cache_max_size=arguments.cache_max_size,
+            )
+            assert catalog_snapshot is not None
+            return RecordCatalog(records=catalog_snapshot)
+
+        _measure(name="snapshot", create_record_catalog=create_snapshot_record_catalog)
+
+
+if __name__ == "__main__":
+    main()
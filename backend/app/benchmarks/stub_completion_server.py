@@ -0,0 +1,170 @@
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import override
+
+# A completion in the format that NormalOpenaiAntiRecommender parses.
+STUB_COMPLETION_TEXT = """
+1 - Laplace's_demon - https://en.wikipedia.org/wiki/Laplace's_demon
+2 - Leonardo_da_Vinci - https://en.wikipedia.org/wiki/Leonardo_da_Vinci
+"""
+
+
+class StubCompletionServer(ThreadingHTTPServer):
+    """
+    A local HTTP server that answers OpenAI completion requests with STUB_COMPLETION_TEXT.
+
+    A StubCompletionServer consists of:
+        - connections_count: The number of TCP connections that have been accepted.
+        - requests_count: The number of completion requests that have been answered.
+        - response_delay: The number of seconds to wait before answering a request, to simulate model latency.
+
+    Streamed completion requests are answered with server-sent events, and response_delay is waited before each line of the completion.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, *, response_delay: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _StubCompletionRequestHandler)
+
+        self.connections_count = 0
+        self.requests_count = 0
+        self.response_delay = response_delay
+        self.__counts_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """The base URL of the OpenAI API that the server emulates."""
+
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/v1"
+
+    def count_connection(self) -> None:
+        with self.__counts_lock:
+            self.connections_count += 1
+
+    def count_request(self) -> None:
+        with self.__counts_lock:
+            self.requests_count += 1
+
+
+class _StubCompletionRequestHandler(BaseHTTPRequestHandler):
+    """Answer every POST request with an OpenAI completion, and keep connections alive."""
+
+    disable_nagle_algorithm = True
+    protocol_version = "HTTP/1.1"
+    server: StubCompletionServer
+
+    @override
+    def setup(self) -> None:
+        super().setup()
+        self.server.count_connection()
+
+    def do_POST(self) -> None:  # noqa: N802
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        if request.get("stream"):
+            self.__stream_completion(model=request.get("model", ""))
+            return
+
+        if self.server.response_delay:
+            time.sleep(self.server.response_delay)
+
+        body = json.dumps(
+            {
+                "id": "cmpl-stub",
+                "object": "text_completion",
+                "created": 0,
+                "model": request.get("model", ""),
+                "choices": [
+                    {
+                        "text": STUB_COMPLETION_TEXT,
+                        "index": 0,
+                        "logprobs": None,
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 1,
+                    "completion_tokens": 1,
+                    "total_tokens": 2,
+                },
+            }
+        ).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count_request()
+
+    def __stream_completion(self, *, model: str) -> None:
+        """Answer with STUB_COMPLETION_TEXT as server-sent events, splitting every line across two events."""
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for line in STUB_COMPLETION_TEXT.splitlines(keepends=True):
+            if self.server.response_delay:
+                time.sleep(self.server.response_delay)
+
+            middle = len(line) // 2
+            for text in (line[:middle], line[middle:]):
+                self.__write_event(
+                    json.dumps(
+                        {
+                            "id": "cmpl-stub",
+                            "object": "text_completion",
+                            "created": 0,
+                            "model": model,
+                            "choices": [
+                                {
+                                    "text": text,
+                                    "index": 0,
+                                    "logprobs": None,
+                                    "finish_reason": None,
+                                }
+                            ],
+                        }
+                    )
+                )
+
+        # The request is counted before the stream ends, so that a client never sees the end of an uncounted stream.
+        self.server.count_request()
+        self.__write_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def __write_event(self, data: str) -> None:
+        """Write a server-sent event as a single HTTP chunk."""
+
+        event = f"data: {data}\n\n".encode()
+        self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+        self.wfile.flush()
+
+    @override
+    def log_message(self, format: str, *args: object) -> None:
+        """Do not log requests."""
+
+
+@contextmanager
+def run_stub_completion_server(
+    *, response_delay: float = 0.0
+) -> Iterator[StubCompletionServer]:
+    """Run a StubCompletionServer on a background thread, and shut it down on exit."""
+
+    server = StubCompletionServer(response_delay=response_delay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,114 @@
+"""
+Compare building Articles with Pydantic validation against building them without it, as a trusted load of pre-validated records would.
+
+A synthetic output file of --records records is written to a temporary directory. Its lines are decoded and transliterated
+in batches, and each batch is turned into Articles twice:
+    - validated: wikipedia.Article(**abstract_info, **record), as WikipediaReader does.
+    - trusted: wikipedia.Article.model_construct, with nested Categories and ExternalLinks built by model_construct as well, and the
+      Record validators applied by hand. One record in --sample-every is validated instead, and compared with its trusted counterpart.
+
+Decoding and transliteration are timed separately, since both modes share them.
+
+Run with: poetry run python -m app.benchmarks.trusted_load_benchmark
+"""
+
+import argparse
+import itertools
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, cast
+
+from pydantic import AnyUrl
+
+from app.benchmarks.reader_benchmark import write_wikipedia_output_file
+from app.models import Record, wikipedia
+from app.readers.reader.wikipedia_reader import _transliterate
+
+
+def _construct_article(record: dict[str, Any]) -> wikipedia.Article:
+    """Return the Article of a transliterated record without validating it, applying the Record validators by hand."""
+
+    fields = {**record["abstract_info"], **record}
+    fields["key"] = Record.replace_space_with_underscore(fields.pop("title"))
+    fields["url"] = AnyUrl(fields["url"])
+
+    if fields.get("categories") is not None:
+        fields["categories"] = tuple(
+            wikipedia.Category.model_construct(**category)
+            for category in fields["categories"]
+        )
+    if fields.get("external_links") is not None:
+        fields["external_links"] = tuple(
+            wikipedia.ExternalLink.model_construct(**external_link)
+            for external_link in fields["external_links"]
+        )
+
+    return wikipedia.Article.model_construct(**fields)
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--records", type=int, default=1_000_000)
+    argument_parser.add_argument("--batch-size", type=int, default=10_000)
+    argument_parser.add_argument("--sample-every", type=int, default=1_000)
+    arguments = argument_parser.parse_args()
+
+    parse_time = 0.0
+    validated_time = 0.0
+    trusted_time = 0.0
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        file_path = Path(directory_name) / "wikipedia.output.txt"
+        write_wikipedia_output_file(
+            file_path=file_path, records_count=arguments.records
+        )
+
+        with file_path.open("rb") as output_file:
+            # The first line holds the state of the scraper, not a record.
+            output_file.readline()
+
+            while batch := list(itertools.islice(output_file, arguments.batch_size)):
+                start_time = time.perf_counter()
+                records = [
+                    cast(
+                        dict[str, Any], _transliterate(json.loads(json_line)["record"])
+                    )
+                    for json_line in batch
+                ]
+                parse_time += time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                validated_articles = [
+                    wikipedia.Article(**record["abstract_info"], **record)
+                    for record in records
+                ]
+                validated_time += time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                trusted_articles = [
+                    wikipedia.Article(**record["abstract_info"], **record)
+                    if index % arguments.sample_every == 0
+                    else _construct_article(record)
+                    for index, record in enumerate(records)
+                ]
+                trusted_time += time.perf_counter() - start_time
+
+                if trusted_articles != validated_articles:
+                    message = "Trusted Articles differ from validated Articles."
+                    raise ValueError(message)
+
+    for name, elapsed_time in (
+        ("decode", parse_time),
+        ("validated", validated_time),
+        ("trusted", trusted_time),
+    ):
+        print(  # noqa: T201
+            f"{name:<10} {elapsed_time:7.2f} s "
+            f"{elapsed_time / arguments.records * 1_000_000:7.1f} us/record"
+        )
+
+
+if __name__ == "__main__":
+    main()
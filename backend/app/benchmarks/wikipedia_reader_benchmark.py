@@ -0,0 +1,83 @@
+"""
+Measure the per-record cost of WikipediaReader, against the json.dumps, unidecode and json.loads round trip that it used to make for every record.
+
+Both readers parse the same synthetic output file of --records records, and their Articles are checked to be identical.
+
+Run with: poetry run python -m app.benchmarks.wikipedia_reader_benchmark
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from unidecode import unidecode
+
+from app.benchmarks.reader_benchmark import write_wikipedia_output_file
+from app.models import wikipedia
+from app.readers.reader import WikipediaReader
+
+
+def _read_with_round_trip(file_path: Path) -> Iterable[wikipedia.Article]:
+    """Read Articles the way WikipediaReader used to, by transliterating each record's whole JSON serialization."""
+
+    with file_path.open(encoding="utf-8") as json_file:
+        for json_line in json_file:
+            record_json = json.loads(json_line)
+
+            if record_json["type"] != "RECORD":
+                continue
+
+            json_obj = json.loads(
+                unidecode(json.dumps(record_json["record"], ensure_ascii=False))
+            )
+
+            yield wikipedia.Article(**(json_obj["abstract_info"]), **(json_obj))
+
+
+def _measure(
+    *, name: str, read: Callable[[Path], Iterable[wikipedia.Article]], file_path: Path
+) -> list[wikipedia.Article]:
+    """Read every Article of file_path with read, print the cost per record, and return the Articles."""
+
+    start_time = time.perf_counter()
+    articles = list(read(file_path))
+    elapsed_time = time.perf_counter() - start_time
+
+    print(  # noqa: T201
+        f"{name:<12} {len(articles)} records "
+        f"{elapsed_time / len(articles) * 1_000_000:7.1f} µs/record"
+    )
+
+    return articles
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--records", type=int, default=100_000)
+    arguments = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        file_path = Path(directory_name) / "wikipedia.output.txt"
+        write_wikipedia_output_file(
+            file_path=file_path, records_count=arguments.records
+        )
+
+        round_trip_articles = _measure(
+            name="round trip", read=_read_with_round_trip, file_path=file_path
+        )
+        single_pass_articles = _measure(
+            name="single pass",
+            read=lambda file_path: WikipediaReader(file_path=file_path).read(),
+            file_path=file_path,
+        )
+
+    if single_pass_articles != round_trip_articles:
+        msg = "The single pass and round trip readers returned different Articles."
+        raise AssertionError(msg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+from .ttl_cache import TtlCache as TtlCache
+from .sqlite_cache import SqliteCache as SqliteCache
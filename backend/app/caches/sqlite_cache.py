@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_CREATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expiry_time REAL NOT NULL,
+    access_time REAL NOT NULL
+)
+"""
+_CREATE_INDEX_QUERIES = (
+    "CREATE INDEX IF NOT EXISTS cache_access_time ON cache (access_time)",
+    "CREATE INDEX IF NOT EXISTS cache_expiry_time ON cache (expiry_time)",
+)
+
+# The share of max_size that may be inserted between two evictions.
+_EVICTION_BATCH_RATIO = 0.01
+
+
+class SqliteCache:
+    """
+    A thread-safe, size-bounded cache of text values that is stored in a local SQLite database, and outlives the process.
+
+    A SqliteCache consists of:
+        - __connection: A connection to the SQLite database at database_path.
+        - __max_size: The maximum number of entries. The least recently used entries are evicted when the cache is full.
+        - __sets_since_eviction: The number of entries set since expired and least recently used entries were last evicted.
+        - __ttl: The default time-to-live of an entry, in seconds.
+
+    Expiry and access times are wall-clock times, so that they remain meaningful after a restart.
+
+    Entries are evicted in batches, so a SqliteCache may briefly hold about 1% more than __max_size entries.
+    """
+
+    def __init__(self, *, database_path: Path, max_size: int, ttl: float) -> None:
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.__connection = sqlite3.connect(
+            database_path, check_same_thread=False, isolation_level=None
+        )
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute(_CREATE_TABLE_QUERY)
+        for create_index_query in _CREATE_INDEX_QUERIES:
+            self.__connection.execute(create_index_query)
+
+        self.__eviction_batch_size = max(1, int(max_size * _EVICTION_BATCH_RATIO))
+        self.__lock = threading.Lock()
+        self.__max_size = max_size
+        self.__sets_since_eviction = 0
+        self.__ttl = ttl
+
+    def __len__(self) -> int:
+        with self.__lock:
+            (count,) = self.__connection.execute(
+                "SELECT COUNT(*) FROM cache"
+            ).fetchone()
+
+        return int(count)
+
+    def get(self, key: str) -> str | None:
+        """Return the value cached under key, or None if there is no such value or it has expired."""
+
+        current_time = time.time()
+
+        with self.__lock:
+            entry = self.__connection.execute(
+                "SELECT value, expiry_time FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if entry is None:
+                return None
+
+            value, expiry_time = entry
+            if expiry_time <= current_time:
+                self.__connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+
+            self.__connection.execute(
+                "UPDATE cache SET access_time = ? WHERE key = ?", (current_time, key)
+            )
+
+        return str(value)
+
+    def set(self, key: str, value: str, *, ttl: float | None = None) -> None:
+        """Cache value under key for ttl seconds, or for the default time-to-live if ttl is None."""
+
+        current_time = time.time()
+        expiry_time = current_time + (self.__ttl if ttl is None else ttl)
+
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expiry_time, access_time) VALUES (?, ?, ?, ?)",
+                (key, value, expiry_time, current_time),
+            )
+
+            self.__sets_since_eviction += 1
+            if self.__sets_since_eviction >= self.__eviction_batch_size:
+                self.__evict(current_time=current_time)
+
+    def __evict(self, *, current_time: float) -> None:
+        """
+        Remove expired entries, and the least recently used entries that do not fit in the cache.
+
+        Callers must hold __lock.
+        """
+
+        self.__connection.execute(
+            "DELETE FROM cache WHERE expiry_time <= ?", (current_time,)
+        )
+        self.__connection.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY access_time DESC LIMIT -1 OFFSET ?)",
+            (self.__max_size,),
+        )
+        self.__sets_since_eviction = 0
+
+    def pop(self, key: str) -> str | None:
+        """Remove and return the value cached under key, or None if there is no such value."""
+
+        with self.__lock:
+            entry = self.__connection.execute(
+                "DELETE FROM cache WHERE key = ? RETURNING value", (key,)
+            ).fetchone()
+
+        return str(entry[0]) if entry else None
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+
+        with self.__lock:
+            self.__connection.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        """Close the connection to the SQLite database."""
+
+        with self.__lock:
+            self.__connection.close()
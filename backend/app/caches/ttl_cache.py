@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TtlCache(Generic[K, V]):
+    """
+    A thread-safe, size-bounded cache whose entries expire after a time-to-live.
+
+    A TtlCache consists of:
+        - __entries: An ordered dictionary of type K: (expiry time, V), ordered from least to most recently used.
+        - __max_size: The maximum number of entries. The least recently used entry is evicted when the cache is full.
+        - __ttl: The default time-to-live of an entry, in seconds.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self.__entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__max_size = max_size
+        self.__ttl = ttl
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: K) -> V | None:
+        """Return the value cached under key, or None if there is no such value or it has expired."""
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                return None
+
+            expiry_time, value = entry
+            if expiry_time <= time.monotonic():
+                del self.__entries[key]
+                return None
+
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        """Cache value under key for ttl seconds, or for the default time-to-live if ttl is None."""
+
+        expiry_time = time.monotonic() + (self.__ttl if ttl is None else ttl)
+
+        with self.__lock:
+            self.__entries[key] = (expiry_time, value)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        """Remove and return the value cached under key, or None if there is no such value."""
+
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,10 @@
+# isort: skip_file
+from .thread_pool import (
+    configure_thread_pool as configure_thread_pool,
+    run_in_thread_pool as run_in_thread_pool,
+)
+from .concurrency_limit_exception import (
+    ConcurrencyLimitException as ConcurrencyLimitException,
+)
+from .concurrency_limiter import ConcurrencyLimiter as ConcurrencyLimiter
+from .single_flight import SingleFlight as SingleFlight
@@ -0,0 +1,2 @@
+class ConcurrencyLimitException(BaseException):
+    """An exception encountered when a ConcurrencyLimiter cannot admit a task, because its wait queue is full or the wait timed out."""
@@ -0,0 +1,77 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+import anyio
+from anyio.lowlevel import RunVar
+
+from app.concurrency import ConcurrencyLimitException
+
+
+@dataclass
+class _ConcurrencyLimiterState:
+    """The semaphore and wait queue length of a ConcurrencyLimiter in one event loop."""
+
+    semaphore: anyio.Semaphore
+    waiting_count: int = field(default=0)
+
+
+class ConcurrencyLimiter:
+    """
+    An async limit on the number of tasks that run a block at the same time, with a bounded wait queue.
+
+    A ConcurrencyLimiter consists of:
+        - __max_concurrency: The maximum number of tasks that run the block at the same time.
+        - __max_waiting: The maximum number of tasks that wait for their turn. Further tasks are rejected immediately.
+        - __state: The semaphore and wait queue length of the ConcurrencyLimiter in the running event loop.
+        - __wait_timeout: The number of seconds a task waits for its turn before it is rejected.
+
+    A ConcurrencyLimitException is raised when a task is rejected.
+    """
+
+    def __init__(
+        self, *, max_concurrency: int, max_waiting: int, wait_timeout: float
+    ) -> None:
+        self.__max_concurrency = max_concurrency
+        self.__max_waiting = max_waiting
+        self.__wait_timeout = wait_timeout
+        self.__state: RunVar[_ConcurrencyLimiterState] = RunVar(
+            f"concurrency_limiter_{id(self)}"
+        )
+
+    def __running_state(self) -> _ConcurrencyLimiterState:
+        """Return the state of the ConcurrencyLimiter in the running event loop, and create it on first use."""
+
+        try:
+            return self.__state.get()
+        except LookupError:
+            state = _ConcurrencyLimiterState(
+                semaphore=anyio.Semaphore(self.__max_concurrency)
+            )
+            self.__state.set(state)
+            return state
+
+    @asynccontextmanager
+    async def limit(self) -> AsyncIterator[None]:
+        """Wait for a turn to run the block, and raise a ConcurrencyLimitException if there is no room to wait or the wait times out."""
+
+        state = self.__running_state()
+
+        if state.semaphore.value == 0 and state.waiting_count >= self.__max_waiting:
+            msg = "Too many tasks are waiting for their turn."
+            raise ConcurrencyLimitException(msg)
+
+        state.waiting_count += 1
+        try:
+            with anyio.fail_after(self.__wait_timeout):
+                await state.semaphore.acquire()
+        except TimeoutError as exception:
+            msg = "Timed out while waiting for a turn."
+            raise ConcurrencyLimitException(msg) from exception
+        finally:
+            state.waiting_count -= 1
+
+        try:
+            yield
+        finally:
+            state.semaphore.release()
@@ -0,0 +1,78 @@
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+import anyio
+from anyio.lowlevel import RunVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class _Flight(Generic[V]):
+    """A call that is in flight, and the outcome that its followers wait for."""
+
+    done: anyio.Event = field(default_factory=anyio.Event)
+    exception: BaseException | None = None
+    result: V | None = None
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Coalesce concurrent async calls with the same key into one call in flight.
+
+    The first task to call a key runs the call. Tasks that call the same key while it is in flight wait for it,
+    and share its result or exception.
+
+    A follower of a call that was cancelled makes the call again.
+
+    Calls in flight are tracked separately in each event loop.
+    """
+
+    def __init__(self) -> None:
+        self.__flights: RunVar[dict[K, _Flight[V]]] = RunVar(
+            f"single_flight_{id(self)}"
+        )
+
+    def __running_flights(self) -> dict[K, _Flight[V]]:
+        """Return the calls in flight in the running event loop."""
+
+        try:
+            return self.__flights.get()
+        except LookupError:
+            flights: dict[K, _Flight[V]] = {}
+            self.__flights.set(flights)
+            return flights
+
+    async def run(self, key: K, function: Callable[[], Awaitable[V]]) -> V:
+        """Return the result of function, or of the call with the same key that is already in flight."""
+
+        flights = self.__running_flights()
+
+        while key in flights:
+            flight = flights[key]
+            await flight.done.wait()
+
+            if isinstance(flight.exception, anyio.get_cancelled_exc_class()):
+                continue
+            if flight.exception is not None:
+                raise flight.exception
+
+            return flight.result  # type: ignore[return-value]
+
+        flight = _Flight()
+        flights[key] = flight
+
+        try:
+            result = await function()
+        except BaseException as exception:
+            flight.exception = exception
+            raise
+        else:
+            flight.result = result
+        finally:
+            del flights[key]
+            flight.done.set()
+
+        return result
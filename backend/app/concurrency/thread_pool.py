@@ -0,0 +1,56 @@
+import functools
+from collections.abc import Callable
+from typing import ParamSpec, TypeVar
+
+import anyio
+import anyio.to_thread
+from anyio.lowlevel import RunVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+DEFAULT_THREAD_POOL_MAX_WORKERS = 40
+
+_max_workers = DEFAULT_THREAD_POOL_MAX_WORKERS
+
+# Every event loop gets its own CapacityLimiter.
+_limiter: RunVar[anyio.CapacityLimiter] = RunVar("thread_pool_limiter")
+
+
+def configure_thread_pool(*, max_workers: int) -> None:
+    """Set the maximum number of blocking calls that run_in_thread_pool runs at the same time."""
+
+    global _max_workers  # noqa: PLW0603
+
+    _max_workers = max_workers
+
+
+def _thread_pool_limiter() -> anyio.CapacityLimiter:
+    """Return the CapacityLimiter of the thread pool in the running event loop, and create it on first use."""
+
+    try:
+        limiter = _limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(_max_workers)
+        _limiter.set(limiter)
+
+    if limiter.total_tokens != _max_workers:
+        limiter.total_tokens = _max_workers
+
+    return limiter
+
+
+async def run_in_thread_pool(
+    function: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+) -> T:
+    """
+    Run a blocking function on a worker thread, and return its result without blocking the event loop.
+
+    At most max_workers blocking calls run at the same time. Further calls wait for a worker thread to become free.
+
+    The thread pool is separate from the one that FastAPI uses for synchronous path operations and dependencies.
+    """
+
+    return await anyio.to_thread.run_sync(
+        functools.partial(function, *args, **kwargs), limiter=_thread_pool_limiter()
+    )
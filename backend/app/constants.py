@@ -3,3 +3,6 @@ ARKG_ANTI_RECOMMENDER_USER_STATE_TABLE_NAME = "arkg anti-recommender user state
 
 # The base URL for Wikipedia articles.
 WIKIPEDIA_BASE_URL = "https://en.wikipedia.org/wiki/"
+
+# The OpenAI completion model that NormalOpenaiAntiRecommender uses by default.
+DEFAULT_OPENAI_MODEL_NAME = "gpt-3.5-turbo-instruct"
@@ -1,27 +1,63 @@
+import secrets
 from typing import Annotated
 
-from fastapi import Depends, Request
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import SecretStr
 
+from app.anti_recommendation_engine import AntiRecommendationEngine
 from app.auth import AuthException
 from app.models import AuthToken, CredentialsError
+from app.models.types import UserId
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
 
 
 async def check_user_authentication(
     access_token: Annotated[SecretStr, Depends(oauth2_scheme)], request: Request
-) -> None:
+) -> UserId:
     """
-    Check if `access_token` corresponds to an authenticated `User`.
+    Check if `access_token` corresponds to an authenticated `User`, and return the ID of the `User`.
 
     A `CredentialsError` exception is raised if the authentication fails.
     """
 
     try:
-        request.app.state.auth_service.get_user(
+        user_response = await request.app.state.auth_service.aget_user(
             authentication_token=AuthToken(access_token=access_token)
         )
     except AuthException as exception:
         raise CredentialsError from exception
+
+    return user_response.user_id  # type: ignore[no-any-return]
+
+
+async def get_anti_recommendation_engine(
+    user_id: Annotated[UserId, Depends(check_user_authentication)], request: Request
+) -> AntiRecommendationEngine:
+    """Return the AntiRecommendationEngine of the authenticated `User`'s session."""
+
+    return await request.app.state.session_engine_registry.aget_engine(  # type: ignore[no-any-return]
+        user_id=user_id
+    )
+
+
+async def check_admin_token(
+    request: Request,
+    admin_token: Annotated[str | None, Header(alias="X-Admin-Token")] = None,
+) -> None:
+    """
+    Check that the X-Admin-Token header holds the admin token of the app's settings.
+
+    Admin endpoints are not found if the settings have no admin token, and are forbidden if the header does not match it.
+    """
+
+    settings_admin_token = request.app.state.settings.admin_token
+    if settings_admin_token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    if admin_token is None or not secrets.compare_digest(
+        admin_token.encode(), settings_admin_token.get_secret_value().encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
@@ -3,13 +3,16 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
-from pydantic import SecretStr
 
-from app.anti_recommendation_engine import AntiRecommendationEngine
+from app.anti_recommendation_engine import SessionEngineRegistry
+from app.anti_recommenders import create_anti_recommender, find_arkg_anti_recommender
+from app.auth.local_jwt import LocalJwtAuthService
 from app.auth.supabase import SupabaseAuthService
-from app.models import AuthToken, CredentialsError, Settings
+from app.concurrency import configure_thread_pool
+from app.models import CredentialsError, Settings
+from app.record_catalog import RecordCatalog, RecordCatalogReloader
 from app.routers import router
-from app.user import SupabaseUserService
+from app.user import SupabaseUserService, WriteBehindUserService
 
 
 @asynccontextmanager
@@ -17,22 +20,60 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """A lifespan event to persist variables in an app's state on startup."""
 
     settings = Settings()
-    supabase_auth_service = SupabaseAuthService(settings=settings)
-    supabase_user_service = SupabaseUserService(
-        auth_service=supabase_auth_service, settings=settings
-    )
+    configure_thread_pool(max_workers=settings.thread_pool_max_workers)
 
-    app.state.anti_recommendation_engine = AntiRecommendationEngine(
-        user=supabase_user_service.create_user_from_token(
-            authentication_token=AuthToken(access_token=SecretStr(""))
-        ),
+    # The CategoryIndex of each version of the RecordCatalog is built before it is served, if settings.category_index_precompute is set.
+    record_catalog_reloader = RecordCatalogReloader(settings=settings)
+    record_catalog = record_catalog_reloader.record_catalog
+    auth_service = LocalJwtAuthService(
+        auth_service=SupabaseAuthService(settings=settings), settings=settings
+    )
+    user_service = WriteBehindUserService(
+        user_service=SupabaseUserService(auth_service=auth_service, settings=settings),
         settings=settings,
     )
-    app.state.settings = settings
-    app.state.user_service = supabase_user_service
-    app.state.auth_service = supabase_auth_service
 
-    yield
+    anti_recommender = create_anti_recommender(
+        record_catalog=record_catalog, settings=settings
+    )
+
+    # Entering the AntiRecommender starts any background work it needs, and leaving it releases its resources.
+    async with anti_recommender:
+        app.state.session_engine_registry = SessionEngineRegistry(
+            anti_recommender=anti_recommender,
+            record_catalog=record_catalog,
+            user_service=user_service,
+            settings=settings,
+        )
+        # The ARKG of an ArkgAntiRecommender can be reloaded through the admin endpoints.
+        app.state.arkg_anti_recommender = find_arkg_anti_recommender(
+            anti_recommender=anti_recommender
+        )
+        app.state.record_catalog_reloader = record_catalog_reloader
+        app.state.settings = settings
+        app.state.user_service = user_service
+        app.state.auth_service = auth_service
+
+        def replace_record_catalog(reloaded_record_catalog: RecordCatalog) -> None:
+            """Share a new version of the RecordCatalog with every session, and offer its RecordKeys as ARKG fallbacks."""
+
+            app.state.session_engine_registry.replace_record_catalog(
+                record_catalog=reloaded_record_catalog
+            )
+            if app.state.arkg_anti_recommender is not None:
+                app.state.arkg_anti_recommender.replace_record_keys(
+                    record_keys=reloaded_record_catalog.sorted_record_keys
+                )
+
+        record_catalog_reloader.start(on_reload=replace_record_catalog)
+
+        yield
+
+        record_catalog_reloader.close()
+
+        # End every session, and write back every anti-recommendations history that changed during the app's lifetime.
+        app.state.session_engine_registry.close()
+        user_service.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -1,7 +1,9 @@
 from .anti_recommendations_selector import (
     AntiRecommendationsSelector as AntiRecommendationsSelector,
 )
+from .arkg_reload_metrics import ArkgReloadMetrics as ArkgReloadMetrics
 from .auth_token import AuthToken as AuthToken
+from .catalog_version import CatalogVersion as CatalogVersion
 from .credentials import Credentials as Credentials
 from .credentials_error import CredentialsError as CredentialsError
 from .record import Record as Record
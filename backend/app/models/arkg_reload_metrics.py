@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class ArkgReloadMetrics(BaseModel):
+    """
+    A Pydantic model of the metrics of the last reload of an ARKG.
+
+    - load_seconds: The time it took to load and index the new version, on a worker thread.
+    - previous_version_released: Whether the memory of the previous version has been released, once no request used it anymore.
+    - previous_version_release_seconds: The time from the swap until the previous version was released, or None if it has not been.
+    - swap_seconds: The latency of the swap, apart from loading: the time from the reload being requested until the new version served requests, minus load_seconds.
+      It includes the waits for a worker thread and for an earlier reload to finish.
+    - version: The number of the new version, starting from 1.
+    """
+
+    load_seconds: float
+    previous_version_released: bool
+    previous_version_release_seconds: float | None
+    swap_seconds: float
+    version: int
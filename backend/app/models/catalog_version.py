@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class CatalogVersion(BaseModel):
+    """A Pydantic model that describes the current version of the RecordCatalog, and whether a reload swapped it in."""
+
+    records_count: int
+    reloaded: bool
+    version: int
@@ -4,6 +4,7 @@ from pydantic import AnyUrl, Field, FilePath, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pyoxigraph import NamedNode
 
+from app.constants import DEFAULT_OPENAI_MODEL_NAME
 from app.models.types import AntiRecommenderType, RdfMimeType
 
 CONFIG_DIRECTORY_PATH = Path(__file__).parent.parent.parent.absolute()
@@ -18,14 +19,50 @@ class Settings(BaseSettings):
     )
     arkg_file_path: FilePath = DATA_DIRECTORY_PATH / "wikipedia_arkg_file.ttl"
     arkg_mime_type: RdfMimeType = RdfMimeType.TURTLE
+    arkg_precompute_index: bool = True
+    arkg_store_directory_path: Path | None = None
 
+    admin_token: SecretStr | None = None
     anti_recommender_type: AntiRecommenderType = AntiRecommenderType.ARKG
+    auth_cache_max_size: int = 10_000
+    auth_cache_ttl: float = 300.0
+    auth_jwks_url: AnyUrl | None = None
+    auth_jwt_audience: str = "authenticated"
+    auth_jwt_secret: SecretStr | None = None
+    catalog_reload_interval: float | None = None
+    catalog_snapshot_file_path: Path | None = None
+    category_index_precompute: bool = True
+    hedged_deadline: float = 1.0
+    hedged_max_workers: int = 8
     openai_api_key: SecretStr | None = None
+    openai_base_url: AnyUrl | None = None
+    openai_cache_database_path: Path | None = None
+    openai_cache_database_max_size: int = 100_000
+    openai_cache_max_size: int = 1_000
+    openai_cache_ttl: float = 604_800.0
+    openai_http_keepalive_expiry: float = 30.0
+    openai_http_max_connections: int = 100
+    openai_max_concurrent_requests: int = 16
+    openai_max_waiting_requests: int = 256
+    openai_model_name: str = DEFAULT_OPENAI_MODEL_NAME
+    openai_request_timeout: float = 60.0
+    openai_wait_timeout: float = 10.0
     output_file_paths: frozenset[Path] = Field(
         default=frozenset(), validation_alias="output_file_names"
     )
+    reader_chunk_size: int = 16 * 1024 * 1024
+    reader_max_workers: int = 1
+    record_store_cache_max_size: int = 10_000
+    record_store_compact: bool = False
+    record_store_index_directory_path: Path | None = None
+    record_store_lazy: bool = False
+    session_engines_idle_ttl: float = 3600.0
+    session_engines_max_count: int = 10_000
     supabase_url: AnyUrl | None = None
     supabase_key: SecretStr | None = None
+    thread_pool_max_workers: int = 40
+    user_history_flush_interval: float = 5.0
+    user_history_flush_threshold: int = 100
     model_config = SettingsConfigDict(
         env_file=(
             CONFIG_DIRECTORY_PATH / ".env.local",
@@ -53,3 +90,33 @@ class Settings(BaseSettings):
         """Convert the file name of an ARKG into a Path."""
 
         return DATA_DIRECTORY_PATH / arkg_file_name
+
+    @field_validator("arkg_store_directory_path", mode="before")
+    @classmethod
+    def convert_to_directory_path(cls, arkg_store_directory_name: str) -> Path:
+        """Convert the directory name of a persistent ARKG Store into a Path."""
+
+        return DATA_DIRECTORY_PATH / arkg_store_directory_name
+
+    @field_validator("catalog_snapshot_file_path", mode="before")
+    @classmethod
+    def convert_to_snapshot_file_path(cls, catalog_snapshot_file_name: str) -> Path:
+        """Convert the file name of a compiled catalog snapshot into a Path."""
+
+        return DATA_DIRECTORY_PATH / catalog_snapshot_file_name
+
+    @field_validator("record_store_index_directory_path", mode="before")
+    @classmethod
+    def convert_to_index_directory_path(
+        cls, record_store_index_directory_name: str
+    ) -> Path:
+        """Convert the directory name of the record offset indices into a Path."""
+
+        return DATA_DIRECTORY_PATH / record_store_index_directory_name
+
+    @field_validator("openai_cache_database_path", mode="before")
+    @classmethod
+    def convert_to_database_path(cls, openai_cache_database_name: str) -> Path:
+        """Convert the file name of the OpenAI response cache database into a Path."""
+
+        return DATA_DIRECTORY_PATH / openai_cache_database_name
@@ -6,3 +6,4 @@ class AntiRecommenderType(str, Enum):
 
     OPEN_AI = "OpenAI"
     ARKG = "ARKG"
+    HEDGED = "Hedged"
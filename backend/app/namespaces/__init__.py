@@ -1,2 +1,3 @@
+from .delta import DELTA as DELTA
 from .rdf import RDF as RDF
 from .schema import SCHEMA as SCHEMA
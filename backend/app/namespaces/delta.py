@@ -0,0 +1,10 @@
+from pyoxigraph import NamedNode
+
+
+class DELTA:
+    """A class containing the RDF Nodes of the named graphs of an ARKG delta file."""
+
+    BASE_IRI = NamedNode("http://imlapps.github.io/anti-recommender/delta/")
+
+    ADDED = NamedNode(BASE_IRI.value + "added")
+    REMOVED = NamedNode(BASE_IRI.value + "removed")
@@ -7,6 +7,7 @@ class SCHEMA:
     BASE_IRI = NamedNode("http://schema.org/")
 
     ABOUT = NamedNode(BASE_IRI.value + "about")
+    ARTICLE = NamedNode(BASE_IRI.value + "Article")
     ITEM_REVIEWED = NamedNode(BASE_IRI.value + "itemReviewed")
     NAME = NamedNode(BASE_IRI.value + "name")
     RECOMMENDATION = NamedNode(BASE_IRI.value + "Recommendation")
@@ -1,21 +1,61 @@
+import multiprocessing
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 
 from app.models import Record, Settings
 from app.readers.create_readers import create_readers
 from app.readers.reader.reader import Reader
 
 
+def _read_all(reader: Reader) -> list[Record]:
+    """Read every Record of reader in a worker process, and return them to be pickled back in one batch."""
+
+    return list(reader.read())
+
+
 class AllSourceReader(Reader):
     """
     A multiplexer for different Readers.
 
     Read in output data and yield them as Records.
+
+    An AllSourceReader consists of:
+        - __chunk_size: The number of bytes of output data that a worker process reads at a time.
+        - __max_workers: The number of worker processes that read output data. Output data is read in process if it is 1.
+        - __readers: The Readers of every output file.
+
+    Worker processes validate Records and send them back pickled, so Records are not validated again when they are merged.
+    Records are yielded in the same order as they are when read in process.
     """
 
     def __init__(self, *, settings: Settings) -> None:
+        self.__chunk_size = settings.reader_chunk_size
+        self.__max_workers = settings.reader_max_workers
         self.__readers: tuple[Reader, ...] = create_readers(settings=settings)
 
+    def __read_in_worker_processes(self) -> Iterable[Record]:
+        """Split every Reader into chunks, read the chunks in a pool of worker processes, and yield their Records in order."""
+
+        chunk_readers = [
+            chunk_reader
+            for reader in self.__readers
+            for chunk_reader in reader.split(chunk_size=self.__chunk_size)
+        ]
+
+        # Worker processes are started by a fork server, since forking a process with running threads may deadlock.
+        with ProcessPoolExecutor(
+            max_workers=min(self.__max_workers, len(chunk_readers)),
+            mp_context=multiprocessing.get_context("forkserver"),
+        ) as executor:
+            for records in executor.map(_read_all, chunk_readers):
+                yield from records
+
     def read(self) -> Iterable[Record]:
         """Read in output data and yield Records."""
+
+        if self.__max_workers > 1 and self.__readers:
+            yield from self.__read_in_worker_processes()
+            return
+
         for reader in self.__readers:
             yield from reader.read()
@@ -1,2 +1,4 @@
+from .open_output_file import is_compressed as is_compressed
+from .open_output_file import open_output_file as open_output_file
 from .reader import Reader as Reader
 from .wikipedia_reader import WikipediaReader as WikipediaReader
@@ -0,0 +1,67 @@
+import bz2
+import gzip
+import importlib
+import io
+from pathlib import Path
+from typing import BinaryIO
+
+# Output files are read in large blocks, since most of them are read from start to end.
+_READ_BUFFER_SIZE = 1024 * 1024
+
+_COMPRESSIONS_BY_MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+_COMPRESSIONS_BY_SUFFIX = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd"}
+
+
+def _compression(file_path: Path) -> str | None:
+    """Return the compression of a file from its magic bytes, or from its file extension if its magic bytes match none."""
+
+    with file_path.open("rb") as file:
+        magic_bytes = file.read(4)
+
+    for compression_magic_bytes, compression in _COMPRESSIONS_BY_MAGIC_BYTES.items():
+        if magic_bytes.startswith(compression_magic_bytes):
+            return compression
+
+    return _COMPRESSIONS_BY_SUFFIX.get(file_path.suffix)
+
+
+def is_compressed(file_path: Path) -> bool:
+    """Return whether an output file is compressed with gzip, bz2 or Zstandard."""
+
+    return _compression(file_path) is not None
+
+
+def open_output_file(file_path: Path) -> BinaryIO:
+    """
+    Open an output file for reading in binary mode, and decompress it as it is read if it is compressed with gzip, bz2 or Zstandard.
+
+    Zstandard files require the zstandard package of the zstd extra, which is only imported when such a file is opened.
+    """
+
+    compression = _compression(file_path)
+
+    if compression is None:
+        return file_path.open("rb", buffering=_READ_BUFFER_SIZE)
+
+    if compression == "gzip":
+        decompressed_file: io.RawIOBase | io.BufferedIOBase = gzip.GzipFile(
+            file_path, "rb"
+        )
+    elif compression == "bz2":
+        decompressed_file = bz2.BZ2File(file_path, "rb")
+    else:
+        try:
+            zstandard = importlib.import_module("zstandard")
+        except ImportError as exception:
+            message = f"Reading {file_path} requires the zstandard package. Install the zstd extra to read Zstandard files."
+            raise ImportError(message) from exception
+
+        decompressed_file = zstandard.ZstdDecompressor().stream_reader(
+            file_path.open("rb"), read_size=_READ_BUFFER_SIZE, closefd=True
+        )
+
+    return io.BufferedReader(decompressed_file, buffer_size=_READ_BUFFER_SIZE)  # type: ignore[arg-type]
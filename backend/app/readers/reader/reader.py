@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
+from typing import Self
 
 from app.models import Record
 
@@ -10,3 +11,12 @@ class Reader(ABC):
     @abstractmethod
     def read(self) -> Iterable[Record]:
         """Read in output data and yield Records."""
+
+    def split(self, *, chunk_size: int) -> tuple[Self, ...]:  # noqa: ARG002
+        """
+        Return Readers that each read a part of this Reader's output data, of about chunk_size bytes.
+
+        Together, and in order, the Readers yield the same Records as this Reader. A Reader is not split by default.
+        """
+
+        return (self,)
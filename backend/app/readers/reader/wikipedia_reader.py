@@ -1,34 +1,164 @@
+import functools
 import json
 from collections.abc import Iterable
 from pathlib import Path
+from typing import Any, Self, cast, override
 
 from unidecode import unidecode
 
-from app.models import wikipedia
+from app.models import Record, wikipedia
+from app.models.types import RecordKey
 from app.readers.reader import Reader
+from app.readers.reader.open_output_file import is_compressed, open_output_file
+
+# Strings up to this length, such as titles and category names, repeat across records, so their transliterations are cached.
+_CACHED_STRING_MAX_LENGTH = 128
+
+
+@functools.lru_cache(maxsize=65_536)
+def _transliterate_short_string(string: str) -> str:
+    return unidecode(string)
+
+
+def _transliterate(json_value: object) -> object:
+    """
+    Return json_value with every non-ASCII string transliterated to ASCII, including the keys of JSON objects.
+
+    Only strings that contain non-ASCII characters are transliterated, and all other values are returned as they are.
+    """
+
+    if isinstance(json_value, str):
+        if json_value.isascii():
+            return json_value
+        if len(json_value) <= _CACHED_STRING_MAX_LENGTH:
+            return _transliterate_short_string(json_value)
+        return unidecode(json_value)
+
+    if isinstance(json_value, dict):
+        return {
+            _transliterate(key): _transliterate(value)
+            for key, value in json_value.items()
+        }
+
+    if isinstance(json_value, list):
+        return [_transliterate(value) for value in json_value]
+
+    return json_value
 
 
 class WikipediaReader(Reader):
     """A concrete implementation of Reader.
 
     Read in Wikipedia output data and yield them as Articles.
+
+    A WikipediaReader may read a byte range of its file. It reads every line that starts within [start_offset, end_offset),
+    so that byte ranges which split a file at arbitrary offsets still read each line exactly once.
+
+    A file compressed with gzip, bz2 or Zstandard is decompressed as it is read. Its byte offsets are offsets in the decompressed data,
+    and it is always read whole, since a compressed file can't be read from an arbitrary offset.
     """
 
-    def __init__(self, *, file_path: Path) -> None:
+    def __init__(
+        self, *, file_path: Path, start_offset: int = 0, end_offset: int | None = None
+    ) -> None:
         self.__file_path = file_path
+        self.__start_offset = start_offset
+        self.__end_offset = end_offset
+
+    @staticmethod
+    def parse_json_line(json_line: bytes) -> wikipedia.Article | None:
+        """Return the Article in a line of Wikipedia output data, or None if the line does not hold a record."""
+
+        record_json = json.loads(json_line)
+
+        if record_json["type"] != "RECORD":
+            return None
+
+        json_obj = cast(dict[str, Any], _transliterate(record_json["record"]))
+
+        return wikipedia.Article(**(json_obj["abstract_info"]), **(json_obj))
+
+    def __read_json_lines(self) -> Iterable[tuple[int, bytes]]:
+        """Yield the byte offset and content of every non-blank line that starts within this Reader's byte range."""
+
+        if is_compressed(self.__file_path):
+            with open_output_file(self.__file_path) as json_file:
+                offset = 0
+                for json_line in json_file:
+                    if json_line.strip():
+                        yield offset, json_line
+                    offset += len(json_line)
+            return
+
+        with open_output_file(self.__file_path) as json_file:
+            # The line that crosses start_offset belongs to the previous byte range.
+            if self.__start_offset > 0:
+                json_file.seek(self.__start_offset - 1)
+                json_file.readline()
+
+            while self.__end_offset is None or json_file.tell() < self.__end_offset:
+                offset = json_file.tell()
+                json_line = json_file.readline()
+                if not json_line:
+                    break
+
+                if json_line.strip():
+                    yield offset, json_line
 
     def read(self) -> Iterable[wikipedia.Article]:
         """Read in Wikipedia output data and yield Records."""
 
-        with self.__file_path.open(encoding="utf-8") as json_file:
-            for json_line in json_file:
-                record_json = json.loads(json_line)
+        for _, json_line in self.__read_json_lines():
+            article = self.parse_json_line(json_line)
+            if article is not None:
+                yield article
+
+    def read_record_offsets(
+        self,
+    ) -> Iterable[tuple[RecordKey, int, int, tuple[str, ...]]]:
+        """
+        Yield the RecordKey, byte offset, byte length and category texts of every record line, without validating the record.
+
+        A line at the yielded offset and length is parsed into an Article by parse_json_line, whose Categories have the yielded texts.
+        """
+
+        for offset, json_line in self.__read_json_lines():
+            record_json = json.loads(json_line)
+
+            if record_json["type"] != "RECORD":
+                continue
+
+            yield (
+                Record.replace_space_with_underscore(
+                    str(_transliterate(record_json["record"]["abstract_info"]["title"]))
+                ),
+                offset,
+                len(json_line),
+                tuple(
+                    str(_transliterate(category["text"]))
+                    for category in record_json["record"].get("categories") or ()
+                    if category.get("text") is not None
+                ),
+            )
+
+    @override
+    def split(self, *, chunk_size: int) -> tuple[Self, ...]:
+        """Return WikipediaReaders that each read a byte range of about chunk_size bytes of this Reader's range, or only this Reader if its file is compressed."""
 
-                if record_json["type"] != "RECORD":
-                    continue
+        if is_compressed(self.__file_path):
+            return (self,)
 
-                json_obj = json.loads(
-                    unidecode(json.dumps(record_json["record"], ensure_ascii=False))
-                )
+        end_offset = (
+            self.__end_offset
+            if self.__end_offset is not None
+            else self.__file_path.stat().st_size
+        )
 
-                yield wikipedia.Article(**(json_obj["abstract_info"]), **(json_obj))
+        return tuple(
+            type(self)(
+                file_path=self.__file_path,
+                start_offset=start_offset,
+                end_offset=min(start_offset + chunk_size, end_offset),
+            )
+            for start_offset in range(self.__start_offset, end_offset, chunk_size)
+        ) or (self,)
@@ -0,0 +1,14 @@
+from .category_index import CategoryIndex as CategoryIndex
+from .category_registry import CategoryRegistry as CategoryRegistry
+from .catalog_snapshot import CatalogSnapshot as CatalogSnapshot
+from .catalog_snapshot import compile_catalog_snapshot as compile_catalog_snapshot
+from .compact_record_store import CompactRecordStore as CompactRecordStore
+from .lazy_record_store import LazyRecordStore as LazyRecordStore
+from .record_catalog import RecordCatalog as RecordCatalog
+
+from .create_record_catalog import (  # isort: skip
+    create_record_catalog as create_record_catalog,
+)
+from .record_catalog_reloader import (  # isort: skip
+    RecordCatalogReloader as RecordCatalogReloader,
+)
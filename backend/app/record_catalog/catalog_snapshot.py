@@ -0,0 +1,292 @@
+import hashlib
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+from app.caches import TtlCache
+from app.models import Record, wikipedia
+from app.models.types import RecordKey
+
+# A snapshot starts with _MAGIC and a _HEADER of: the byte length of its metadata, its number of records, and the byte lengths of its
+# key table and payloads. Then come the JSON metadata, the key offsets, the payload offsets, the key table and the payloads,
+# each padded to a multiple of _ALIGNMENT bytes so that the offset arrays can be read in place, and last a JSON array of the
+# category texts of each record, by position. Offsets are in the byte order of the machine that compiled the snapshot.
+_MAGIC = b"ARCATSNP"
+_HEADER = struct.Struct("<QQQQ")
+_ALIGNMENT = 8
+_VERSION = 2
+
+
+def _padded(data: bytes) -> bytes:
+    return data + bytes(-len(data) % _ALIGNMENT)
+
+
+def _padded_length(length: int) -> int:
+    return length + (-length % _ALIGNMENT)
+
+
+def _source_metadata(file_path: Path) -> dict[str, Any]:
+    """Return the name, size, modification time and SHA-256 hash of a source file."""
+
+    file_stat = file_path.stat()
+
+    with file_path.open("rb") as file:
+        sha256 = hashlib.file_digest(file, "sha256").hexdigest()
+
+    return {
+        "name": file_path.name,
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "sha256": sha256,
+    }
+
+
+def _source_matches(*, file_path: Path, source_metadata: dict[str, Any]) -> bool:
+    """Return whether a source file holds the contents it held when a snapshot was compiled."""
+
+    file_stat = file_path.stat()
+    if file_stat.st_size != source_metadata["size"]:
+        return False
+
+    # A file that has not been modified since it was hashed is not hashed again.
+    if file_stat.st_mtime_ns == source_metadata["mtime_ns"]:
+        return True
+
+    return bool(_source_metadata(file_path)["sha256"] == source_metadata["sha256"])
+
+
+def _read_metadata(file_path: Path) -> dict[str, Any] | None:
+    """Return the metadata of a snapshot file, or None if the file is not a snapshot of the current version."""
+
+    with file_path.open("rb") as file:
+        if file.read(len(_MAGIC)) != _MAGIC:
+            return None
+
+        metadata_length, _, _, _ = _HEADER.unpack(file.read(_HEADER.size))
+        metadata: dict[str, Any] = json.loads(file.read(metadata_length))
+
+    return metadata if metadata["version"] == _VERSION else None
+
+
+def compile_catalog_snapshot(
+    *,
+    records: Iterable[Record],
+    source_file_paths: Iterable[Path],
+    snapshot_file_path: Path,
+) -> int:
+    """
+    Write a snapshot of records, that were read from source_file_paths, to snapshot_file_path. Return the number of records written.
+
+    A later record replaces an earlier one with the same RecordKey, just like in a RecordCatalog.
+    The snapshot is written to a temporary file first, so that serving processes never map a partly written snapshot.
+    """
+
+    payloads_by_key: dict[RecordKey, bytes] = {}
+    category_texts_by_key: dict[RecordKey, list[str]] = {}
+
+    for record in records:
+        payloads_by_key[record.key] = record.model_dump_json(by_alias=True).encode()
+        category_texts_by_key[record.key] = (
+            [
+                category.text
+                for category in record.categories or ()
+                if category.text is not None
+            ]
+            if isinstance(record, wikipedia.Article)
+            else []
+        )
+
+    keys = [record_key.encode() for record_key in payloads_by_key]
+    payloads = list(payloads_by_key.values())
+
+    key_offsets = array("Q", [0])
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+
+    payload_offsets = array("Q", [0])
+    for payload in payloads:
+        payload_offsets.append(payload_offsets[-1] + len(payload))
+
+    metadata = json.dumps(
+        {
+            "version": _VERSION,
+            "sources": [
+                _source_metadata(source_file_path)
+                for source_file_path in source_file_paths
+            ],
+        }
+    ).encode()
+
+    snapshot_file_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_file_path = snapshot_file_path.with_name(snapshot_file_path.name + ".tmp")
+
+    with temporary_file_path.open("wb") as snapshot_file:
+        snapshot_file.write(_MAGIC)
+        snapshot_file.write(
+            _HEADER.pack(len(metadata), len(keys), key_offsets[-1], payload_offsets[-1])
+        )
+        snapshot_file.write(_padded(metadata))
+        snapshot_file.write(key_offsets.tobytes())
+        snapshot_file.write(payload_offsets.tobytes())
+        snapshot_file.write(_padded(b"".join(keys)))
+        snapshot_file.writelines(payloads)
+        snapshot_file.write(json.dumps(list(category_texts_by_key.values())).encode())
+
+    temporary_file_path.replace(snapshot_file_path)
+
+    return len(keys)
+
+
+class CatalogSnapshot(Mapping[RecordKey, Record]):
+    """
+    A read-only Mapping of the Records in a snapshot file that compile_catalog_snapshot wrote.
+
+    A snapshot holds Records that have already been read, transliterated and validated, as pre-encoded JSON payloads.
+    The snapshot file is memory mapped, so forked worker processes share its pages, and a Record is only decoded when it is requested.
+    The category texts of every Record are decoded together, the first time they are requested.
+
+    A CatalogSnapshot consists of:
+        - __cache: A TtlCache of the most recently used Records. Its entries never expire, and the least recently used is evicted when it is full.
+        - __category_texts: A list of a tuple of the category texts of each Record, by position, or None until they are requested.
+        - __category_texts_json: A view of the JSON array of the category texts of every Record.
+        - __key_offsets: A view of the offsets of each RecordKey in __keys, by position. The RecordKey at a position ends at the next offset.
+        - __keys: A view of the key table, that holds every RecordKey encoded as UTF-8.
+        - __memory_map: A memory map of the snapshot file.
+        - __payload_offsets: A view of the offsets of each payload in __payloads, by position.
+        - __payloads: A view of the JSON payloads of every Record.
+        - __positions_by_key: A dictionary of type RecordKey: int, that holds the position of each Record in the snapshot.
+    """
+
+    def __init__(self, *, file_path: Path, cache_max_size: int) -> None:
+        self.__cache: TtlCache[RecordKey, Record] = TtlCache(
+            max_size=cache_max_size, ttl=math.inf
+        )
+
+        with file_path.open("rb") as file:
+            self.__memory_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        snapshot = memoryview(self.__memory_map)
+        metadata_length, records_count, keys_length, payloads_length = (
+            _HEADER.unpack_from(snapshot, len(_MAGIC))
+        )
+
+        offsets_start = len(_MAGIC) + _HEADER.size + _padded_length(metadata_length)
+        offsets_length = (records_count + 1) * _ALIGNMENT
+        keys_start = offsets_start + 2 * offsets_length
+        payloads_start = keys_start + _padded_length(keys_length)
+
+        self.__key_offsets = snapshot[
+            offsets_start : offsets_start + offsets_length
+        ].cast("Q")
+        self.__payload_offsets = snapshot[
+            offsets_start + offsets_length : keys_start
+        ].cast("Q")
+        self.__keys = snapshot[keys_start : keys_start + keys_length]
+        self.__payloads = snapshot[payloads_start : payloads_start + payloads_length]
+        self.__category_texts_json = snapshot[payloads_start + payloads_length :]
+        self.__category_texts: list[tuple[str, ...]] | None = None
+
+        self.__positions_by_key: dict[RecordKey, int] = {
+            str(
+                self.__keys[
+                    self.__key_offsets[position] : self.__key_offsets[position + 1]
+                ],
+                "utf-8",
+            ): position
+            for position in range(records_count)
+        }
+
+    def __getitem__(self, record_key: RecordKey) -> Record:
+        position = self.__positions_by_key[record_key]
+
+        record = self.__cache.get(record_key)
+        if record is not None:
+            return record
+
+        record = wikipedia.Article.model_validate_json(
+            self.__payloads[
+                self.__payload_offsets[position] : self.__payload_offsets[position + 1]
+            ].tobytes()
+        )
+
+        self.__cache.set(record_key, record)
+        return record
+
+    def __iter__(self) -> Iterator[RecordKey]:
+        return iter(self.__positions_by_key)
+
+    def __len__(self) -> int:
+        return len(self.__positions_by_key)
+
+    def __contains__(self, record_key: object) -> bool:
+        return record_key in self.__positions_by_key
+
+    def category_texts(self, *, record_key: RecordKey) -> tuple[str, ...]:
+        """Return the category texts of a Record, without decoding the Record."""
+
+        position = self.__positions_by_key[record_key]
+
+        if self.__category_texts is None:
+            self.__category_texts = [
+                tuple(map(sys.intern, category_texts))
+                for category_texts in json.loads(self.__category_texts_json.tobytes())
+            ]
+
+        return self.__category_texts[position]
+
+    @classmethod
+    def open(
+        cls,
+        *,
+        file_path: Path,
+        source_file_paths: Iterable[Path],
+        cache_max_size: int,
+    ) -> "CatalogSnapshot | None":
+        """
+        Return a CatalogSnapshot of file_path, or None if there is no snapshot at file_path, or it was not compiled from the current source files.
+
+        A source file matches if it has the size and SHA-256 hash that it had when the snapshot was compiled.
+        """
+
+        metadata = _read_metadata(file_path) if file_path.exists() else None
+        if metadata is None:
+            return None
+
+        source_metadata_by_name = {
+            source_metadata["name"]: source_metadata
+            for source_metadata in metadata["sources"]
+        }
+        source_file_paths = tuple(source_file_paths)
+
+        if sorted(source_metadata_by_name) != sorted(
+            source_file_path.name for source_file_path in source_file_paths
+        ) or not all(
+            _source_matches(
+                file_path=source_file_path,
+                source_metadata=source_metadata_by_name[source_file_path.name],
+            )
+            for source_file_path in source_file_paths
+        ):
+            return None
+
+        return cls(file_path=file_path, cache_max_size=cache_max_size)
+
+    def close(self) -> None:
+        """Release the views of the snapshot, and close its memory map. Records that are cached remain available."""
+
+        for view in (
+            self.__key_offsets,
+            self.__payload_offsets,
+            self.__keys,
+            self.__payloads,
+            self.__category_texts_json,
+        ):
+            view.release()
+
+        self.__memory_map.close()
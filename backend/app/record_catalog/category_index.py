@@ -0,0 +1,119 @@
+import bisect
+from array import array
+from collections.abc import Collection, Iterable
+
+from app.models.types import RecordKey
+
+# A category whose Records make up at least this fraction of the catalog is held as a bitmap, and as an array of positions otherwise,
+# whichever is smaller: a position takes 32 bits in an array, and one bit in a bitmap.
+_DENSE_FRACTION = 1 / 32
+
+
+def _contains(positions: array[int] | bytearray, position: int) -> bool:
+    """Return whether a position is in a sorted array of positions, or set in a bitmap of positions."""
+
+    if isinstance(positions, bytearray):
+        return bool(positions[position >> 3] >> (position & 7) & 1)
+
+    index = bisect.bisect_left(positions, position)
+    return index < len(positions) and positions[index] == position
+
+
+class CategoryIndex:
+    """
+    An inverted index from the text of a Category to the positions of the Records that have it, in a catalog's sorted RecordKeys.
+
+    The positions of a category are held either as a sorted array, or as a bitmap with a bit per position, like the containers of a
+    roaring bitmap. Looking up a Record in a category takes a binary search of an array or a single bit test, however broad the category.
+
+    A CategoryIndex consists of:
+        - __positions_by_category: A dictionary of type str: array | bytearray, that holds the positions of the Records of each category text.
+        - __sorted_record_keys: A tuple of every RecordKey in the catalog, in sorted order. A Record's position is the index of its RecordKey.
+    """
+
+    def __init__(
+        self,
+        *,
+        sorted_record_keys: tuple[RecordKey, ...],
+        record_category_texts: Iterable[Iterable[str | None]],
+    ) -> None:
+        """Index record_category_texts, which holds the category texts of each Record in the order of sorted_record_keys. Texts that are None are left out."""
+
+        positions_by_category: dict[str, array[int]] = {}
+
+        for position, category_texts in enumerate(record_category_texts):
+            for category_text in category_texts:
+                if category_text is None:
+                    continue
+
+                positions = positions_by_category.setdefault(category_text, array("I"))
+                # A Record that has the same category text twice is only indexed once.
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        self.__positions_by_category: dict[str, array[int] | bytearray] = {
+            category_text: self.__bitmap(
+                positions=positions, records_count=len(sorted_record_keys)
+            )
+            if len(positions) >= len(sorted_record_keys) * _DENSE_FRACTION
+            else positions
+            for category_text, positions in positions_by_category.items()
+        }
+        self.__sorted_record_keys = sorted_record_keys
+
+    @staticmethod
+    def __bitmap(*, positions: array[int], records_count: int) -> bytearray:
+        bitmap = bytearray((records_count + 7) // 8)
+
+        for position in positions:
+            bitmap[position >> 3] |= 1 << (position & 7)
+
+        return bitmap
+
+    def __position(self, record_key: RecordKey) -> int | None:
+        position = bisect.bisect_left(self.__sorted_record_keys, record_key)
+
+        if (
+            position < len(self.__sorted_record_keys)
+            and self.__sorted_record_keys[position] == record_key
+        ):
+            return position
+
+        return None
+
+    def __in_any(self, *, position: int, categories: Collection[str]) -> bool:
+        return any(
+            _contains(self.__positions_by_category[category_text], position)
+            for category_text in categories
+            if category_text in self.__positions_by_category
+        )
+
+    def filter(
+        self,
+        *,
+        record_keys: Iterable[RecordKey],
+        include_categories: Collection[str] = (),
+        exclude_categories: Collection[str] = (),
+    ) -> tuple[RecordKey, ...]:
+        """
+        Return the RecordKeys of record_keys, in order, whose Records have at least one of include_categories, and none of exclude_categories.
+
+        Every Record in the catalog is included if include_categories is empty. RecordKeys that are not in the catalog are left out.
+        """
+
+        filtered_record_keys: list[RecordKey] = []
+
+        for record_key in record_keys:
+            position = self.__position(record_key)
+
+            if (
+                position is not None
+                and (
+                    not include_categories
+                    or self.__in_any(position=position, categories=include_categories)
+                )
+                and not self.__in_any(position=position, categories=exclude_categories)
+            ):
+                filtered_record_keys.append(record_key)
+
+        return tuple(filtered_record_keys)
@@ -0,0 +1,59 @@
+import sys
+from array import array
+from collections.abc import Iterable
+
+from app.models import wikipedia
+
+
+class CategoryRegistry:
+    """
+    A registry of every distinct Category of the Articles in a catalog, that assigns each Category an integer ID.
+
+    IDs are assigned in the order Categories are first registered, starting from 0, so they can index arrays and bitsets.
+    Each distinct Category is held once, and shared by every Article that is built from the registry.
+
+    A CategoryRegistry consists of:
+        - __categories: A list of each registered Category, by ID.
+        - __ids_by_category: A dictionary of type (text, link): int, that holds the ID of each registered Category.
+
+    Categories are registered while a catalog is built, or extended by a reload, one thread at a time. Registering a Category never changes
+    the ID of another, so the Categories that were registered before can be read at the same time without a lock.
+    """
+
+    def __init__(self) -> None:
+        self.__categories: list[wikipedia.Category] = []
+        self.__ids_by_category: dict[tuple[str | None, str | None], int] = {}
+
+    def __getitem__(self, category_id: int) -> wikipedia.Category:
+        return self.__categories[category_id]
+
+    def __len__(self) -> int:
+        return len(self.__categories)
+
+    def category_id(self, *, category: wikipedia.Category) -> int | None:
+        """Return the ID of a Category, or None if it has not been registered."""
+
+        return self.__ids_by_category.get((category.text, category.link))
+
+    def register(self, *, category: wikipedia.Category) -> int:
+        """Return the ID of a Category, and assign it the next ID if it has not been registered."""
+
+        category_id = self.__ids_by_category.get((category.text, category.link))
+        if category_id is not None:
+            return category_id
+
+        category_id = len(self.__categories)
+        self.__categories.append(
+            wikipedia.Category(
+                text=sys.intern(category.text) if category.text is not None else None,
+                link=sys.intern(category.link) if category.link is not None else None,
+            )
+        )
+        self.__ids_by_category[(category.text, category.link)] = category_id
+
+        return category_id
+
+    def register_all(self, *, categories: Iterable[wikipedia.Category]) -> array[int]:
+        """Return an array of the IDs of categories, in order, and register those that have not been registered."""
+
+        return array("I", (self.register(category=category) for category in categories))
@@ -0,0 +1,337 @@
+import marshal
+import math
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, Self
+
+from app.caches import TtlCache
+from app.models import Record, wikipedia
+from app.models.types import RecordKey
+from app.record_catalog.category_registry import CategoryRegistry
+
+_Link = tuple[str | None, str | None]
+
+# Output files hold the external links of an Article in this extra field, as JSON objects with exactly these keys.
+_EXTERNAL_LINKS_FIELD = "externallinks"
+_EXTERNAL_LINK_KEYS = frozenset(("title", "link"))
+
+# Output files hold the title, abstract and URL of an Article again in this extra field.
+_ABSTRACT_INFO_FIELD = "abstract_info"
+
+
+class _CompactArticle:
+    """
+    The fields of a wikipedia.Article, without Pydantic models or dictionaries.
+
+    A _CompactArticle consists of:
+        - abstract: The abstract of the Article.
+        - abstract_info_keys: A tuple of the keys of the abstract_info extra field whose values are the Article's RecordKey, abstract or URL,
+          and are rebuilt from them, or None.
+        - categories: An array of the CategoryRegistry ID of each Category of the Article, or None.
+        - external_links: A tuple of the (title, link) of each ExternalLink of the Article, or None.
+        - extra: The other extra fields of the Article, serialized by marshal, or None if it has none.
+        - extra_external_links: A tuple of the (title, link) of each external link in the externallinks extra field, or None.
+        - url: The URL of the Article.
+    """
+
+    __slots__ = (
+        "abstract",
+        "abstract_info_keys",
+        "categories",
+        "external_links",
+        "extra",
+        "extra_external_links",
+        "url",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        abstract: str | None,
+        abstract_info_keys: tuple[str, ...] | None,
+        categories: array[int] | None,
+        external_links: tuple[_Link, ...] | None,
+        extra: bytes | None,
+        extra_external_links: tuple[_Link, ...] | None,
+        url: str,
+    ) -> None:
+        self.abstract = abstract
+        self.abstract_info_keys = abstract_info_keys
+        self.categories = categories
+        self.external_links = external_links
+        self.extra = extra
+        self.extra_external_links = extra_external_links
+        self.url = url
+
+
+class _Pool:
+    """A pool of interned links, tuples of links or keys and arrays of category IDs, that equal values of every Article share while a CompactRecordStore is built."""
+
+    def __init__(self) -> None:
+        self.__category_ids: dict[bytes, array[int]] = {}
+        self.__key_tuples: dict[tuple[str, ...], tuple[str, ...]] = {}
+        self.__links: dict[_Link, _Link] = {}
+        self.__link_tuples: dict[tuple[_Link, ...], tuple[_Link, ...]] = {}
+
+    def category_ids(self, category_ids: array[int]) -> array[int]:
+        return self.__category_ids.setdefault(category_ids.tobytes(), category_ids)
+
+    def key_tuple(self, keys: Iterable[str]) -> tuple[str, ...]:
+        value = tuple(keys)
+        return self.__key_tuples.setdefault(value, value)
+
+    def link(self, text: str | None, link: str | None) -> _Link:
+        value = (
+            sys.intern(text) if text is not None else None,
+            sys.intern(link) if link is not None else None,
+        )
+        return self.__links.setdefault(value, value)
+
+    def link_tuple(self, links: Iterable[_Link]) -> tuple[_Link, ...]:
+        value = tuple(links)
+        return self.__link_tuples.setdefault(value, value)
+
+
+class CompactRecordStore(Mapping[RecordKey, Record]):
+    """
+    A read-only Mapping of Records, that holds wikipedia.Articles in a compact form and only builds an Article when it is requested.
+
+    Articles are held as slotted objects, whose RecordKeys and links are interned, and whose Categories are held as arrays of the IDs
+    that a CategoryRegistry assigns them. Arrays of category IDs and tuples of links are shared by every Article with the same ones.
+    The links of the externallinks extra field that output files hold are interned and shared too, and the title, abstract and URL that
+    the abstract_info extra field repeats are rebuilt from the Article's own. Other extra fields are held serialized by marshal, which keeps
+    tuples apart from lists. Records that are not wikipedia.Articles are held as they are.
+
+    A CompactRecordStore consists of:
+        - __cache: A TtlCache of the most recently used Records. Its entries never expire, and the least recently used is evicted when it is full.
+        - __cache_max_size: The maximum number of Records in __cache.
+        - __category_registry: The CategoryRegistry of every Category of the Articles.
+        - __records_by_key: A dictionary of type RecordKey: _CompactArticle | Record, in the order the Records were read.
+
+    A later Record replaces an earlier one with the same RecordKey, just like in a dictionary of every Record.
+    """
+
+    def __init__(
+        self,
+        *,
+        records: Iterable[Record],
+        cache_max_size: int,
+        category_registry: CategoryRegistry | None = None,
+    ) -> None:
+        self.__cache: TtlCache[RecordKey, Record] = TtlCache(
+            max_size=cache_max_size, ttl=math.inf
+        )
+        self.__cache_max_size = cache_max_size
+        self.__category_registry = category_registry or CategoryRegistry()
+        self.__records_by_key: dict[RecordKey, _CompactArticle | Record] = {}
+
+        self.__add(records=records)
+
+    def __add(self, *, records: Iterable[Record]) -> None:
+        pool = _Pool()
+        for record in records:
+            self.__records_by_key[sys.intern(record.key)] = (
+                self.__compact(
+                    article=record,
+                    category_registry=self.__category_registry,
+                    pool=pool,
+                )
+                if isinstance(record, wikipedia.Article)
+                else record
+            )
+
+    @staticmethod
+    def __compact(
+        *,
+        article: wikipedia.Article,
+        category_registry: CategoryRegistry,
+        pool: _Pool,
+    ) -> _CompactArticle:
+        url = str(article.url)
+        extra = dict(article.model_extra or {})
+
+        abstract_info_keys: tuple[str, ...] | None = None
+        abstract_info = extra.get(_ABSTRACT_INFO_FIELD)
+        if isinstance(abstract_info, dict):
+            article_values = {
+                "title": article.key,
+                "abstract": article.abstract,
+                "url": url,
+            }
+            abstract_info_keys = pool.key_tuple(
+                key
+                for key, value in abstract_info.items()
+                if key in article_values and article_values[key] == value
+            )
+            extra[_ABSTRACT_INFO_FIELD] = {
+                key: value
+                for key, value in abstract_info.items()
+                if key not in abstract_info_keys
+            }
+            if not extra[_ABSTRACT_INFO_FIELD]:
+                del extra[_ABSTRACT_INFO_FIELD]
+
+        extra_external_links: tuple[_Link, ...] | None = None
+        external_links_json = extra.get(_EXTERNAL_LINKS_FIELD)
+        # External links that hold anything but a string or None title and link are kept as they are.
+        if isinstance(external_links_json, list) and all(
+            isinstance(external_link, dict)
+            and external_link.keys() == _EXTERNAL_LINK_KEYS
+            and all(
+                value is None or isinstance(value, str)
+                for value in external_link.values()
+            )
+            for external_link in external_links_json
+        ):
+            extra_external_links = pool.link_tuple(
+                pool.link(external_link["title"], external_link["link"])
+                for external_link in external_links_json
+            )
+            del extra[_EXTERNAL_LINKS_FIELD]
+
+        return _CompactArticle(
+            abstract=article.abstract,
+            abstract_info_keys=abstract_info_keys,
+            categories=pool.category_ids(
+                category_registry.register_all(categories=article.categories)
+            )
+            if article.categories is not None
+            else None,
+            external_links=pool.link_tuple(
+                pool.link(external_link.title, external_link.link)
+                for external_link in article.external_links
+            )
+            if article.external_links is not None
+            else None,
+            extra=marshal.dumps(extra) if extra else None,
+            extra_external_links=extra_external_links,
+            url=url,
+        )
+
+    @staticmethod
+    def __extra(
+        *, record_key: RecordKey, compact_article: _CompactArticle
+    ) -> dict[str, Any]:
+        """Return the extra fields of a compact Article, with the abstract_info and externallinks fields rebuilt."""
+
+        # The extra fields were serialized by this process, and are never read from storage.
+        extra: dict[str, Any] = (
+            marshal.loads(compact_article.extra)  # noqa: S302
+            if compact_article.extra is not None
+            else {}
+        )
+
+        if compact_article.abstract_info_keys is not None:
+            article_values = {
+                "title": record_key,
+                "abstract": compact_article.abstract,
+                "url": compact_article.url,
+            }
+            extra = {
+                _ABSTRACT_INFO_FIELD: {
+                    **{
+                        key: article_values[key]
+                        for key in compact_article.abstract_info_keys
+                    },
+                    **extra.get(_ABSTRACT_INFO_FIELD, {}),
+                },
+                **{
+                    key: value
+                    for key, value in extra.items()
+                    if key != _ABSTRACT_INFO_FIELD
+                },
+            }
+
+        if compact_article.extra_external_links is not None:
+            extra[_EXTERNAL_LINKS_FIELD] = [
+                {"title": title, "link": link}
+                for title, link in compact_article.extra_external_links
+            ]
+
+        return extra
+
+    def __article(
+        self, *, record_key: RecordKey, compact_article: _CompactArticle
+    ) -> wikipedia.Article:
+        # The Categories of the CategoryRegistry are shared, since Pydantic does not copy model instances that it validates.
+        return wikipedia.Article.model_validate(
+            {
+                "title": record_key,
+                "url": compact_article.url,
+                "abstract": compact_article.abstract,
+                "categories": [
+                    self.__category_registry[category_id]
+                    for category_id in compact_article.categories
+                ]
+                if compact_article.categories is not None
+                else None,
+                "external_links": [
+                    {"title": title, "link": link}
+                    for title, link in compact_article.external_links
+                ]
+                if compact_article.external_links is not None
+                else None,
+                **self.__extra(record_key=record_key, compact_article=compact_article),
+            }
+        )
+
+    def __getitem__(self, record_key: RecordKey) -> Record:
+        record_or_compact_article = self.__records_by_key[record_key]
+
+        if not isinstance(record_or_compact_article, _CompactArticle):
+            return record_or_compact_article
+
+        record = self.__cache.get(record_key)
+        if record is not None:
+            return record
+
+        record = self.__article(
+            record_key=record_key, compact_article=record_or_compact_article
+        )
+        self.__cache.set(record_key, record)
+        return record
+
+    def __iter__(self) -> Iterator[RecordKey]:
+        return iter(self.__records_by_key)
+
+    def __len__(self) -> int:
+        return len(self.__records_by_key)
+
+    def __contains__(self, record_key: object) -> bool:
+        return record_key in self.__records_by_key
+
+    @property
+    def category_registry(self) -> CategoryRegistry:
+        """The CategoryRegistry of every Category of the Articles in the store."""
+
+        return self.__category_registry
+
+    def category_ids(self, *, record_key: RecordKey) -> array[int] | None:
+        """Return an array of the CategoryRegistry IDs of the Categories of a Record, without building the Record, or None if it is not an Article with Categories."""
+
+        record_or_compact_article = self.__records_by_key[record_key]
+
+        return (
+            record_or_compact_article.categories
+            if isinstance(record_or_compact_article, _CompactArticle)
+            else None
+        )
+
+    def with_records(self, *, records: Iterable[Record]) -> Self:
+        """
+        Return a new CompactRecordStore of the Records of this store and records, that shares the compact Articles and CategoryRegistry of this store.
+
+        A Record of records replaces a Record of this store with the same RecordKey. This store is not changed, and may still be read.
+        """
+
+        compact_record_store = type(self)(
+            records=(),
+            cache_max_size=self.__cache_max_size,
+            category_registry=self.__category_registry,
+        )
+        # The new store is filled in by this store, which is of the same class.
+        compact_record_store.__records_by_key.update(self.__records_by_key)  # noqa: SLF001
+        compact_record_store.__add(records=records)  # noqa: SLF001
+
+        return compact_record_store
@@ -0,0 +1,44 @@
+from app.models import Settings
+from app.readers import AllSourceReader
+from app.record_catalog.catalog_snapshot import CatalogSnapshot
+from app.record_catalog.compact_record_store import CompactRecordStore
+from app.record_catalog.lazy_record_store import LazyRecordStore
+from app.record_catalog.record_catalog import RecordCatalog
+
+
+def create_record_catalog(*, settings: Settings) -> RecordCatalog:
+    """
+    Return a RecordCatalog of every Record in the output files.
+
+    Records are served from the catalog snapshot if it was compiled from the current output files.
+    Otherwise, they are parsed on demand if settings.record_store_lazy is set, or read up front if it is not.
+    Records that are read up front are held in a compact form if settings.record_store_compact is set.
+    """
+
+    if settings.catalog_snapshot_file_path is not None:
+        catalog_snapshot = CatalogSnapshot.open(
+            file_path=settings.catalog_snapshot_file_path,
+            source_file_paths=settings.output_file_paths,
+            cache_max_size=settings.record_store_cache_max_size,
+        )
+        if catalog_snapshot is not None:
+            return RecordCatalog(records=catalog_snapshot)
+
+    if settings.record_store_lazy:
+        return RecordCatalog(
+            records=LazyRecordStore(
+                file_paths=settings.output_file_paths,
+                cache_max_size=settings.record_store_cache_max_size,
+                index_directory_path=settings.record_store_index_directory_path,
+            )
+        )
+
+    if settings.record_store_compact:
+        return RecordCatalog(
+            records=CompactRecordStore(
+                records=AllSourceReader(settings=settings).read(),
+                cache_max_size=settings.record_store_cache_max_size,
+            )
+        )
+
+    return RecordCatalog(records=AllSourceReader(settings=settings).read())
@@ -0,0 +1,198 @@
+import contextlib
+import json
+import math
+import mmap
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+
+from app.caches import TtlCache
+from app.models import Record
+from app.models.types import RecordKey
+from app.readers.reader import WikipediaReader, is_compressed
+
+# A sidecar index of another version is rebuilt, rather than read.
+_INDEX_VERSION = 2
+
+
+def _read_record_offsets(
+    *, file_path: Path, index_directory_path: Path | None
+) -> list[tuple[RecordKey, int, int, tuple[str, ...]]]:
+    """
+    Return the RecordKey, byte offset, byte length and category texts of every record in a Wikipedia output file.
+
+    If index_directory_path is set, the offsets are read from a sidecar index file in it, as long as the index was written for the current
+    size and modification time of the output file. Otherwise, the output file is scanned and the sidecar index is written for the next start.
+    """
+
+    file_stat = file_path.stat()
+    index_file_path = (
+        index_directory_path / (file_path.name + ".offsets.json")
+        if index_directory_path is not None
+        else None
+    )
+
+    if index_file_path is not None and index_file_path.exists():
+        index_json = json.loads(index_file_path.read_bytes())
+        if (
+            index_json.get("version") == _INDEX_VERSION
+            and index_json["file_size"] == file_stat.st_size
+            and index_json["file_mtime_ns"] == file_stat.st_mtime_ns
+        ):
+            return [
+                (str(record_key), int(offset), int(length), tuple(category_texts))
+                for record_key, offset, length, category_texts in index_json[
+                    "record_offsets"
+                ]
+            ]
+
+    record_offsets = list(WikipediaReader(file_path=file_path).read_record_offsets())
+
+    # A sidecar index that can't be written is rebuilt on the next start.
+    if index_file_path is not None:
+        with contextlib.suppress(OSError):
+            index_file_path.parent.mkdir(parents=True, exist_ok=True)
+            index_file_path.write_text(
+                json.dumps(
+                    {
+                        "version": _INDEX_VERSION,
+                        "file_size": file_stat.st_size,
+                        "file_mtime_ns": file_stat.st_mtime_ns,
+                        "record_offsets": record_offsets,
+                    }
+                ),
+                encoding="utf-8",
+            )
+
+    return record_offsets
+
+
+class LazyRecordStore(Mapping[RecordKey, Record]):
+    """
+    A read-only Mapping of the Records in Wikipedia output files, that only parses and validates a Record when it is requested.
+
+    Only the RecordKeys, the location of each record line and the category texts of each record are held in memory. Record lines are read through memory maps of the
+    output files, so the operating system pages them in and out as needed. Compressed output files can't be memory mapped.
+
+    A LazyRecordStore consists of:
+        - __cache: A TtlCache of the most recently used Records. Its entries never expire, and the least recently used is evicted when it is full.
+        - __category_texts: A list of a tuple of the category texts of each record, by position. Equal texts and tuples are shared.
+        - __file_indices: An array of the index in __memory_maps of each record's output file, by position.
+        - __lengths: An array of the byte length of each record line, by position.
+        - __memory_maps: A tuple of memory maps of every non-empty output file.
+        - __offsets: An array of the byte offset of each record line, by position.
+        - __positions_by_key: A dictionary of type RecordKey: int, that holds the position of each record in the arrays above.
+
+    RecordKeys are ordered as they are read, and a later record replaces an earlier one with the same RecordKey,
+    just like a dictionary of every Record that is read by the Readers of the output files.
+    """
+
+    def __init__(
+        self,
+        *,
+        file_paths: Iterable[Path],
+        cache_max_size: int,
+        index_directory_path: Path | None = None,
+    ) -> None:
+        self.__cache: TtlCache[RecordKey, Record] = TtlCache(
+            max_size=cache_max_size, ttl=math.inf
+        )
+        self.__category_texts: list[tuple[str, ...]] = []
+        self.__file_indices = array("H")
+        self.__lengths = array("I")
+        self.__offsets = array("Q")
+        self.__positions_by_key: dict[RecordKey, int] = {}
+
+        category_texts_pool: dict[tuple[str, ...], tuple[str, ...]] = {}
+        memory_maps: list[mmap.mmap] = []
+        for file_path in file_paths:
+            # An empty file holds no records, and can't be memory mapped.
+            if file_path.stat().st_size == 0:
+                continue
+
+            if is_compressed(file_path):
+                message = f"{file_path} is compressed, and can't be memory mapped. Decompress it to read its Records lazily."
+                raise ValueError(message)
+
+            with file_path.open("rb") as file:
+                memory_maps.append(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+            for record_key, offset, length, category_texts in _read_record_offsets(
+                file_path=file_path, index_directory_path=index_directory_path
+            ):
+                interned_category_texts = tuple(map(sys.intern, category_texts))
+                self.__add(
+                    record_key=record_key,
+                    file_index=len(memory_maps) - 1,
+                    offset=offset,
+                    length=length,
+                    category_texts=category_texts_pool.setdefault(
+                        interned_category_texts, interned_category_texts
+                    ),
+                )
+
+        self.__memory_maps = tuple(memory_maps)
+
+    def __add(
+        self,
+        *,
+        record_key: RecordKey,
+        file_index: int,
+        offset: int,
+        length: int,
+        category_texts: tuple[str, ...],
+    ) -> None:
+        position = self.__positions_by_key.get(record_key)
+
+        if position is None:
+            self.__positions_by_key[record_key] = len(self.__offsets)
+            self.__category_texts.append(category_texts)
+            self.__file_indices.append(file_index)
+            self.__offsets.append(offset)
+            self.__lengths.append(length)
+            return
+
+        self.__category_texts[position] = category_texts
+        self.__file_indices[position] = file_index
+        self.__offsets[position] = offset
+        self.__lengths[position] = length
+
+    def __getitem__(self, record_key: RecordKey) -> Record:
+        position = self.__positions_by_key[record_key]
+
+        record = self.__cache.get(record_key)
+        if record is not None:
+            return record
+
+        offset = self.__offsets[position]
+        record = WikipediaReader.parse_json_line(
+            self.__memory_maps[self.__file_indices[position]][
+                offset : offset + self.__lengths[position]
+            ]
+        )
+        if record is None:
+            raise KeyError(record_key)
+
+        self.__cache.set(record_key, record)
+        return record
+
+    def __iter__(self) -> Iterator[RecordKey]:
+        return iter(self.__positions_by_key)
+
+    def __len__(self) -> int:
+        return len(self.__positions_by_key)
+
+    def __contains__(self, record_key: object) -> bool:
+        return record_key in self.__positions_by_key
+
+    def category_texts(self, *, record_key: RecordKey) -> tuple[str, ...]:
+        """Return the category texts of a Record, without reading or parsing the Record."""
+
+        return self.__category_texts[self.__positions_by_key[record_key]]
+
+    def close(self) -> None:
+        """Close the memory maps of every output file. Records that are cached remain available."""
+
+        for memory_map in self.__memory_maps:
+            memory_map.close()
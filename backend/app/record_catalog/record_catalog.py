@@ -0,0 +1,127 @@
+import threading
+from collections.abc import Iterable, Iterator, Mapping
+from types import MappingProxyType
+
+from app.models import Record, wikipedia
+from app.models.types import RecordKey
+from app.record_catalog.catalog_snapshot import CatalogSnapshot
+from app.record_catalog.category_index import CategoryIndex
+from app.record_catalog.compact_record_store import CompactRecordStore
+from app.record_catalog.lazy_record_store import LazyRecordStore
+
+
+class RecordCatalog(Mapping[RecordKey, Record]):
+    """
+    A read-only catalog of Records.
+
+    A RecordCatalog is shared by every AntiRecommendationEngine. It is never changed once it is built: a RecordCatalogReloader builds
+    a new RecordCatalog when the output files change, and swaps it in.
+
+    A RecordCatalog consists of:
+        - __category_index: The CategoryIndex of the Records in the catalog, once it has been built.
+        - __records_by_key: A read-only Mapping of type RecordKey: Record, that holds Records obtained from storage.
+        - __sorted_record_keys: A tuple of every RecordKey in the catalog, in sorted order.
+
+    A RecordCatalog is built from Records, or from a Mapping of Records such as a LazyRecordStore, which is used as it is rather than copied.
+    """
+
+    def __init__(
+        self, *, records: Iterable[Record] | Mapping[RecordKey, Record]
+    ) -> None:
+        self.__records_by_key: Mapping[RecordKey, Record] = (
+            records
+            if isinstance(records, Mapping)
+            else MappingProxyType({record.key: record for record in records})
+        )
+        self.__sorted_record_keys: tuple[RecordKey, ...] = tuple(
+            sorted(self.__records_by_key.keys())
+        )
+
+        self.__category_index: CategoryIndex | None = None
+        self.__category_index_lock = threading.Lock()
+
+    def __getitem__(self, record_key: RecordKey) -> Record:
+        return self.__records_by_key[record_key]
+
+    def __iter__(self) -> Iterator[RecordKey]:
+        return iter(self.__records_by_key)
+
+    def __len__(self) -> int:
+        return len(self.__records_by_key)
+
+    def __category_texts(self, *, record_key: RecordKey) -> Iterable[str | None]:
+        """Return the category texts of a Record, without building the Record if the catalog holds it in a compact form, or in a file."""
+
+        if isinstance(self.__records_by_key, CompactRecordStore):
+            category_ids = self.__records_by_key.category_ids(record_key=record_key)
+            category_registry = self.__records_by_key.category_registry
+
+            return (
+                (category_registry[category_id].text for category_id in category_ids)
+                if category_ids is not None
+                else ()
+            )
+
+        if isinstance(self.__records_by_key, CatalogSnapshot | LazyRecordStore):
+            return self.__records_by_key.category_texts(record_key=record_key)
+
+        record = self.__records_by_key[record_key]
+
+        return (
+            (category.text for category in record.categories or ())
+            if isinstance(record, wikipedia.Article)
+            else ()
+        )
+
+    @property
+    def category_index(self) -> CategoryIndex:
+        """
+        The CategoryIndex of the Records in the catalog.
+
+        It is built the first time it is used, from the category texts of every Record. A catalog that holds its Records in a compact form,
+        in a snapshot or in output files reads those texts without building its Records.
+        """
+
+        with self.__category_index_lock:
+            if self.__category_index is None:
+                self.__category_index = CategoryIndex(
+                    sorted_record_keys=self.__sorted_record_keys,
+                    record_category_texts=(
+                        self.__category_texts(record_key=record_key)
+                        for record_key in self.__sorted_record_keys
+                    ),
+                )
+
+            return self.__category_index
+
+    def with_records(self, *, records: Iterable[Record]) -> "RecordCatalog | None":
+        """
+        Return a new RecordCatalog of the Records of this catalog and records, or None if this catalog reads its Records from files on demand.
+
+        A Record of records replaces a Record of this catalog with the same RecordKey. Records that this catalog holds are shared rather
+        than copied, and stay in a compact form if they are held in one. This catalog is not changed, and may still be read.
+        """
+
+        if isinstance(self.__records_by_key, CompactRecordStore):
+            return RecordCatalog(
+                records=self.__records_by_key.with_records(records=records)
+            )
+
+        if isinstance(self.__records_by_key, MappingProxyType):
+            records_by_key = dict(self.__records_by_key)
+            records_by_key.update((record.key, record) for record in records)
+            return RecordCatalog(records=MappingProxyType(records_by_key))
+
+        return None
+
+    @property
+    def first_record_key(self) -> RecordKey:
+        """The RecordKey of the first Record that was read into the catalog."""
+
+        return next(iter(self.__records_by_key))
+
+    @property
+    def sorted_record_keys(self) -> tuple[RecordKey, ...]:
+        """A tuple of every RecordKey in the catalog, in sorted order."""
+
+        return self.__sorted_record_keys
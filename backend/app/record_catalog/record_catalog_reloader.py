@@ -0,0 +1,217 @@
+import hashlib
+import itertools
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from app.concurrency import run_in_thread_pool
+from app.models import Settings
+from app.readers.reader import WikipediaReader, is_compressed
+from app.record_catalog.create_record_catalog import create_record_catalog
+from app.record_catalog.record_catalog import RecordCatalog
+
+_logger = logging.getLogger(__name__)
+
+# The number of bytes at the end of the read part of an output file that must not change for the file to be read as appended to.
+_TAIL_SIZE = 4096
+
+
+def _tail_digest(*, file_path: Path, size: int) -> bytes:
+    """Return the SHA-256 digest of the last _TAIL_SIZE bytes of the first size bytes of a file."""
+
+    with file_path.open("rb") as file:
+        file.seek(max(size - _TAIL_SIZE, 0))
+        return hashlib.sha256(file.read(min(size, _TAIL_SIZE))).digest()
+
+
+@dataclass(frozen=True)
+class _OutputFileState:
+    """The size, modification time and tail digest of an output file when it was read into a RecordCatalog."""
+
+    mtime_ns: int
+    size: int
+    tail_digest: bytes
+
+    @classmethod
+    def of(cls, file_path: Path) -> Self:
+        stat_result = file_path.stat()
+
+        return cls(
+            mtime_ns=stat_result.st_mtime_ns,
+            size=stat_result.st_size,
+            tail_digest=_tail_digest(file_path=file_path, size=stat_result.st_size),
+        )
+
+
+class RecordCatalogReloader:
+    """
+    A holder of the current RecordCatalog of the output files, that builds a new version of the catalog when they change, and swaps it in.
+
+    A new version only reads what changed since the last one: the Records of new output files, and the lines that were appended to
+    uncompressed output files. It is built from the current version, whose Records it shares. The whole catalog is read again if an
+    output file was removed or rewritten, or if the catalog reads its Records from files on demand, which reuses the record offset
+    indices of unchanged files.
+
+    A RecordCatalogReloader consists of:
+        - __file_states: A dictionary of type Path: _OutputFileState, that holds the state of each output file in the current version.
+        - __on_reload: A function that is called with each new version, once it is swapped in.
+        - __record_catalog: The current RecordCatalog.
+        - __reload_lock: A lock that lets one reload run at a time.
+        - __version: The number of the current version, starting from 1.
+
+    New versions are built on a worker thread, and swapped in by replacing a single reference, so serving never pauses.
+    An AntiRecommendationEngine reads one version for the whole of a request, so requests that are in flight finish against
+    the version they started with.
+
+    Output files are checked every settings.catalog_reload_interval seconds on a background thread, if it is set.
+    """
+
+    def __init__(self, *, settings: Settings) -> None:
+        self.__settings = settings
+        # Output files are checked before they are read, so that changes made while they are read are picked up by the next reload.
+        self.__file_states = self.__read_file_states()
+        self.__record_catalog = self.__with_category_index(
+            create_record_catalog(settings=settings)
+        )
+        self.__on_reload: Callable[[RecordCatalog], None] = lambda _: None
+        self.__reload_lock = threading.Lock()
+        self.__version = 1
+
+        self.__closed = threading.Event()
+        self.__reload_thread: threading.Thread | None = None
+
+    def __read_file_states(self) -> dict[Path, _OutputFileState]:
+        return {
+            file_path: _OutputFileState.of(file_path)
+            for file_path in self.__settings.output_file_paths
+            if file_path.exists()
+        }
+
+    def __with_category_index(self, record_catalog: RecordCatalog) -> RecordCatalog:
+        """Build the CategoryIndex of a RecordCatalog if settings.category_index_precompute is set, and return the catalog."""
+
+        if self.__settings.category_index_precompute:
+            record_catalog.category_index  # noqa: B018
+
+        return record_catalog
+
+    def __changed_readers(
+        self, *, file_states: dict[Path, _OutputFileState]
+    ) -> tuple[WikipediaReader, ...] | None:
+        """Return WikipediaReaders of the new and appended parts of the output files, or None if an output file was removed or rewritten."""
+
+        if not file_states.keys() >= self.__file_states.keys():
+            return None
+
+        readers: list[WikipediaReader] = []
+
+        for file_path, file_state in file_states.items():
+            previous_file_state = self.__file_states.get(file_path)
+
+            if previous_file_state is None:
+                readers.append(
+                    WikipediaReader(file_path=file_path, end_offset=file_state.size)
+                )
+            elif file_state == previous_file_state:
+                continue
+            elif (
+                not is_compressed(file_path)
+                and file_state.size > previous_file_state.size
+                and _tail_digest(file_path=file_path, size=previous_file_state.size)
+                == previous_file_state.tail_digest
+            ):
+                readers.append(
+                    WikipediaReader(
+                        file_path=file_path,
+                        start_offset=previous_file_state.size,
+                        end_offset=file_state.size,
+                    )
+                )
+            else:
+                return None
+
+        return tuple(readers)
+
+    def __reload_periodically(self, *, interval: float) -> None:
+        """Reload the catalog every interval seconds, until the RecordCatalogReloader is closed."""
+
+        while not self.__closed.wait(timeout=interval):
+            try:
+                self.reload()
+            except Exception:
+                # An output file may be read while it is being written, or hold a malformed line, and on_reload may fail.
+                # Whatever failed, the current version is kept and the reload is retried, so the thread must keep running.
+                _logger.exception("Reloading the record catalog failed")
+
+    @property
+    def record_catalog(self) -> RecordCatalog:
+        """The current RecordCatalog."""
+
+        return self.__record_catalog
+
+    @property
+    def version(self) -> int:
+        """The number of the current version of the RecordCatalog, starting from 1."""
+
+        return self.__version
+
+    def start(self, *, on_reload: Callable[[RecordCatalog], None]) -> None:
+        """Call on_reload with each new version of the RecordCatalog, and start checking output files on a background thread if settings.catalog_reload_interval is set."""
+
+        self.__on_reload = on_reload
+
+        if (
+            self.__settings.catalog_reload_interval is not None
+            and self.__reload_thread is None
+        ):
+            self.__reload_thread = threading.Thread(
+                target=self.__reload_periodically,
+                kwargs={"interval": self.__settings.catalog_reload_interval},
+                name="record-catalog-reloader",
+                daemon=True,
+            )
+            self.__reload_thread.start()
+
+    def reload(self) -> RecordCatalog | None:
+        """Build a new version of the RecordCatalog if the output files changed, swap it in, and return it. Return None if they did not change."""
+
+        with self.__reload_lock:
+            file_states = self.__read_file_states()
+            if file_states == self.__file_states:
+                return None
+
+            changed_readers = self.__changed_readers(file_states=file_states)
+            record_catalog = (
+                self.__record_catalog.with_records(
+                    records=itertools.chain.from_iterable(
+                        reader.read() for reader in changed_readers
+                    )
+                )
+                if changed_readers is not None
+                else None
+            )
+            if record_catalog is None:
+                record_catalog = create_record_catalog(settings=self.__settings)
+
+            self.__record_catalog = self.__with_category_index(record_catalog)
+            self.__file_states = file_states
+            self.__version += 1
+
+            self.__on_reload(self.__record_catalog)
+
+            return self.__record_catalog
+
+    async def areload(self) -> RecordCatalog | None:
+        """Reload the RecordCatalog like reload does, on a worker thread, without blocking the event loop."""
+
+        return await run_in_thread_pool(self.reload)
+
+    def close(self) -> None:
+        """Stop checking output files."""
+
+        self.__closed.set()
+        if self.__reload_thread is not None:
+            self.__reload_thread.join()
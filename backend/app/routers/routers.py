@@ -1,13 +1,30 @@
+from collections.abc import AsyncIterator
+from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import SecretStr
 
 from app.anti_recommendation_engine import AntiRecommendationEngine
+from app.anti_recommenders import AntiRecommenderException
+from app.anti_recommenders.arkg import ArkgAntiRecommender
 from app.auth import AuthException, AuthResponse
-from app.dependencies import check_user_authentication
-from app.models import AuthToken, Credentials, Record
+from app.dependencies import (
+    check_admin_token,
+    get_anti_recommendation_engine,
+    optional_oauth2_scheme,
+)
+from app.models import (
+    ArkgReloadMetrics,
+    AuthToken,
+    CatalogVersion,
+    Credentials,
+    CredentialsError,
+    Record,
+)
+from app.models.settings import DATA_DIRECTORY_PATH
 from app.models.types import RecordKey
 
 router = APIRouter(prefix="/api/v1", tags=["/api/v1"])
@@ -18,7 +35,7 @@ async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()], request: Request
 ) -> AuthToken:
     try:
-        sign_in_result: AuthResponse = request.app.state.auth_service.sign_in(
+        sign_in_result: AuthResponse = await request.app.state.auth_service.asign_in(
             authentication_credentials=Credentials(
                 email=form_data.username, password=SecretStr(form_data.password)
             )
@@ -28,11 +45,10 @@ async def login(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from exception
 
-    request.app.state.anti_recommendation_engine = AntiRecommendationEngine(
-        user=request.app.state.user_service.create_user_from_token(
+    await request.app.state.session_engine_registry.acreate_engine(
+        user=await request.app.state.user_service.acreate_user_from_token(
             authentication_token=sign_in_result.authentication_token
-        ),
-        settings=request.app.state.settings,
+        )
     )
 
     return sign_in_result.authentication_token
@@ -42,7 +58,7 @@ async def login(
 async def sign_in_anonymously(request: Request) -> AuthToken:
     try:
         sign_in_anonymously_result: AuthResponse = (
-            request.app.state.auth_service.sign_in_anonymously()
+            await request.app.state.auth_service.asign_in_anonymously()
         )
     except AuthException as exception:
         raise HTTPException(
@@ -57,7 +73,7 @@ async def sign_up(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()], request: Request
 ) -> AuthToken:
     try:
-        sign_up_result: AuthResponse = request.app.state.auth_service.sign_up(
+        sign_up_result: AuthResponse = await request.app.state.auth_service.asign_up(
             authentication_credentials=Credentials(
                 email=form_data.username, password=SecretStr(form_data.password)
             )
@@ -67,59 +83,223 @@ async def sign_up(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from exception
 
-    request.app.state.anti_recommendation_engine = AntiRecommendationEngine(
-        user=request.app.state.user_service.create_user_from_token(
+    await request.app.state.session_engine_registry.acreate_engine(
+        user=await request.app.state.user_service.acreate_user_from_token(
             authentication_token=sign_up_result.authentication_token
-        ),
-        settings=request.app.state.settings,
+        )
     )
 
     return sign_up_result.authentication_token
 
 
 @router.get("/sign_out")
-async def sign_out(request: Request) -> None:
+async def sign_out(
+    request: Request,
+    access_token: Annotated[SecretStr | None, Depends(optional_oauth2_scheme)] = None,
+) -> None:
+    """
+    The path operation function of the /sign_out endpoint.
+
+    The bearer access token, if any, is revoked in this process, so that it is rejected until it expires.
+    An access token that is not valid is not signed out.
+    """
+
+    if access_token:
+        try:
+            await request.app.state.auth_service.arevoke(
+                authentication_token=AuthToken(access_token=access_token)
+            )
+        except AuthException as exception:
+            raise CredentialsError from exception
+
     try:
-        request.app.state.auth_service.sign_out()
+        await request.app.state.auth_service.asign_out()
     except AuthException as exception:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST) from exception
 
 
-@router.get(
-    "/next_records/{record_key}", dependencies=[Depends(check_user_authentication)]
-)
+@router.get("/next_records/{record_key}")
 async def next_records(
     record_key: RecordKey,
-    request: Request,
+    anti_recommendation_engine: Annotated[
+        AntiRecommendationEngine, Depends(get_anti_recommendation_engine)
+    ],
+    include_categories: Annotated[list[str] | None, Query()] = None,
+    exclude_categories: Annotated[list[str] | None, Query()] = None,
 ) -> tuple[Record, ...]:
     """
     The path operation function of the /next_records endpoint.
 
     Returns a tuple of Records from the AntiRecommendationEngine.
+
+    Only Records that have at least one of include_categories, if it is given, and none of exclude_categories are returned.
+    """
+
+    try:
+        return await anti_recommendation_engine.next_records(
+            record_key=record_key,
+            include_categories=include_categories or (),
+            exclude_categories=exclude_categories or (),
+        )
+    except AntiRecommenderException as exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        ) from exception
+
+
+@router.get("/next_records/{record_key}/stream")
+async def stream_next_records(
+    record_key: RecordKey,
+    anti_recommendation_engine: Annotated[
+        AntiRecommendationEngine, Depends(get_anti_recommendation_engine)
+    ],
+    include_categories: Annotated[list[str] | None, Query()] = None,
+    exclude_categories: Annotated[list[str] | None, Query()] = None,
+) -> StreamingResponse:
     """
+    The path operation function of the streaming variant of the /next_records endpoint.
 
-    return request.app.state.anti_recommendation_engine.next_records(  # type: ignore[no-any-return]
-        record_key=record_key
+    Streams Records from the AntiRecommendationEngine as newline-delimited JSON, and flushes each Record as soon as it is generated.
+    Records are filtered by category as they are by the /next_records endpoint.
+
+    The first Record is awaited before the response starts, so that an unavailable AntiRecommender still returns a 503 status.
+    """
+
+    records = anti_recommendation_engine.stream_next_records(
+        record_key=record_key,
+        include_categories=include_categories or (),
+        exclude_categories=exclude_categories or (),
     )
 
+    try:
+        first_record = await anext(records, None)
+    except AntiRecommenderException as exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        ) from exception
+
+    async def records_ndjson() -> AsyncIterator[str]:
+        if first_record is None:
+            return
+
+        yield first_record.model_dump_json() + "\n"
+
+        try:
+            async for record in records:
+                yield record.model_dump_json() + "\n"
+        except AntiRecommenderException:
+            # The status has already been sent, so the stream ends early instead.
+            return
 
-@router.get("/previous_records", dependencies=[Depends(check_user_authentication)])
-async def previous_records(request: Request) -> tuple[Record | None, ...]:
+    return StreamingResponse(records_ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/previous_records")
+async def previous_records(
+    anti_recommendation_engine: Annotated[
+        AntiRecommendationEngine, Depends(get_anti_recommendation_engine)
+    ],
+) -> tuple[Record | None, ...]:
     """
     The path operation function of the /previous_records endpoint.
 
     Returns a tuple of previous Records stored in the AntiRecommendationEngine.
     """
 
-    return request.app.state.anti_recommendation_engine.previous_records()  # type: ignore[no-any-return]
+    return await anti_recommendation_engine.previous_records()
 
 
-@router.get("/initial_records", dependencies=[Depends(check_user_authentication)])
-async def initial_records(request: Request) -> tuple[Record, ...]:
+@router.get("/initial_records")
+async def initial_records(
+    anti_recommendation_engine: Annotated[
+        AntiRecommendationEngine, Depends(get_anti_recommendation_engine)
+    ],
+) -> tuple[Record, ...]:
     """
     The path operation function of the /initial_records endpoint.
 
     Returns the intial tuple of Records from the AntiRecommendationEngine.
     """
 
-    return request.app.state.anti_recommendation_engine.initial_records()  # type: ignore[no-any-return]
+    try:
+        return await anti_recommendation_engine.initial_records()
+    except AntiRecommenderException as exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        ) from exception
+
+
+@router.post("/admin/reload_catalog", dependencies=[Depends(check_admin_token)])
+async def reload_catalog(request: Request) -> CatalogVersion:
+    """
+    The path operation function of the /admin/reload_catalog endpoint.
+
+    Reads what changed in the output files into a new version of the RecordCatalog, and swaps it in if anything changed.
+    Requests that are in flight finish against the previous version.
+    """
+
+    record_catalog_reloader = request.app.state.record_catalog_reloader
+
+    record_catalog = await record_catalog_reloader.areload()
+
+    return CatalogVersion(
+        records_count=len(record_catalog_reloader.record_catalog),
+        reloaded=record_catalog is not None,
+        version=record_catalog_reloader.version,
+    )
+
+
+def _arkg_anti_recommender(request: Request) -> ArkgAntiRecommender:
+    """Return the ArkgAntiRecommender of the app, or raise a 404 HTTPException if it does not use an ARKG."""
+
+    arkg_anti_recommender: ArkgAntiRecommender | None = (
+        request.app.state.arkg_anti_recommender
+    )
+    if arkg_anti_recommender is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return arkg_anti_recommender
+
+
+@router.post("/admin/reload_arkg", dependencies=[Depends(check_admin_token)])
+async def reload_arkg(
+    request: Request, delta_file_name: str | None = None
+) -> ArkgReloadMetrics:
+    """
+    The path operation function of the /admin/reload_arkg endpoint.
+
+    Loads and indexes a new version of the ARKG on a worker thread, swaps it in, and returns the metrics of the reload.
+    The ARKG file is loaded again, unless delta_file_name names a delta file in the data directory, which is applied on top of the current version.
+    """
+
+    arkg_anti_recommender = _arkg_anti_recommender(request)
+
+    # Only the name of a file in the data directory is accepted.
+    if delta_file_name is not None and Path(delta_file_name).name != delta_file_name:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        return await arkg_anti_recommender.areload(
+            delta_file_path=DATA_DIRECTORY_PATH / delta_file_name
+            if delta_file_name is not None
+            else None
+        )
+    except (OSError, SyntaxError, ValueError) as exception:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
+        ) from exception
+
+
+@router.get("/admin/arkg_reload_metrics", dependencies=[Depends(check_admin_token)])
+async def arkg_reload_metrics(request: Request) -> ArkgReloadMetrics:
+    """
+    The path operation function of the /admin/arkg_reload_metrics endpoint.
+
+    Returns the metrics of the last reload of the ARKG, including whether the previous version has been released since.
+    """
+
+    reload_metrics = _arkg_anti_recommender(request).reload_metrics
+    if reload_metrics is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return reload_metrics
@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+
 import pytest
 from pytest_mock import MockFixture
 
@@ -28,6 +30,20 @@ def _anti_recommender(  # noqa: PLR0913
             "_generate_llm_response",
             return_value=model_response,
         )
+        session_mocker.patch.object(
+            NormalOpenaiAntiRecommender,
+            "_agenerate_llm_response",
+            return_value=model_response,
+        )
+
+        async def astream_llm_response(*_: object) -> AsyncIterator[str]:
+            yield model_response
+
+        session_mocker.patch.object(
+            NormalOpenaiAntiRecommender,
+            "_astream_llm_response",
+            side_effect=astream_llm_response,
+        )
     else:
         pytest.skip(reason="don't have OpenAI API Key.")
 
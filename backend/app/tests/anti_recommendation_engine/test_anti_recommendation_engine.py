@@ -5,17 +5,19 @@ from app.models import Record
 from app.models.types import RecordKey
 
 
+@pytest.mark.anyio
 @pytest.mark.order(1)
-def test_get_previous_records_with_empty_stack(
+async def test_get_previous_records_with_empty_stack(
     anti_recommendation_engine: AntiRecommendationEngine,
 ) -> None:
     """Test that AntiRecommendationEngine.get_previous_records returns an empty tuple when its stack is empty."""
 
-    assert not anti_recommendation_engine.previous_records()
+    assert not await anti_recommendation_engine.previous_records()
 
 
+@pytest.mark.anyio
 @pytest.mark.order(2)
-def test_get_initial_records(
+async def test_get_initial_records(
     records: tuple[Record, ...],
     anti_recommendation_engine: AntiRecommendationEngine,
 ) -> None:
@@ -24,11 +26,12 @@ def test_get_initial_records(
     with keys that match the AntiRecommendations of the first Record in records.
     """
 
-    assert anti_recommendation_engine.initial_records() == records[1:]
+    assert await anti_recommendation_engine.initial_records() == records[1:]
 
 
+@pytest.mark.anyio
 @pytest.mark.order(3)
-def test_get_next_records(
+async def test_get_next_records(
     records: tuple[Record, ...],
     record_key: RecordKey,
     anti_recommendation_engine: AntiRecommendationEngine,
@@ -38,14 +41,44 @@ def test_get_next_records(
     with keys that match the AntiRecommendations of record_key.
     """
 
-    assert anti_recommendation_engine.next_records(record_key=record_key) == records[1:]
+    assert (
+        await anti_recommendation_engine.next_records(record_key=record_key)
+        == records[1:]
+    )
 
 
+@pytest.mark.anyio
 @pytest.mark.order(4)
-def test_get_previous_records(
+async def test_get_previous_records(
     records: tuple[Record, ...],
     anti_recommendation_engine: AntiRecommendationEngine,
 ) -> None:
     """Test that AntiRecommendationEngine.get_previous_records returns a tuple containing Records that match previous AntiRecommendations."""
 
-    assert anti_recommendation_engine.previous_records()[0] == records[0]
+    assert (await anti_recommendation_engine.previous_records())[0] == records[0]
+
+
+@pytest.mark.anyio
+@pytest.mark.order(5)
+async def test_stream_next_records(
+    records: tuple[Record, ...],
+    record_key: RecordKey,
+    anti_recommendation_engine: AntiRecommendationEngine,
+) -> None:
+    """
+    Test that AntiRecommendationEngine.stream_next_records yields Records
+    with keys that match the AntiRecommendations of record_key, and updates the previous Records once it is done.
+    """
+
+    assert (
+        tuple(
+            [
+                record
+                async for record in anti_recommendation_engine.stream_next_records(
+                    record_key=record_key
+                )
+            ]
+        )
+        == records[1:]
+    )
+    assert (await anti_recommendation_engine.previous_records())[0] == records[0]
@@ -0,0 +1,70 @@
+from collections.abc import Iterable
+from typing import override
+
+import pytest
+
+from app.anti_recommendation_engine import AntiRecommendationEngine
+from app.anti_recommenders import AntiRecommender
+from app.models import AntiRecommendation, Record
+from app.models.types import RecordKey
+from app.record_catalog import RecordCatalog
+from app.user import User
+
+
+class _StubAntiRecommender(AntiRecommender):
+    """An AntiRecommender that returns the same anti_recommendations for every record_key."""
+
+    def __init__(self, *, anti_recommendations: tuple[AntiRecommendation, ...]) -> None:
+        self.anti_recommendations = anti_recommendations
+
+    @override
+    def generate_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> Iterable[AntiRecommendation]:
+        return self.anti_recommendations
+
+
+@pytest.fixture(autouse=True)
+def _anti_recommender() -> None:
+    """Replace the fixture of the package that mocks the AntiRecommenders and Supabase, since these tests use a stub AntiRecommender and User."""
+
+
+@pytest.fixture
+def anti_recommendation_engine(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    records: tuple[Record, ...],
+    stub_user: User,
+) -> AntiRecommendationEngine:
+    """Return an AntiRecommendationEngine of a stub AntiRecommender and User, that needs no OpenAI or Supabase credentials."""
+
+    return AntiRecommendationEngine(
+        anti_recommender=_StubAntiRecommender(
+            anti_recommendations=anti_recommendations
+        ),
+        record_catalog=RecordCatalog(records=records),
+        user=stub_user,
+    )
+
+
+@pytest.mark.anyio
+async def test_filter_next_records_by_category(
+    records: tuple[Record, ...],
+    record_key: RecordKey,
+    anti_recommendation_engine: AntiRecommendationEngine,
+) -> None:
+    """Test that AntiRecommendationEngine.next_records and stream_next_records only return Records that pass the category filters."""
+
+    assert await anti_recommendation_engine.next_records(
+        record_key=record_key, include_categories=("Determinism",)
+    ) == (records[1],)
+    assert await anti_recommendation_engine.next_records(
+        record_key=record_key, exclude_categories=("Determinism",)
+    ) == (records[2],)
+    assert [
+        record
+        async for record in anti_recommendation_engine.stream_next_records(
+            record_key=record_key,
+            include_categories=("Determinism", "1452 births"),
+            exclude_categories=("Leonardo da Vinci",),
+        )
+    ] == [records[1]]
@@ -0,0 +1,123 @@
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.anti_recommendation_engine import SessionEngineRegistry
+from app.anti_recommenders import AntiRecommender
+from app.models import Record, Settings
+from app.record_catalog import RecordCatalog
+from app.user import User, UserService, UserServiceException
+
+MAX_ENGINES_COUNT = 2
+
+
+@pytest.fixture
+def registry_user_service(mocker: MockerFixture) -> MagicMock:
+    """Return a mock UserService that creates Users from their IDs."""
+
+    registry_user_service = mocker.create_autospec(UserService, instance=True)
+    registry_user_service.create_user_from_id.side_effect = lambda *, user_id: User(
+        id=user_id, _service=registry_user_service
+    )
+
+    return registry_user_service
+
+
+@pytest.fixture
+def small_session_engine_registry(
+    mocker: MockerFixture,
+    record_catalog: RecordCatalog,
+    registry_user_service: MagicMock,
+    settings: Settings,
+) -> SessionEngineRegistry:
+    """Return a SessionEngineRegistry that holds at most two AntiRecommendationEngines."""
+
+    return SessionEngineRegistry(
+        anti_recommender=mocker.create_autospec(AntiRecommender, instance=True),
+        record_catalog=record_catalog,
+        user_service=registry_user_service,
+        settings=settings.model_copy(
+            update={
+                "session_engines_idle_ttl": 3600.0,
+                "session_engines_max_count": MAX_ENGINES_COUNT,
+            }
+        ),
+    )
+
+
+def test_get_engine(
+    small_session_engine_registry: SessionEngineRegistry,
+    registry_user_service: MagicMock,
+) -> None:
+    """Test that SessionEngineRegistry.get_engine() creates an AntiRecommendationEngine once per User, and returns it afterwards."""
+
+    user_id = uuid.uuid4()
+
+    assert small_session_engine_registry.get_engine(
+        user_id=user_id
+    ) is small_session_engine_registry.get_engine(user_id=user_id)
+    registry_user_service.create_user_from_id.assert_called_once_with(user_id=user_id)
+
+
+def test_create_engine(
+    small_session_engine_registry: SessionEngineRegistry,
+    registry_user_service: MagicMock,
+) -> None:
+    """Test that SessionEngineRegistry.create_engine() replaces the AntiRecommendationEngine a User already has."""
+
+    user = registry_user_service.create_user_from_id(user_id=uuid.uuid4())
+    engine = small_session_engine_registry.create_engine(user=user)
+
+    assert small_session_engine_registry.create_engine(user=user) is not engine
+    assert len(small_session_engine_registry) == 1
+
+
+def test_get_engine_evicts_least_recently_used_engine(
+    small_session_engine_registry: SessionEngineRegistry,
+    registry_user_service: MagicMock,
+) -> None:
+    """Test that SessionEngineRegistry.get_engine() evicts the least recently used AntiRecommendationEngine, and ends its User's session."""
+
+    user_ids = [uuid.uuid4() for _ in range(MAX_ENGINES_COUNT + 1)]
+
+    small_session_engine_registry.get_engine(user_id=user_ids[0])
+    small_session_engine_registry.get_engine(user_id=user_ids[1])
+    small_session_engine_registry.get_engine(user_id=user_ids[0])
+    small_session_engine_registry.get_engine(user_id=user_ids[2])
+
+    assert len(small_session_engine_registry) == MAX_ENGINES_COUNT
+    registry_user_service.end_user_session.assert_called_once_with(user_id=user_ids[1])
+
+
+def test_close(
+    small_session_engine_registry: SessionEngineRegistry,
+    registry_user_service: MagicMock,
+) -> None:
+    """Test that SessionEngineRegistry.close() ends every User's session, even if the UserService fails."""
+
+    registry_user_service.end_user_session.side_effect = UserServiceException
+
+    for _ in range(MAX_ENGINES_COUNT):
+        small_session_engine_registry.get_engine(user_id=uuid.uuid4())
+    small_session_engine_registry.close()
+
+    assert len(small_session_engine_registry) == 0
+    assert registry_user_service.end_user_session.call_count == MAX_ENGINES_COUNT
+
+
+def test_replace_record_catalog(
+    mocker: MockerFixture,
+    records: tuple[Record, ...],
+    small_session_engine_registry: SessionEngineRegistry,
+) -> None:
+    """Test that SessionEngineRegistry.replace_record_catalog() shares a new RecordCatalog with every registered AntiRecommendationEngine."""
+
+    engine = small_session_engine_registry.get_engine(user_id=uuid.uuid4())
+    replace_record_catalog = mocker.spy(engine, "replace_record_catalog")
+    record_catalog = RecordCatalog(records=records[:1])
+
+    small_session_engine_registry.replace_record_catalog(record_catalog=record_catalog)
+
+    replace_record_catalog.assert_called_once_with(record_catalog=record_catalog)
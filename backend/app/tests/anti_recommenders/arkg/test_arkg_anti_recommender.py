@@ -1,10 +1,21 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
 from app.anti_recommenders.arkg import ArkgAntiRecommender
-from app.models import Record
+from app.models import ArkgReloadMetrics, Record
+from app.models.types import RdfMimeType, RecordKey
+from app.user import User
+
+RELOAD_LOCK_WAIT = 0.1
 
 
 def test_generate_anti_recommendations(
     arkg_anti_recommender: ArkgAntiRecommender,
     records: tuple[Record, ...],
+    user: User,
 ) -> None:
     """Test that ArkgAntiRecommender.generate_anti_recommendations() yields AntiRecommendations of a given record key."""
 
@@ -13,8 +24,153 @@ def test_generate_anti_recommendations(
         == next(
             iter(
                 arkg_anti_recommender.generate_anti_recommendations(
-                    record_key=records[0].key
+                    record_key=records[0].key, user=user
                 )
             )
         ).key
     )
+
+
+def test_generate_anti_recommendations_without_precomputed_index(
+    arkg_anti_recommender: ArkgAntiRecommender,
+    arkg_file_path: Path,
+    mime_type: RdfMimeType,
+    records: tuple[Record, ...],
+    user: User,
+) -> None:
+    """Test that an ArkgAntiRecommender that queries its Store yields the same AntiRecommendations as one that uses an ArkgIndex."""
+
+    sparql_arkg_anti_recommender = ArkgAntiRecommender(
+        file_path=arkg_file_path,
+        mime_type=mime_type,
+        record_keys=tuple(record.key for record in records),
+        precompute_index=False,
+    )
+
+    assert sorted(
+        anti_recommendation.key
+        for anti_recommendation in sparql_arkg_anti_recommender.generate_anti_recommendations(
+            record_key=records[0].key, user=user
+        )
+    ) == sorted(
+        anti_recommendation.key
+        for anti_recommendation in arkg_anti_recommender.generate_anti_recommendations(
+            record_key=records[0].key, user=user
+        )
+    )
+
+
+_ARKG = """
+@prefix schema: <http://schema.org/> .
+@prefix urn: <http://imlapps.github.io/anti-recommender/anti-recommendation/> .
+@prefix wd: <http://www.wikidata.org/entity/> .
+
+urn:uuid:1 schema:about wd:Q1 ; schema:itemReviewed wd:Q2 .
+
+<https://en.wikipedia.org/wiki/A> schema:about wd:Q1 ; schema:name "A"@en .
+<https://en.wikipedia.org/wiki/B> schema:about wd:Q2 ; schema:name "B"@en .
+<https://en.wikipedia.org/wiki/C> schema:about wd:Q3 ; schema:name "C"@en .
+"""
+
+_DELTA = """
+@prefix schema: <http://schema.org/> .
+@prefix urn: <http://imlapps.github.io/anti-recommender/anti-recommendation/> .
+@prefix wd: <http://www.wikidata.org/entity/> .
+
+<http://imlapps.github.io/anti-recommender/delta/removed> {
+    urn:uuid:1 schema:itemReviewed wd:Q2 .
+}
+
+<http://imlapps.github.io/anti-recommender/delta/added> {
+    urn:uuid:1 schema:itemReviewed wd:Q3 .
+}
+"""
+
+
+@pytest.mark.parametrize("precompute_index", [True, False])
+def test_reload_delta(precompute_index: bool, stub_user: User, tmp_path: Path) -> None:  # noqa: FBT001
+    """Test that ArkgAntiRecommender.reload() applies a delta file to a new version of the ARKG, and releases the previous version."""
+
+    file_path = tmp_path / "arkg.ttl"
+    file_path.write_text(_ARKG)
+    delta_file_path = tmp_path / "arkg.delta.trig"
+    delta_file_path.write_text(_DELTA)
+    arkg_anti_recommender = ArkgAntiRecommender(
+        file_path=file_path,
+        mime_type=RdfMimeType.TURTLE,
+        record_keys=("A", "B", "C"),
+        precompute_index=precompute_index,
+    )
+
+    def anti_recommendation_keys() -> list[RecordKey]:
+        return [
+            anti_recommendation.key
+            for anti_recommendation in arkg_anti_recommender.generate_anti_recommendations(
+                record_key="A", user=stub_user
+            )
+        ]
+
+    assert "B" in anti_recommendation_keys()
+
+    reload_metrics = arkg_anti_recommender.reload(delta_file_path=delta_file_path)
+
+    assert "B" not in anti_recommendation_keys()
+    assert "C" in anti_recommendation_keys()
+    assert arkg_anti_recommender.version == 2  # noqa: PLR2004
+    assert reload_metrics.version == 2  # noqa: PLR2004
+    assert reload_metrics.previous_version_released
+
+    with pytest.raises(ValueError, match="not both"):
+        arkg_anti_recommender.reload(
+            file_path=file_path, delta_file_path=delta_file_path
+        )
+
+
+def test_reload_swap_seconds(tmp_path: Path) -> None:
+    """Test that the swap latency of ArkgAntiRecommender.reload() includes the wait for an earlier reload to finish."""
+
+    file_path = tmp_path / "arkg.ttl"
+    file_path.write_text(_ARKG)
+    arkg_anti_recommender = ArkgAntiRecommender(
+        file_path=file_path, mime_type=RdfMimeType.TURTLE, record_keys=("A", "B")
+    )
+    reload_metrics: list[ArkgReloadMetrics] = []
+
+    # Holding the reload lock stands in for an earlier reload that is still running.
+    reload_lock = arkg_anti_recommender._ArkgAntiRecommender__reload_lock  # type: ignore[attr-defined] # noqa: SLF001
+    with reload_lock:
+        reload_thread = threading.Thread(
+            target=lambda: reload_metrics.append(arkg_anti_recommender.reload())
+        )
+        reload_thread.start()
+        time.sleep(RELOAD_LOCK_WAIT)
+    reload_thread.join()
+
+    assert reload_metrics[0].swap_seconds >= RELOAD_LOCK_WAIT
+
+
+def test_replace_record_keys(tmp_path: Path, user: User) -> None:
+    """Test that ArkgAntiRecommender.replace_record_keys() offers the new RecordKeys as unseen anti-recommendations."""
+
+    file_path = tmp_path / "arkg.ttl"
+    file_path.write_text(_ARKG)
+    arkg_anti_recommender = ArkgAntiRecommender(
+        file_path=file_path, mime_type=RdfMimeType.TURTLE, record_keys=("B",)
+    )
+
+    # A key that the ARKG has no anti-recommendations of falls back to the first unseen RecordKey.
+    assert [
+        anti_recommendation.key
+        for anti_recommendation in arkg_anti_recommender.generate_anti_recommendations(
+            record_key="Z", user=user
+        )
+    ] == ["B"]
+
+    arkg_anti_recommender.replace_record_keys(record_keys=("A", "B"))
+
+    assert [
+        anti_recommendation.key
+        for anti_recommendation in arkg_anti_recommender.generate_anti_recommendations(
+            record_key="Z", user=user
+        )
+    ] == ["A"]
@@ -0,0 +1,21 @@
+from app.anti_recommenders.arkg import ArkgIndex
+from app.models import Record
+
+
+def test_anti_recommendations(
+    arkg_index: ArkgIndex, records: tuple[Record, ...]
+) -> None:
+    """Test that ArkgIndex.anti_recommendations returns the AntiRecommendations of a record key."""
+
+    assert {
+        anti_recommendation.key
+        for anti_recommendation in arkg_index.anti_recommendations(
+            record_key=records[0].key
+        )
+    } == {record.key for record in records[1:]}
+
+
+def test_anti_recommendations_of_unknown_record_key(arkg_index: ArkgIndex) -> None:
+    """Test that ArkgIndex.anti_recommendations returns an empty tuple for a record key that is not in the ARKG."""
+
+    assert arkg_index.anti_recommendations(record_key="Unknown_Record_Key") == ()
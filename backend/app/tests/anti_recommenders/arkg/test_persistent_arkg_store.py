@@ -0,0 +1,85 @@
+import fcntl
+from pathlib import Path
+
+from app.anti_recommenders.arkg import open_persistent_arkg_store
+from app.models.types import RdfMimeType
+from app.namespaces import SCHEMA
+
+
+def test_open_persistent_arkg_store(
+    arkg_file_path: Path, mime_type: RdfMimeType, tmp_path: Path
+) -> None:
+    """Test that open_persistent_arkg_store loads an ARKG file into a Store that can be reopened."""
+
+    store_directory_path = tmp_path / "arkg_store"
+
+    store = open_persistent_arkg_store(
+        file_path=arkg_file_path,
+        mime_type=mime_type,
+        store_directory_path=store_directory_path,
+    )
+    store_paths = tuple(store_directory_path.iterdir())
+    del store
+
+    reopened_store = open_persistent_arkg_store(
+        file_path=arkg_file_path,
+        mime_type=mime_type,
+        store_directory_path=store_directory_path,
+    )
+
+    assert tuple(store_directory_path.iterdir()) == store_paths
+    assert next(reopened_store.quads_for_pattern(None, SCHEMA.ABOUT, None), None)
+
+
+def test_open_persistent_arkg_store_after_arkg_file_changes(
+    arkg_file_path: Path, mime_type: RdfMimeType, tmp_path: Path
+) -> None:
+    """Test that open_persistent_arkg_store loads a new Store when the ARKG file changes."""
+
+    store_directory_path = tmp_path / "arkg_store"
+    changed_arkg_file_path = tmp_path / arkg_file_path.name
+    changed_arkg_file_path.write_text(arkg_file_path.read_text(encoding="utf-8"))
+
+    open_persistent_arkg_store(
+        file_path=changed_arkg_file_path,
+        mime_type=mime_type,
+        store_directory_path=store_directory_path,
+    )
+
+    with changed_arkg_file_path.open("a", encoding="utf-8") as changed_arkg_file:
+        changed_arkg_file.write(
+            '\n<https://en.wikipedia.org/wiki/Paleontology> schema:name "Paleontology"@en .\n'
+        )
+
+    store = open_persistent_arkg_store(
+        file_path=changed_arkg_file_path,
+        mime_type=mime_type,
+        store_directory_path=store_directory_path,
+    )
+
+    assert len(tuple(store.quads_for_pattern(None, SCHEMA.NAME, None))) == 4  # noqa: PLR2004
+
+
+def test_open_persistent_arkg_store_removes_unlocked_stores(
+    arkg_file_path: Path, mime_type: RdfMimeType, tmp_path: Path
+) -> None:
+    """Test that open_persistent_arkg_store removes outdated Stores, unless another reader holds a lock on them."""
+
+    store_directory_path = tmp_path / "arkg_store"
+    unlocked_store_path = store_directory_path / "unlocked"
+    locked_store_path = store_directory_path / "locked"
+    unlocked_store_path.mkdir(parents=True)
+    locked_store_path.mkdir()
+
+    # flock locks belong to an open file, so this lock conflicts with the process's own lock attempts.
+    with (store_directory_path / "locked.lock").open("w") as locked_store_lock_file:
+        fcntl.flock(locked_store_lock_file, fcntl.LOCK_SH)
+
+        open_persistent_arkg_store(
+            file_path=arkg_file_path,
+            mime_type=mime_type,
+            store_directory_path=store_directory_path,
+        )
+
+    assert not unlocked_store_path.exists()
+    assert locked_store_path.exists()
@@ -0,0 +1,64 @@
+import pytest
+
+from app.anti_recommenders.arkg import SeenRecordKeys
+from app.models.types import RecordKey
+
+
+@pytest.fixture
+def sorted_record_keys() -> tuple[RecordKey, ...]:
+    """Return a sorted tuple of record keys that spans more than one byte of a bitmap."""
+
+    return tuple(f"Record_{position:02}" for position in range(20))
+
+
+@pytest.fixture
+def seen_record_keys(sorted_record_keys: tuple[RecordKey, ...]) -> SeenRecordKeys:
+    """Return a SeenRecordKeys over sorted_record_keys."""
+
+    return SeenRecordKeys(
+        record_keys=sorted_record_keys,
+        position_by_record_key={
+            record_key: position
+            for position, record_key in enumerate(sorted_record_keys)
+        },
+    )
+
+
+def test_synchronize(
+    seen_record_keys: SeenRecordKeys, sorted_record_keys: tuple[RecordKey, ...]
+) -> None:
+    """Test that SeenRecordKeys contains the record keys of a synchronized anti-recommendations history."""
+
+    seen_record_keys.synchronize(
+        anti_recommendations_history=(sorted_record_keys[3], "Unknown_Record_Key")
+    )
+
+    assert sorted_record_keys[3] in seen_record_keys
+    assert "Unknown_Record_Key" in seen_record_keys
+    assert sorted_record_keys[0] not in seen_record_keys
+
+
+def test_first_unseen_record_key(
+    seen_record_keys: SeenRecordKeys, sorted_record_keys: tuple[RecordKey, ...]
+) -> None:
+    """Test that SeenRecordKeys.first_unseen_record_key skips every seen record key."""
+
+    seen_record_keys.synchronize(anti_recommendations_history=sorted_record_keys[:11])
+
+    assert seen_record_keys.first_unseen_record_key() == sorted_record_keys[11]
+
+    seen_record_keys.synchronize(anti_recommendations_history=sorted_record_keys)
+
+    assert seen_record_keys.first_unseen_record_key() is None
+
+
+def test_synchronize_after_history_is_truncated(
+    seen_record_keys: SeenRecordKeys, sorted_record_keys: tuple[RecordKey, ...]
+) -> None:
+    """Test that record keys removed from an anti-recommendations history are no longer seen."""
+
+    seen_record_keys.synchronize(anti_recommendations_history=sorted_record_keys[:10])
+    seen_record_keys.synchronize(anti_recommendations_history=sorted_record_keys[:8])
+
+    assert sorted_record_keys[8] not in seen_record_keys
+    assert seen_record_keys.first_unseen_record_key() == sorted_record_keys[8]
@@ -0,0 +1,225 @@
+import time
+from collections.abc import Iterable
+from typing import override
+
+import anyio
+import pytest
+
+from app.anti_recommenders import AntiRecommender, AntiRecommenderException
+from app.anti_recommenders.hedged import HedgedAntiRecommender
+from app.models import AntiRecommendation
+from app.models.types import RecordKey
+from app.user import User
+
+DEADLINE = 0.1
+MAX_WORKERS = 2
+SLOW_DELAY = 0.3
+
+
+class _DelayedAntiRecommender(AntiRecommender):
+    """An AntiRecommender that returns anti_recommendations after a delay, and records whether a call completed."""
+
+    def __init__(
+        self,
+        *,
+        anti_recommendations: tuple[AntiRecommendation, ...],
+        delay: float = 0.0,
+        failing: bool = False,
+        exception: type[BaseException] = AntiRecommenderException,
+    ) -> None:
+        self.anti_recommendations = anti_recommendations
+        self.completed_calls_count = 0
+        self.delay = delay
+        self.exception = exception
+        self.failing = failing
+
+    @override
+    def generate_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> Iterable[AntiRecommendation]:
+        time.sleep(self.delay)
+        self.completed_calls_count += 1
+
+        if self.failing:
+            raise self.exception
+
+        return self.anti_recommendations
+
+    @override
+    async def agenerate_anti_recommendations(
+        self, *, record_key: RecordKey, user: User
+    ) -> tuple[AntiRecommendation, ...]:
+        await anyio.sleep(self.delay)
+        self.completed_calls_count += 1
+
+        if self.failing:
+            raise self.exception
+
+        return self.anti_recommendations
+
+
+@pytest.mark.anyio
+async def test_agenerate_anti_recommendations_within_deadline(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    record_key: RecordKey,
+    stub_user: User,
+) -> None:
+    """Test that HedgedAntiRecommender.agenerate_anti_recommendations() returns the primary's AntiRecommendations when they arrive within the deadline."""
+
+    hedged_anti_recommender = HedgedAntiRecommender(
+        primary=_DelayedAntiRecommender(anti_recommendations=anti_recommendations[:1]),
+        fallback=_DelayedAntiRecommender(anti_recommendations=anti_recommendations[1:]),
+        deadline=DEADLINE,
+        max_workers=MAX_WORKERS,
+    )
+
+    assert (
+        await hedged_anti_recommender.agenerate_anti_recommendations(
+            record_key=record_key, user=stub_user
+        )
+        == anti_recommendations[:1]
+    )
+
+
+@pytest.mark.anyio
+async def test_agenerate_anti_recommendations_after_deadline(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    record_key: RecordKey,
+    stub_user: User,
+) -> None:
+    """Test that HedgedAntiRecommender.agenerate_anti_recommendations() returns the fallback's AntiRecommendations at the deadline, and lets the primary call finish in the background."""
+
+    primary = _DelayedAntiRecommender(
+        anti_recommendations=anti_recommendations[:1], delay=SLOW_DELAY
+    )
+
+    async with HedgedAntiRecommender(
+        primary=primary,
+        fallback=_DelayedAntiRecommender(anti_recommendations=anti_recommendations[1:]),
+        deadline=DEADLINE,
+        max_workers=MAX_WORKERS,
+    ) as hedged_anti_recommender:
+        start_time = anyio.current_time()
+
+        assert (
+            await hedged_anti_recommender.agenerate_anti_recommendations(
+                record_key=record_key, user=stub_user
+            )
+            == anti_recommendations[1:]
+        )
+        assert anyio.current_time() - start_time < SLOW_DELAY
+
+        await anyio.sleep(SLOW_DELAY)
+        assert primary.completed_calls_count == 1
+
+
+@pytest.mark.anyio
+async def test_agenerate_anti_recommendations_outside_context(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    record_key: RecordKey,
+    stub_user: User,
+) -> None:
+    """Test that a HedgedAntiRecommender that has not been entered cancels a primary call that misses the deadline."""
+
+    primary = _DelayedAntiRecommender(
+        anti_recommendations=anti_recommendations[:1], delay=SLOW_DELAY
+    )
+    hedged_anti_recommender = HedgedAntiRecommender(
+        primary=primary,
+        fallback=_DelayedAntiRecommender(anti_recommendations=anti_recommendations[1:]),
+        deadline=DEADLINE,
+        max_workers=MAX_WORKERS,
+    )
+
+    assert (
+        await hedged_anti_recommender.agenerate_anti_recommendations(
+            record_key=record_key, user=stub_user
+        )
+        == anti_recommendations[1:]
+    )
+
+    await anyio.sleep(SLOW_DELAY)
+    assert primary.completed_calls_count == 0
+
+
+@pytest.mark.anyio
+async def test_agenerate_anti_recommendations_when_primary_fails(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    record_key: RecordKey,
+    stub_user: User,
+) -> None:
+    """Test that HedgedAntiRecommender.agenerate_anti_recommendations() returns the fallback's AntiRecommendations when the primary fails."""
+
+    hedged_anti_recommender = HedgedAntiRecommender(
+        primary=_DelayedAntiRecommender(
+            anti_recommendations=anti_recommendations[:1], failing=True
+        ),
+        fallback=_DelayedAntiRecommender(anti_recommendations=anti_recommendations[1:]),
+        deadline=DEADLINE,
+        max_workers=MAX_WORKERS,
+    )
+
+    assert (
+        await hedged_anti_recommender.agenerate_anti_recommendations(
+            record_key=record_key, user=stub_user
+        )
+        == anti_recommendations[1:]
+    )
+
+
+def test_generate_anti_recommendations_after_deadline(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    record_key: RecordKey,
+    stub_user: User,
+) -> None:
+    """Test that HedgedAntiRecommender.generate_anti_recommendations() returns the fallback's AntiRecommendations at the deadline."""
+
+    hedged_anti_recommender = HedgedAntiRecommender(
+        primary=_DelayedAntiRecommender(
+            anti_recommendations=anti_recommendations[:1], delay=SLOW_DELAY
+        ),
+        fallback=_DelayedAntiRecommender(anti_recommendations=anti_recommendations[1:]),
+        deadline=DEADLINE,
+        max_workers=MAX_WORKERS,
+    )
+    start_time = time.monotonic()
+
+    assert (
+        tuple(
+            hedged_anti_recommender.generate_anti_recommendations(
+                record_key=record_key, user=stub_user
+            )
+        )
+        == anti_recommendations[1:]
+    )
+    assert time.monotonic() - start_time < SLOW_DELAY
+
+
+@pytest.mark.parametrize("exception", [AntiRecommenderException, RuntimeError])
+def test_generate_anti_recommendations_when_primary_fails(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    exception: type[BaseException],
+    record_key: RecordKey,
+    stub_user: User,
+) -> None:
+    """Test that HedgedAntiRecommender.generate_anti_recommendations() returns the fallback's AntiRecommendations whatever exception the primary raises."""
+
+    hedged_anti_recommender = HedgedAntiRecommender(
+        primary=_DelayedAntiRecommender(
+            anti_recommendations=anti_recommendations[:1],
+            failing=True,
+            exception=exception,
+        ),
+        fallback=_DelayedAntiRecommender(anti_recommendations=anti_recommendations[1:]),
+        deadline=DEADLINE,
+        max_workers=MAX_WORKERS,
+    )
+
+    assert (
+        tuple(
+            hedged_anti_recommender.generate_anti_recommendations(
+                record_key=record_key, user=stub_user
+            )
+        )
+        == anti_recommendations[1:]
+    )
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+
+from app.anti_recommenders.openai.anti_recommendations_cache import (
+    AntiRecommendationsCache,
+)
+from app.models import AntiRecommendation
+from app.models.types import RecordKey
+
+TEMPLATE = "Question: {question}"
+
+
+def create_anti_recommendations_cache(
+    *, database_path: Path, model_name: str = "model"
+) -> AntiRecommendationsCache:
+    """Return an AntiRecommendationsCache with a database at database_path."""
+
+    return AntiRecommendationsCache(
+        template=TEMPLATE,
+        model_name=model_name,
+        max_size=10,
+        ttl=60.0,
+        database_path=database_path,
+    )
+
+
+def test_get_from_disk(
+    tmp_path: Path,
+    record_key: RecordKey,
+    anti_recommendations: tuple[AntiRecommendation, ...],
+) -> None:
+    """Test that AntiRecommendationsCache.get returns AntiRecommendations that were cached on disk by another AntiRecommendationsCache."""
+
+    create_anti_recommendations_cache(database_path=tmp_path / "cache.sqlite").set(
+        record_key=record_key, anti_recommendations=anti_recommendations
+    )
+
+    assert (
+        create_anti_recommendations_cache(database_path=tmp_path / "cache.sqlite").get(
+            record_key=record_key
+        )
+        == anti_recommendations
+    )
+
+
+def test_get_with_another_model(
+    tmp_path: Path,
+    record_key: RecordKey,
+    anti_recommendations: tuple[AntiRecommendation, ...],
+) -> None:
+    """Test that AntiRecommendationsCache.get does not return AntiRecommendations that were cached for another model."""
+
+    create_anti_recommendations_cache(database_path=tmp_path / "cache.sqlite").set(
+        record_key=record_key, anti_recommendations=anti_recommendations
+    )
+
+    assert (
+        create_anti_recommendations_cache(
+            database_path=tmp_path / "cache.sqlite", model_name="another model"
+        ).get(record_key=record_key)
+        is None
+    )
+
+
+@pytest.mark.anyio
+async def test_aget(
+    tmp_path: Path,
+    record_key: RecordKey,
+    anti_recommendations: tuple[AntiRecommendation, ...],
+) -> None:
+    """Test that AntiRecommendationsCache.aget returns AntiRecommendations that were cached with AntiRecommendationsCache.aset."""
+
+    anti_recommendations_cache = create_anti_recommendations_cache(
+        database_path=tmp_path / "cache.sqlite"
+    )
+    await anti_recommendations_cache.aset(
+        record_key=record_key, anti_recommendations=anti_recommendations
+    )
+
+    assert (
+        await anti_recommendations_cache.aget(record_key=record_key)
+        == anti_recommendations
+    )
@@ -1,10 +1,23 @@
+import functools
+
+import anyio
+import pytest
 from langchain.schema.runnable import RunnableSequence, RunnableSerializable
+from pydantic import SecretStr
 from pytest_mock import MockFixture
 
+from app.anti_recommenders import AntiRecommenderException
 from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
+from app.benchmarks.stub_completion_server import StubCompletionServer
 from app.models import AntiRecommendation
 from app.models.types import RecordKey
 from app.models.types import StrippedString as ModelResponse
+from app.user import User
+
+# Other tests patch these methods for the whole session, so their real implementations are kept here.
+GENERATE_LLM_RESPONSE = NormalOpenaiAntiRecommender._generate_llm_response  # noqa: SLF001
+ASTREAM_LLM_RESPONSE = NormalOpenaiAntiRecommender._astream_llm_response  # noqa: SLF001
+INVOKE = RunnableSequence.invoke
 
 
 def test_build_chain(
@@ -72,12 +85,39 @@ def test_parse_llm_response(
     assert tuple(anti_recommendation_records) == anti_recommendations
 
 
-def test_generate_anti_recommendations(
+def test_parse_llm_response_line(
+    openai_normal_anti_recommender: NormalOpenaiAntiRecommender,
+    anti_recommendations: tuple[AntiRecommendation, ...],
+) -> None:
+    """Test that OpenaiNormalAntiRecommender._parse_llm_response_line() returns an AntiRecommendation, or None for a line without one."""
+
+    assert (
+        openai_normal_anti_recommender._parse_llm_response_line(  # noqa: SLF001
+            "1 - Laplace's_demon - https://en.wikipedia.org/wiki/Laplace's_demon"
+        )
+        == anti_recommendations[0]
+    )
+    assert (
+        openai_normal_anti_recommender._parse_llm_response_line(  # noqa: SLF001
+            "Here are 10 Wikipedia articles:"
+        )
+        is None
+    )
+    assert (
+        openai_normal_anti_recommender._parse_llm_response_line(  # noqa: SLF001
+            "2 - Leonardo_da_Vinci - not a Wikipedia URL"
+        )
+        is None
+    )
+
+
+def test_generate_anti_recommendations(  # noqa: PLR0913
     session_mocker: MockFixture,
     openai_normal_anti_recommender: NormalOpenaiAntiRecommender,
     record_key: RecordKey,
     model_response: ModelResponse,
     anti_recommendations: tuple[AntiRecommendation, ...],
+    user: User,
 ) -> None:
     """Test that OpenaiNormalAntiRecommender.generate_anti_recommendations() yields AntiRecommendations of a given record key."""
 
@@ -91,8 +131,196 @@ def test_generate_anti_recommendations(
         == next(
             iter(
                 openai_normal_anti_recommender.generate_anti_recommendations(
-                    record_key=record_key
+                    record_key=record_key, user=user
                 )
             )
         ).key
     )
+
+
+def test_generate_anti_recommendations_from_cache(
+    mocker: MockFixture,
+    openai_api_key: None,  # noqa: ARG001
+    record_key: RecordKey,
+    model_response: ModelResponse,
+    user: User,
+) -> None:
+    """Test that OpenaiNormalAntiRecommender.generate_anti_recommendations() only invokes the large language model once per record key."""
+
+    generate_llm_response = mocker.patch.object(
+        NormalOpenaiAntiRecommender,
+        "_generate_llm_response",
+        return_value=model_response,
+    )
+    openai_normal_anti_recommender = NormalOpenaiAntiRecommender()
+
+    assert tuple(
+        openai_normal_anti_recommender.generate_anti_recommendations(
+            record_key=record_key, user=user
+        )
+    ) == tuple(
+        openai_normal_anti_recommender.generate_anti_recommendations(
+            record_key=record_key, user=user
+        )
+    )
+    generate_llm_response.assert_called_once()
+
+
+def test_generate_anti_recommendations_with_shared_chain(
+    mocker: MockFixture,
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    user: User,
+    stub_completion_server: StubCompletionServer,
+) -> None:
+    """Test that OpenaiNormalAntiRecommender builds its chain once, and keeps its connection to the OpenAI API alive between requests."""
+
+    mocker.patch.object(
+        NormalOpenaiAntiRecommender, "_generate_llm_response", GENERATE_LLM_RESPONSE
+    )
+    mocker.patch.object(RunnableSequence, "invoke", INVOKE)
+    build_chain = mocker.spy(NormalOpenaiAntiRecommender, "_build_chain")
+
+    openai_normal_anti_recommender = NormalOpenaiAntiRecommender(
+        api_key=SecretStr("sk-stub"), base_url=stub_completion_server.base_url
+    )
+
+    for record_key in ("Nikola_Tesla", "Ada_Lovelace", "Alan_Turing"):
+        assert (
+            tuple(
+                openai_normal_anti_recommender.generate_anti_recommendations(
+                    record_key=record_key, user=user
+                )
+            )
+            == anti_recommendations
+        )
+
+    build_chain.assert_called_once()
+    assert stub_completion_server.requests_count == 3  # noqa: PLR2004
+    assert stub_completion_server.connections_count == 1
+
+
+@pytest.mark.anyio
+async def test_agenerate_anti_recommendations_coalesces_requests(
+    mocker: MockFixture,
+    openai_api_key: None,  # noqa: ARG001
+    record_key: RecordKey,
+    model_response: ModelResponse,
+    user: User,
+) -> None:
+    """Test that concurrent OpenaiNormalAntiRecommender.agenerate_anti_recommendations() calls for the same record key invoke the large language model once."""
+
+    async def agenerate_llm_response(*_: object) -> ModelResponse:
+        await anyio.sleep(0.05)
+        return model_response
+
+    agenerate_llm_response_mock = mocker.patch.object(
+        NormalOpenaiAntiRecommender,
+        "_agenerate_llm_response",
+        side_effect=agenerate_llm_response,
+    )
+    openai_normal_anti_recommender = NormalOpenaiAntiRecommender()
+    results: list[tuple[AntiRecommendation, ...]] = []
+
+    async def agenerate() -> None:
+        results.append(
+            await openai_normal_anti_recommender.agenerate_anti_recommendations(
+                record_key=record_key, user=user
+            )
+        )
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(5):
+            task_group.start_soon(agenerate)
+
+    agenerate_llm_response_mock.assert_awaited_once()
+    assert results == [results[0]] * 5
+
+
+@pytest.mark.anyio
+async def test_agenerate_anti_recommendations_when_overloaded(
+    mocker: MockFixture,
+    openai_api_key: None,  # noqa: ARG001
+    model_response: ModelResponse,
+    user: User,
+) -> None:
+    """Test that OpenaiNormalAntiRecommender.agenerate_anti_recommendations() raises an AntiRecommenderException when no turn to invoke the large language model is available."""
+
+    async def agenerate_llm_response(*_: object) -> ModelResponse:
+        await anyio.sleep(1.0)
+        return model_response
+
+    mocker.patch.object(
+        NormalOpenaiAntiRecommender,
+        "_agenerate_llm_response",
+        side_effect=agenerate_llm_response,
+    )
+    openai_normal_anti_recommender = NormalOpenaiAntiRecommender(
+        max_concurrent_requests=1, max_waiting_requests=0
+    )
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(
+            functools.partial(
+                openai_normal_anti_recommender.agenerate_anti_recommendations,
+                record_key="Nikola_Tesla",
+                user=user,
+            )
+        )
+        await anyio.sleep(0.01)
+
+        with pytest.raises(AntiRecommenderException):
+            await openai_normal_anti_recommender.agenerate_anti_recommendations(
+                record_key="Ada_Lovelace", user=user
+            )
+
+        task_group.cancel_scope.cancel()
+
+
+# LangChain streams completions on asyncio only.
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_astream_anti_recommendations(
+    mocker: MockFixture,
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    user: User,
+    stub_completion_server: StubCompletionServer,
+) -> None:
+    """Test that OpenaiNormalAntiRecommender.astream_anti_recommendations() yields each AntiRecommendation before the response is complete, and caches them afterwards."""
+
+    mocker.patch.object(
+        NormalOpenaiAntiRecommender, "_astream_llm_response", ASTREAM_LLM_RESPONSE
+    )
+
+    stub_completion_server.response_delay = 0.05
+    openai_normal_anti_recommender = NormalOpenaiAntiRecommender(
+        api_key=SecretStr("sk-stub"), base_url=stub_completion_server.base_url
+    )
+    streamed_anti_recommendations: list[AntiRecommendation] = []
+    requests_counts: list[int] = []
+
+    async for (
+        anti_recommendation
+    ) in openai_normal_anti_recommender.astream_anti_recommendations(
+        record_key="Nikola_Tesla", user=user
+    ):
+        streamed_anti_recommendations.append(anti_recommendation)
+        requests_counts.append(stub_completion_server.requests_count)
+
+    assert tuple(streamed_anti_recommendations) == anti_recommendations
+    assert (
+        tuple(
+            [
+                anti_recommendation
+                async for anti_recommendation in openai_normal_anti_recommender.astream_anti_recommendations(
+                    record_key="Nikola_Tesla", user=user
+                )
+            ]
+        )
+        == anti_recommendations
+    )
+
+    await openai_normal_anti_recommender.aclose()
+
+    # The first AntiRecommendation arrived while the completion was still being streamed.
+    assert requests_counts[0] == 0
+    assert stub_completion_server.requests_count == 1
@@ -0,0 +1,264 @@
+import datetime
+import uuid
+from unittest.mock import MagicMock
+
+import jwt
+import pytest
+from pydantic import SecretStr
+from pytest_mock import MockerFixture
+
+from app.auth import AuthException, AuthService
+from app.auth.local_jwt import LocalJwtAuthService
+from app.models import AuthToken, Settings
+from app.models.types import UserId
+
+JWT_SECRET = "local-jwt-secret"  # noqa: S105
+
+
+@pytest.fixture
+def backing_auth_service(mocker: MockerFixture) -> MagicMock:
+    """Return a mock AuthService."""
+
+    return mocker.create_autospec(AuthService, instance=True)
+
+
+@pytest.fixture
+def local_jwt_auth_service(
+    backing_auth_service: MagicMock, settings: Settings
+) -> LocalJwtAuthService:
+    """Return a LocalJwtAuthService that verifies access tokens with JWT_SECRET."""
+
+    return LocalJwtAuthService(
+        auth_service=backing_auth_service,
+        settings=settings.model_copy(
+            update={"auth_jwt_secret": SecretStr(JWT_SECRET), "auth_jwks_url": None}
+        ),
+    )
+
+
+@pytest.fixture
+def user_id() -> UserId:
+    """Return the ID of a User that access tokens are issued to."""
+
+    return uuid.uuid4()
+
+
+def create_authentication_token(
+    *,
+    user_id: UserId,
+    secret: str,
+    expires_in: datetime.timedelta = datetime.timedelta(hours=1),
+) -> AuthToken:
+    """Return an AuthToken for the User with user_id, signed with secret, that expires after expires_in."""
+
+    return AuthToken(
+        access_token=SecretStr(
+            jwt.encode(
+                {
+                    "aud": "authenticated",
+                    "exp": datetime.datetime.now(tz=datetime.UTC) + expires_in,
+                    "sub": str(user_id),
+                },
+                secret,
+                algorithm="HS256",
+            )
+        )
+    )
+
+
+def test_get_user(
+    local_jwt_auth_service: LocalJwtAuthService,
+    backing_auth_service: MagicMock,
+    user_id: UserId,
+) -> None:
+    """Test that LocalJwtAuthService.get_user verifies an access token without calling the underlying AuthService."""
+
+    authentication_token = create_authentication_token(
+        user_id=user_id, secret=JWT_SECRET
+    )
+
+    assert (
+        local_jwt_auth_service.get_user(
+            authentication_token=authentication_token
+        ).user_id
+        == user_id
+    )
+    assert (
+        local_jwt_auth_service.get_user(
+            authentication_token=authentication_token
+        ).user_id
+        == user_id
+    )
+    backing_auth_service.get_user.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_aget_user(
+    local_jwt_auth_service: LocalJwtAuthService,
+    backing_auth_service: MagicMock,
+    user_id: UserId,
+) -> None:
+    """Test that LocalJwtAuthService.aget_user verifies an access token without awaiting the underlying AuthService."""
+
+    authentication_token = create_authentication_token(
+        user_id=user_id, secret=JWT_SECRET
+    )
+
+    user_response = await local_jwt_auth_service.aget_user(
+        authentication_token=authentication_token
+    )
+
+    assert user_response.user_id == user_id
+    backing_auth_service.aget_user.assert_not_awaited()
+
+
+def test_get_user_with_invalid_signature(
+    local_jwt_auth_service: LocalJwtAuthService, user_id: UserId
+) -> None:
+    """Test that LocalJwtAuthService.get_user rejects an access token with an invalid signature."""
+
+    with pytest.raises(AuthException):
+        local_jwt_auth_service.get_user(
+            authentication_token=create_authentication_token(
+                user_id=user_id, secret="another-secret"
+            )
+        )
+
+
+def test_get_user_with_invalid_subject(
+    local_jwt_auth_service: LocalJwtAuthService,
+) -> None:
+    """Test that LocalJwtAuthService.get_user rejects an access token whose subject claim is not a user ID."""
+
+    authentication_token = AuthToken(
+        access_token=SecretStr(
+            jwt.encode(
+                {
+                    "aud": "authenticated",
+                    "exp": datetime.datetime.now(tz=datetime.UTC)
+                    + datetime.timedelta(hours=1),
+                    "sub": "not-a-user-id",
+                },
+                JWT_SECRET,
+                algorithm="HS256",
+            )
+        )
+    )
+
+    with pytest.raises(AuthException):
+        local_jwt_auth_service.get_user(authentication_token=authentication_token)
+
+
+def test_revoke(local_jwt_auth_service: LocalJwtAuthService, user_id: UserId) -> None:
+    """Test that LocalJwtAuthService.get_user rejects a revoked access token."""
+
+    authentication_token = create_authentication_token(
+        user_id=user_id, secret=JWT_SECRET
+    )
+    local_jwt_auth_service.get_user(authentication_token=authentication_token)
+
+    local_jwt_auth_service.revoke(authentication_token=authentication_token)
+
+    with pytest.raises(AuthException):
+        local_jwt_auth_service.get_user(authentication_token=authentication_token)
+
+
+def test_get_user_without_local_verification(
+    backing_auth_service: MagicMock,
+    settings: Settings,
+    authentication_token: AuthToken,
+) -> None:
+    """Test that the underlying AuthService is only called once per access token when local verification is not configured."""
+
+    local_jwt_auth_service = LocalJwtAuthService(
+        auth_service=backing_auth_service,
+        settings=settings.model_copy(
+            update={"auth_jwt_secret": None, "auth_jwks_url": None}
+        ),
+    )
+
+    local_jwt_auth_service.get_user(authentication_token=authentication_token)
+    local_jwt_auth_service.get_user(authentication_token=authentication_token)
+
+    backing_auth_service.get_user.assert_called_once()
+
+
+def test_get_user_cache_ttl(
+    backing_auth_service: MagicMock, settings: Settings, user_id: UserId
+) -> None:
+    """Test that a cached user does not outlive the cache's time-to-live, even if its access token expires later."""
+
+    local_jwt_auth_service = LocalJwtAuthService(
+        auth_service=backing_auth_service,
+        settings=settings.model_copy(
+            update={
+                "auth_cache_ttl": 0.0,
+                "auth_jwt_secret": None,
+                "auth_jwks_url": None,
+            }
+        ),
+    )
+    authentication_token = create_authentication_token(
+        user_id=user_id, secret=JWT_SECRET
+    )
+
+    local_jwt_auth_service.get_user(authentication_token=authentication_token)
+    local_jwt_auth_service.get_user(authentication_token=authentication_token)
+
+    assert backing_auth_service.get_user.call_count == 2  # noqa: PLR2004
+
+
+def test_revoke_rejects_invalid_access_tokens(
+    local_jwt_auth_service: LocalJwtAuthService, user_id: UserId
+) -> None:
+    """Test that LocalJwtAuthService.revoke refuses access tokens that it would not accept, so that they cannot be stored."""
+
+    with pytest.raises(AuthException):
+        local_jwt_auth_service.revoke(
+            authentication_token=AuthToken(access_token=SecretStr("junk"))
+        )
+    with pytest.raises(AuthException):
+        local_jwt_auth_service.revoke(
+            authentication_token=create_authentication_token(
+                user_id=user_id, secret="another-secret"
+            )
+        )
+    with pytest.raises(AuthException):
+        local_jwt_auth_service.revoke(
+            authentication_token=create_authentication_token(
+                user_id=user_id,
+                secret=JWT_SECRET,
+                expires_in=datetime.timedelta(hours=-1),
+            )
+        )
+
+
+def test_revoke_is_not_evicted(
+    backing_auth_service: MagicMock, settings: Settings, user_id: UserId
+) -> None:
+    """Test that a revoked access token stays rejected however many other access tokens are revoked after it."""
+
+    local_jwt_auth_service = LocalJwtAuthService(
+        auth_service=backing_auth_service,
+        settings=settings.model_copy(
+            update={
+                "auth_cache_max_size": 1,
+                "auth_jwt_secret": SecretStr(JWT_SECRET),
+                "auth_jwks_url": None,
+            }
+        ),
+    )
+    authentication_token = create_authentication_token(
+        user_id=user_id, secret=JWT_SECRET
+    )
+    local_jwt_auth_service.revoke(authentication_token=authentication_token)
+
+    for _ in range(3):
+        local_jwt_auth_service.revoke(
+            authentication_token=create_authentication_token(
+                user_id=uuid.uuid4(), secret=JWT_SECRET
+            )
+        )
+
+    with pytest.raises(AuthException):
+        local_jwt_auth_service.get_user(authentication_token=authentication_token)
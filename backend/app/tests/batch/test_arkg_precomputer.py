@@ -0,0 +1,163 @@
+from pathlib import Path
+
+import pyoxigraph as ox
+import pytest
+from pydantic import SecretStr
+from pydantic_extra_types.language_code import LanguageAlpha2
+from pytest_mock import MockFixture
+
+from app.anti_recommenders import AntiRecommenderException
+from app.anti_recommenders.arkg import ArkgAntiRecommender, ArkgIndex
+from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
+from app.batch import ArkgPrecomputer, PrecomputeCheckpoint, export_arkg
+from app.benchmarks.stub_completion_server import StubCompletionServer
+from app.models import AntiRecommendation, Settings
+from app.models.types import RdfMimeType
+from app.user import User
+
+RECORD_KEYS = ("Nikola_Tesla", "Ada_Lovelace")
+
+# Other tests patch this method for the whole session, so its real implementation is kept here.
+AGENERATE_LLM_RESPONSE = NormalOpenaiAntiRecommender._agenerate_llm_response  # noqa: SLF001
+
+
+@pytest.fixture(autouse=True)
+def _real_agenerate_llm_response(mocker: MockFixture) -> None:
+    """Invoke the real large language model client, so that requests reach the stub completion server."""
+
+    mocker.patch.object(
+        NormalOpenaiAntiRecommender, "_agenerate_llm_response", AGENERATE_LLM_RESPONSE
+    )
+
+
+def _create_arkg_precomputer(
+    *, anti_recommender: NormalOpenaiAntiRecommender, settings: Settings, tmp_path: Path
+) -> ArkgPrecomputer:
+    """Return an ArkgPrecomputer that writes to tmp_path, and retries without waiting."""
+
+    return ArkgPrecomputer(
+        anti_recommender=anti_recommender,
+        arkg_base_iri=settings.arkg_base_iri,
+        output_file_path=tmp_path / "arkg.partial.nt",
+        checkpoint_file_path=tmp_path / "arkg.checkpoint",
+        max_concurrency=2,
+        retry_delay=0.0,
+    )
+
+
+# LangChain invokes completions on asyncio only.
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_run(
+    anti_recommendations: tuple[AntiRecommendation, ...],
+    settings: Settings,
+    tmp_path: Path,
+    user: User,
+    stub_completion_server: StubCompletionServer,
+) -> None:
+    """Test that ArkgPrecomputer.run() writes an ARKG that both ArkgIndex and ArkgAntiRecommender's SPARQL query can read."""
+
+    anti_recommender = NormalOpenaiAntiRecommender(
+        api_key=SecretStr("sk-stub"), base_url=stub_completion_server.base_url
+    )
+    arkg_precomputer = _create_arkg_precomputer(
+        anti_recommender=anti_recommender, settings=settings, tmp_path=tmp_path
+    )
+
+    precompute_result = await arkg_precomputer.run(record_keys=RECORD_KEYS)
+    arkg_precomputer.close()
+    await anti_recommender.aclose()
+
+    assert precompute_result.precomputed_count == len(RECORD_KEYS)
+    assert not precompute_result.failed_record_keys
+
+    export_arkg(
+        n_triples_file_path=tmp_path / "arkg.partial.nt",
+        output_file_path=tmp_path / "arkg.ttl",
+        mime_type=RdfMimeType.TURTLE,
+    )
+    store = ox.Store()
+    store.load(str(tmp_path / "arkg.ttl"), RdfMimeType.TURTLE.value)
+
+    assert (
+        ArkgIndex(store=store, language=LanguageAlpha2("en")).anti_recommendations(
+            record_key=RECORD_KEYS[0]
+        )
+        == anti_recommendations
+    )
+    assert sorted(
+        anti_recommendation.key
+        for anti_recommendation in ArkgAntiRecommender(
+            file_path=tmp_path / "arkg.ttl",
+            mime_type=RdfMimeType.TURTLE,
+            record_keys=RECORD_KEYS,
+            precompute_index=False,
+        ).generate_anti_recommendations(record_key=RECORD_KEYS[0], user=user)
+    ) == sorted(anti_recommendation.key for anti_recommendation in anti_recommendations)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_run_resumes_from_checkpoint(
+    settings: Settings, tmp_path: Path, stub_completion_server: StubCompletionServer
+) -> None:
+    """Test that ArkgPrecomputer.run() skips the Record keys that an earlier run finished."""
+
+    for record_keys in (RECORD_KEYS[:1], RECORD_KEYS):
+        anti_recommender = NormalOpenaiAntiRecommender(
+            api_key=SecretStr("sk-stub"), base_url=stub_completion_server.base_url
+        )
+        arkg_precomputer = _create_arkg_precomputer(
+            anti_recommender=anti_recommender,
+            settings=settings,
+            tmp_path=tmp_path,
+        )
+
+        precompute_result = await arkg_precomputer.run(record_keys=record_keys)
+        arkg_precomputer.close()
+        await anti_recommender.aclose()
+
+    assert precompute_result.skipped_count == 1
+    assert precompute_result.precomputed_count == 1
+    assert stub_completion_server.requests_count == len(RECORD_KEYS)
+
+
+def _no_anti_recommendations(**_: object) -> tuple[AntiRecommendation, ...]:
+    """Return the anti-recommendations of a response that has no line that parses as an anti-recommendation."""
+
+    return ()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "side_effect", [AntiRecommenderException, _no_anti_recommendations]
+)
+async def test_run_reports_failed_record_keys(
+    mocker: MockFixture,
+    openai_api_key: None,  # noqa: ARG001
+    settings: Settings,
+    side_effect: object,
+    tmp_path: Path,
+) -> None:
+    """Test that ArkgPrecomputer.run() retries a failing Record key, reports it, and records it as failed rather than finished in the checkpoint."""
+
+    anti_recommender = NormalOpenaiAntiRecommender()
+    agenerate_shared_anti_recommendations = mocker.patch.object(
+        anti_recommender,
+        "agenerate_shared_anti_recommendations",
+        side_effect=side_effect,
+    )
+    arkg_precomputer = _create_arkg_precomputer(
+        anti_recommender=anti_recommender, settings=settings, tmp_path=tmp_path
+    )
+
+    precompute_result = await arkg_precomputer.run(record_keys=RECORD_KEYS[:1])
+    arkg_precomputer.close()
+
+    assert precompute_result.failed_record_keys == RECORD_KEYS[:1]
+    assert agenerate_shared_anti_recommendations.await_count == 3  # noqa: PLR2004
+
+    checkpoint = PrecomputeCheckpoint(file_path=tmp_path / "arkg.checkpoint")
+    assert RECORD_KEYS[0] not in checkpoint
+    assert checkpoint.failed_record_keys == frozenset(RECORD_KEYS[:1])
+    checkpoint.close()
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from app.caches import SqliteCache
+
+
+def test_get(tmp_path: Path) -> None:
+    """Test that SqliteCache.get returns a cached value, even after the cache is reopened."""
+
+    sqlite_cache = SqliteCache(
+        database_path=tmp_path / "cache.sqlite", max_size=2, ttl=60.0
+    )
+    sqlite_cache.set("key", "value")
+    sqlite_cache.close()
+
+    reopened_sqlite_cache = SqliteCache(
+        database_path=tmp_path / "cache.sqlite", max_size=2, ttl=60.0
+    )
+
+    assert reopened_sqlite_cache.get("key") == "value"
+    assert reopened_sqlite_cache.get("missing key") is None
+
+
+def test_least_recently_used_entry_is_evicted(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """Test that a full SqliteCache evicts its least recently used entry."""
+
+    time = mocker.patch("app.caches.sqlite_cache.time.time", return_value=0.0)
+    sqlite_cache = SqliteCache(
+        database_path=tmp_path / "cache.sqlite", max_size=2, ttl=60.0
+    )
+
+    sqlite_cache.set("first key", "first value")
+    time.return_value = 1.0
+    sqlite_cache.set("second key", "second value")
+    time.return_value = 2.0
+    sqlite_cache.get("first key")
+    time.return_value = 3.0
+    sqlite_cache.set("third key", "third value")
+
+    assert sqlite_cache.get("second key") is None
+    assert sqlite_cache.get("first key") == "first value"
+    assert len(sqlite_cache) == 2  # noqa: PLR2004
+
+
+def test_expired_entry_is_not_returned(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Test that SqliteCache.get does not return a value whose time-to-live has passed."""
+
+    time = mocker.patch("app.caches.sqlite_cache.time.time", return_value=0.0)
+    sqlite_cache = SqliteCache(
+        database_path=tmp_path / "cache.sqlite", max_size=2, ttl=60.0
+    )
+    sqlite_cache.set("key", "value")
+    sqlite_cache.set("short-lived key", "short-lived value", ttl=1.0)
+
+    time.return_value = 30.0
+
+    assert sqlite_cache.get("short-lived key") is None
+    assert sqlite_cache.get("key") == "value"
@@ -0,0 +1,41 @@
+from pytest_mock import MockerFixture
+
+from app.caches import TtlCache
+
+
+def test_get() -> None:
+    """Test that TtlCache.get returns a cached value."""
+
+    ttl_cache: TtlCache[str, int] = TtlCache(max_size=2, ttl=60.0)
+    ttl_cache.set("key", 1)
+
+    assert ttl_cache.get("key") == 1
+    assert ttl_cache.get("missing key") is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """Test that a full TtlCache evicts its least recently used entry."""
+
+    ttl_cache: TtlCache[str, int] = TtlCache(max_size=2, ttl=60.0)
+    ttl_cache.set("first key", 1)
+    ttl_cache.set("second key", 2)
+    ttl_cache.get("first key")
+    ttl_cache.set("third key", 3)
+
+    assert ttl_cache.get("second key") is None
+    assert ttl_cache.get("first key") == 1
+    assert len(ttl_cache) == 2  # noqa: PLR2004
+
+
+def test_expired_entry_is_not_returned(mocker: MockerFixture) -> None:
+    """Test that TtlCache.get does not return a value whose time-to-live has passed."""
+
+    monotonic = mocker.patch("app.caches.ttl_cache.time.monotonic", return_value=0.0)
+    ttl_cache: TtlCache[str, int] = TtlCache(max_size=2, ttl=60.0)
+    ttl_cache.set("key", 1)
+    ttl_cache.set("short-lived key", 2, ttl=1.0)
+
+    monotonic.return_value = 30.0
+
+    assert ttl_cache.get("short-lived key") is None
+    assert ttl_cache.get("key") == 1
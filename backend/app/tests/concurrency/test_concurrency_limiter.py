@@ -0,0 +1,61 @@
+import anyio
+import pytest
+
+from app.concurrency import ConcurrencyLimiter, ConcurrencyLimitException
+
+MAX_CONCURRENCY = 2
+
+
+@pytest.mark.anyio
+async def test_limit() -> None:
+    """Test that ConcurrencyLimiter.limit lets no more than max_concurrency tasks run a block at the same time."""
+
+    concurrency_limiter = ConcurrencyLimiter(
+        max_concurrency=MAX_CONCURRENCY, max_waiting=10, wait_timeout=10.0
+    )
+    running_count = 0
+    max_running_count = 0
+
+    async def run() -> None:
+        nonlocal running_count, max_running_count
+
+        async with concurrency_limiter.limit():
+            running_count += 1
+            max_running_count = max(max_running_count, running_count)
+            await anyio.sleep(0.01)
+            running_count -= 1
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(MAX_CONCURRENCY * 3):
+            task_group.start_soon(run)
+
+    assert max_running_count == MAX_CONCURRENCY
+
+
+@pytest.mark.anyio
+async def test_limit_with_full_wait_queue() -> None:
+    """Test that ConcurrencyLimiter.limit rejects a task immediately when its wait queue is full."""
+
+    concurrency_limiter = ConcurrencyLimiter(
+        max_concurrency=1, max_waiting=0, wait_timeout=10.0
+    )
+
+    async with concurrency_limiter.limit():
+        with pytest.raises(ConcurrencyLimitException):
+            async with concurrency_limiter.limit():
+                pass
+
+
+@pytest.mark.anyio
+async def test_limit_with_wait_timeout() -> None:
+    """Test that ConcurrencyLimiter.limit rejects a task that waits longer than wait_timeout, and frees its place in the wait queue."""
+
+    concurrency_limiter = ConcurrencyLimiter(
+        max_concurrency=1, max_waiting=1, wait_timeout=0.01
+    )
+
+    async with concurrency_limiter.limit():
+        for _ in range(2):
+            with pytest.raises(ConcurrencyLimitException):
+                async with concurrency_limiter.limit():
+                    pass
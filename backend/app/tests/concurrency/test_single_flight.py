@@ -0,0 +1,56 @@
+import anyio
+import pytest
+
+from app.concurrency import SingleFlight
+
+CONCURRENT_CALLS_COUNT = 5
+
+
+@pytest.mark.anyio
+async def test_run() -> None:
+    """Test that concurrent SingleFlight.run calls with the same key share a single call."""
+
+    single_flight: SingleFlight[str, int] = SingleFlight()
+    calls_count = 0
+    results: list[int] = []
+
+    async def call() -> int:
+        nonlocal calls_count
+        calls_count += 1
+        await anyio.sleep(0.05)
+        return calls_count
+
+    async def run() -> None:
+        results.append(await single_flight.run("key", call))
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(CONCURRENT_CALLS_COUNT):
+            task_group.start_soon(run)
+
+    assert calls_count == 1
+    assert results == [1] * CONCURRENT_CALLS_COUNT
+    assert await single_flight.run("key", call) == 2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_run_shares_exception() -> None:
+    """Test that concurrent SingleFlight.run calls with the same key share the exception of a failed call."""
+
+    single_flight: SingleFlight[str, int] = SingleFlight()
+    exceptions: list[BaseException] = []
+
+    async def call() -> int:
+        await anyio.sleep(0.05)
+        raise ValueError
+
+    async def run() -> None:
+        try:
+            await single_flight.run("key", call)
+        except ValueError as exception:
+            exceptions.append(exception)
+
+    async with anyio.create_task_group() as task_group:
+        for _ in range(CONCURRENT_CALLS_COUNT):
+            task_group.start_soon(run)
+
+    assert len(exceptions) == CONCURRENT_CALLS_COUNT
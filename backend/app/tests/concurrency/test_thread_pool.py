@@ -0,0 +1,50 @@
+import threading
+import time
+
+import anyio
+import pytest
+
+from app.concurrency import configure_thread_pool, run_in_thread_pool
+from app.concurrency.thread_pool import DEFAULT_THREAD_POOL_MAX_WORKERS
+
+MAX_WORKERS = 2
+
+
+@pytest.mark.anyio
+async def test_run_in_thread_pool() -> None:
+    """Test that run_in_thread_pool runs a function on a worker thread, and returns its result."""
+
+    assert await run_in_thread_pool(threading.get_ident) != threading.get_ident()
+    assert await run_in_thread_pool(max, 1, 2, key=abs) == 2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_configure_thread_pool() -> None:
+    """Test that run_in_thread_pool runs no more than max_workers blocking calls at the same time."""
+
+    running_calls_count = 0
+    max_running_calls_count = 0
+    lock = threading.Lock()
+
+    def block() -> None:
+        nonlocal running_calls_count, max_running_calls_count
+
+        with lock:
+            running_calls_count += 1
+            max_running_calls_count = max(max_running_calls_count, running_calls_count)
+
+        time.sleep(0.05)
+
+        with lock:
+            running_calls_count -= 1
+
+    configure_thread_pool(max_workers=MAX_WORKERS)
+
+    try:
+        async with anyio.create_task_group() as task_group:
+            for _ in range(MAX_WORKERS * 3):
+                task_group.start_soon(run_in_thread_pool, block)
+    finally:
+        configure_thread_pool(max_workers=DEFAULT_THREAD_POOL_MAX_WORKERS)
+
+    assert max_running_calls_count == MAX_WORKERS
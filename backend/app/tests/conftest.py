@@ -1,13 +1,15 @@
 import datetime
+import json
 import os
 import uuid
-from collections.abc import AsyncIterator, Collection
+from collections.abc import AsyncIterator, Callable, Collection, Iterator
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
 import gotrue.types as gotrue
 import jwt
+import pyoxigraph as ox
 import pytest
 import pytest_asyncio
 from asgi_lifespan import LifespanManager
@@ -15,20 +17,30 @@ from fastapi import FastAPI, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from postgrest import APIResponse, SyncQueryRequestBuilder, SyncSelectRequestBuilder
 from pydantic import AnyUrl
+from pydantic_extra_types.language_code import LanguageAlpha2
 from pytest_mock import MockFixture
 from supabase import SupabaseAuthClient
 
-from app.anti_recommendation_engine import AntiRecommendationEngine
-from app.anti_recommenders.arkg import ArkgAntiRecommender
+from app.anti_recommendation_engine import (
+    AntiRecommendationEngine,
+    SessionEngineRegistry,
+)
+from app.anti_recommenders import AntiRecommender, create_anti_recommender
+from app.anti_recommenders.arkg import ArkgAntiRecommender, ArkgIndex
 from app.anti_recommenders.openai import NormalOpenaiAntiRecommender
 from app.auth.supabase import SupabaseAuthService
+from app.benchmarks.stub_completion_server import (
+    StubCompletionServer,
+    run_stub_completion_server,
+)
 from app.models import AntiRecommendation, AuthToken, Record, Settings, wikipedia
 from app.models.types import RdfMimeType, RecordKey
 from app.models.types import StrippedString as ModelResponse
 from app.readers import AllSourceReader
 from app.readers.reader import WikipediaReader
+from app.record_catalog import RecordCatalog, RecordCatalogReloader
 from app.routers import router
-from app.user import SupabaseUserService, User
+from app.user import SupabaseUserService, User, UserService
 
 
 @pytest.fixture(scope="session")
@@ -61,6 +73,50 @@ def wikipedia_output_file_path(test_data_directory_path: Path) -> Path:
     pytest.skip(reason="don't have Wikipedia output test file.")
 
 
+@pytest.fixture(scope="session")
+def write_wikipedia_output_file() -> Callable[..., None]:
+    """Return a function that writes a Wikipedia output file of records_count records, named Article_0, Article_1, and so on."""
+
+    def write_wikipedia_output_file(*, file_path: Path, records_count: int) -> None:
+        with file_path.open("w", encoding="utf-8") as output_file:
+            output_file.write(json.dumps({"type": "STATE", "value": {}}) + "\n")
+
+            for index in range(records_count):
+                title = f"Article_{index}"
+                output_file.write(
+                    json.dumps(
+                        {
+                            "type": "RECORD",
+                            "record": {
+                                "abstract_info": {
+                                    "title": title,
+                                    "abstract": f"The abstract of Article {index}.",
+                                    "url": f"https://en.wikipedia.org/wiki/{title}",
+                                },
+                                "categories": [
+                                    {
+                                        "text": f"Category {index % 100}",
+                                        "link": f"https://en.wikipedia.org/wiki/Category:Category_{index % 100}",
+                                    }
+                                ],
+                                "externallinks": [],
+                            },
+                        }
+                    )
+                    + "\n"
+                )
+
+    return write_wikipedia_output_file
+
+
+@pytest.fixture
+def stub_completion_server() -> Iterator[StubCompletionServer]:
+    """Yield a StubCompletionServer that runs on a background thread until the test ends."""
+
+    with run_stub_completion_server() as stub_completion_server:
+        yield stub_completion_server
+
+
 @pytest.fixture(scope="session")
 def arkg_file_path(test_data_directory_path: Path) -> Path:
     """Return the file path of a Wikipedia ARKG."""
@@ -271,6 +327,20 @@ def records_by_key(records: tuple[Record, ...]) -> dict[RecordKey, Record]:
     return _records_by_key
 
 
+@pytest.fixture(scope="session")
+def record_catalog(records: tuple[Record, ...]) -> RecordCatalog:
+    """Return a RecordCatalog."""
+
+    return RecordCatalog(records=records)
+
+
+@pytest.fixture(scope="session")
+def record_catalog_reloader(settings: Settings) -> RecordCatalogReloader:
+    """Return a RecordCatalogReloader of the output files in settings."""
+
+    return RecordCatalogReloader(settings=settings)
+
+
 @pytest.fixture(scope="session")
 def mime_type() -> RdfMimeType:
     """Return the MIME Type of a Wikipedia ARKG file."""
@@ -305,18 +375,56 @@ def user(supabase_user_service: SupabaseUserService) -> User:
     return supabase_user_service.create_user_from_id(user_id=uuid.uuid4())
 
 
+@pytest.fixture
+def stub_user(mocker: MockFixture) -> User:
+    """Return a User of a mock UserService that holds an empty anti-recommendations history, so that tests need no Supabase credentials."""
+
+    user_service = mocker.create_autospec(UserService, instance=True)
+    user_service.get_user_anti_recommendations_history.return_value = ()
+    user_service.aget_user_anti_recommendations_history.return_value = ()
+    user_service.get_user_last_seen_anti_recommendation.return_value = None
+    user_service.aget_user_last_seen_anti_recommendation.return_value = None
+
+    return User(id=uuid.uuid4(), _service=user_service)
+
+
+@pytest.fixture(scope="session")
+def anti_recommender(
+    settings: Settings, record_catalog: RecordCatalog
+) -> AntiRecommender:
+    """Return the AntiRecommender selected by settings."""
+
+    return create_anti_recommender(record_catalog=record_catalog, settings=settings)
+
+
 @pytest.fixture(scope="session")
 def anti_recommendation_engine(
-    settings: Settings,
-    session_mocker: MockFixture,
-    records: tuple[Record, ...],
+    anti_recommender: AntiRecommender,
+    record_catalog: RecordCatalog,
     user: User,
 ) -> AntiRecommendationEngine:
     """Return an AntiRecommendationEngine."""
 
-    session_mocker.patch.object(AllSourceReader, "read", return_value=records)
+    return AntiRecommendationEngine(
+        anti_recommender=anti_recommender, record_catalog=record_catalog, user=user
+    )
+
 
-    return AntiRecommendationEngine(user=user, settings=settings)
+@pytest.fixture(scope="session")
+def session_engine_registry(
+    anti_recommender: AntiRecommender,
+    record_catalog: RecordCatalog,
+    settings: Settings,
+    supabase_user_service: SupabaseUserService,
+) -> SessionEngineRegistry:
+    """Return a SessionEngineRegistry."""
+
+    return SessionEngineRegistry(
+        anti_recommender=anti_recommender,
+        record_catalog=record_catalog,
+        user_service=supabase_user_service,
+        settings=settings,
+    )
 
 
 @pytest.fixture(scope="session")
@@ -351,7 +459,6 @@ def arkg_anti_recommender(
     mime_type: RdfMimeType,
     mock_database_fetch: None,  # noqa: ARG001
     records_by_key: dict[RecordKey, Record],
-    user: User,
 ) -> ArkgAntiRecommender:
     """Return an ArkgAntiRecommender."""
 
@@ -359,10 +466,19 @@ def arkg_anti_recommender(
         file_path=arkg_file_path,
         mime_type=mime_type,
         record_keys=tuple(records_by_key.keys()),
-        user=user,
     )
 
 
+@pytest.fixture(scope="session")
+def arkg_index(arkg_file_path: Path, mime_type: RdfMimeType) -> ArkgIndex:
+    """Return an ArkgIndex of a Wikipedia ARKG."""
+
+    store = ox.Store()
+    store.load(input=arkg_file_path, mime_type=mime_type.value)
+
+    return ArkgIndex(store=store, language=LanguageAlpha2("en"))
+
+
 @pytest.fixture(scope="session")
 def form_data() -> OAuth2PasswordRequestForm:
     """Return an OAuth2 password flow form data."""
@@ -439,8 +555,10 @@ def auth_header(authentication_token: AuthToken) -> dict[str, str]:
 
 
 @pytest_asyncio.fixture(loop_scope="session")
-async def app(
-    anti_recommendation_engine: AntiRecommendationEngine,
+async def app(  # noqa: PLR0913
+    arkg_anti_recommender: ArkgAntiRecommender,
+    record_catalog_reloader: RecordCatalogReloader,
+    session_engine_registry: SessionEngineRegistry,
     settings: Settings,
     supabase_user_service: SupabaseUserService,
     supabase_auth_service: SupabaseAuthService,
@@ -449,8 +567,10 @@ async def app(
 
     @asynccontextmanager
     async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-        app.state.anti_recommendation_engine = anti_recommendation_engine
+        app.state.session_engine_registry = session_engine_registry
         app.state.auth_service = supabase_auth_service
+        app.state.arkg_anti_recommender = arkg_anti_recommender
+        app.state.record_catalog_reloader = record_catalog_reloader
         app.state.settings = settings
         app.state.user_service = supabase_user_service
         yield
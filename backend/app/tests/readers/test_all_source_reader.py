@@ -1,4 +1,4 @@
-from app.models import Record
+from app.models import Record, Settings
 from app.readers import AllSourceReader
 
 
@@ -8,3 +8,17 @@ def test_read(
     """Test that AllSourceReader.read yields the expected output type."""
 
     assert isinstance(next(iter(all_source_reader.read())), Record)
+
+
+def test_read_in_worker_processes(
+    all_source_reader: AllSourceReader, settings: Settings
+) -> None:
+    """Test that an AllSourceReader with worker processes yields the same Records, in the same order, as one that reads in process."""
+
+    assert list(
+        AllSourceReader(
+            settings=settings.model_copy(
+                update={"reader_chunk_size": 256, "reader_max_workers": 2}
+            )
+        ).read()
+    ) == list(all_source_reader.read())
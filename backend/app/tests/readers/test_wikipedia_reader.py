@@ -1,3 +1,11 @@
+import bz2
+import gzip
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
 from app.models import wikipedia
 from app.readers.reader import WikipediaReader
 
@@ -6,3 +14,94 @@ def test_read(wikipedia_reader: WikipediaReader) -> None:
     """Test that WikipediaReader.read yields the expected output type."""
 
     assert isinstance(next(iter(wikipedia_reader.read())), wikipedia.Article)
+
+
+def test_split(wikipedia_reader: WikipediaReader) -> None:
+    """Test that the byte ranges of WikipediaReader.split read the same Articles as the whole file, in order, whatever the chunk size."""
+
+    articles = list(wikipedia_reader.read())
+
+    for chunk_size in (1, 100, 1_000_000):
+        assert [
+            article
+            for chunk_reader in wikipedia_reader.split(chunk_size=chunk_size)
+            for article in chunk_reader.read()
+        ] == articles
+
+
+def test_read_transliterates_strings(tmp_path: Path) -> None:
+    """Test that WikipediaReader.read transliterates every non-ASCII string of a record, including quotes that are not valid in JSON once transliterated."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    file_path.write_text(
+        json.dumps(
+            {
+                "type": "RECORD",
+                "record": {
+                    "abstract_info": {
+                        "title": "Laplace's_démon",
+                        "abstract": "A “démon” that knows everything.",
+                        "url": "https://en.wikipedia.org/wiki/Laplace's_demon",
+                    },
+                    "categories": [{"text": "Déterminisme", "link": None}],
+                },
+            },
+            ensure_ascii=False,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+    article = next(iter(WikipediaReader(file_path=file_path).read()))
+
+    assert article.key == "Laplace's_demon"
+    assert article.abstract == 'A "demon" that knows everything.'
+    assert article.categories
+    assert article.categories[0].text == "Determinisme"
+
+
+@pytest.mark.parametrize(
+    ("compress", "file_name"),
+    [
+        (gzip.compress, "wikipedia.output.txt.gz"),
+        (bz2.compress, "wikipedia.output.txt.bz2"),
+        # The compression is detected from the magic bytes of a file without a known extension.
+        (gzip.compress, "wikipedia.output.txt"),
+    ],
+)
+def test_read_compressed(
+    wikipedia_reader: WikipediaReader,
+    wikipedia_output_file_path: Path,
+    tmp_path: Path,
+    compress: Callable[[bytes], bytes],
+    file_name: str,
+) -> None:
+    """Test that WikipediaReader reads a compressed file as a single byte range, with the same Articles and offsets as the uncompressed file."""
+
+    file_path = tmp_path / file_name
+    file_path.write_bytes(compress(wikipedia_output_file_path.read_bytes()))
+    compressed_wikipedia_reader = WikipediaReader(file_path=file_path)
+
+    assert compressed_wikipedia_reader.split(chunk_size=100) == (
+        compressed_wikipedia_reader,
+    )
+    assert list(compressed_wikipedia_reader.read()) == list(wikipedia_reader.read())
+    assert list(compressed_wikipedia_reader.read_record_offsets()) == list(
+        wikipedia_reader.read_record_offsets()
+    )
+
+
+def test_read_zstandard_compressed(
+    wikipedia_reader: WikipediaReader, wikipedia_output_file_path: Path, tmp_path: Path
+) -> None:
+    """Test that WikipediaReader reads a file compressed with Zstandard, if the zstandard package is installed."""
+
+    zstandard = pytest.importorskip("zstandard")
+    file_path = tmp_path / "wikipedia.output.txt.zst"
+    file_path.write_bytes(
+        zstandard.ZstdCompressor().compress(wikipedia_output_file_path.read_bytes())
+    )
+
+    assert list(WikipediaReader(file_path=file_path).read()) == list(
+        wikipedia_reader.read()
+    )
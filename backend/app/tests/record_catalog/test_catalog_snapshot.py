@@ -0,0 +1,71 @@
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+from app.readers.reader import WikipediaReader
+from app.record_catalog import CatalogSnapshot, RecordCatalog, compile_catalog_snapshot
+
+
+def test_catalog_snapshot(wikipedia_output_file_path: Path, tmp_path: Path) -> None:
+    """Test that a RecordCatalog of a CatalogSnapshot holds the same Records, in the same order, as the RecordCatalog it was compiled from."""
+
+    record_catalog = RecordCatalog(
+        records=WikipediaReader(file_path=wikipedia_output_file_path).read()
+    )
+    compile_catalog_snapshot(
+        records=record_catalog.values(),
+        source_file_paths=[wikipedia_output_file_path],
+        snapshot_file_path=tmp_path / "catalog.snapshot",
+    )
+
+    catalog_snapshot = CatalogSnapshot.open(
+        file_path=tmp_path / "catalog.snapshot",
+        source_file_paths=[wikipedia_output_file_path],
+        cache_max_size=1,
+    )
+    assert catalog_snapshot is not None
+
+    snapshot_record_catalog = RecordCatalog(records=catalog_snapshot)
+
+    assert list(snapshot_record_catalog) == list(record_catalog)
+    assert dict(snapshot_record_catalog) == dict(record_catalog)
+
+    catalog_snapshot.close()
+
+
+def test_open_stale_catalog_snapshot(
+    tmp_path: Path, write_wikipedia_output_file: Callable[..., None]
+) -> None:
+    """Test that CatalogSnapshot.open only opens a snapshot whose source files hold the contents they held when it was compiled."""
+
+    source_file_path = tmp_path / "wikipedia.output.txt"
+    snapshot_file_path = tmp_path / "catalog.snapshot"
+    write_wikipedia_output_file(file_path=source_file_path, records_count=2)
+    compile_catalog_snapshot(
+        records=WikipediaReader(file_path=source_file_path).read(),
+        source_file_paths=[source_file_path],
+        snapshot_file_path=snapshot_file_path,
+    )
+
+    def open_catalog_snapshot() -> CatalogSnapshot | None:
+        return CatalogSnapshot.open(
+            file_path=snapshot_file_path,
+            source_file_paths=[source_file_path],
+            cache_max_size=1,
+        )
+
+    # A source file that is modified without changing its contents still matches.
+    os.utime(source_file_path, ns=(0, 0))
+    assert open_catalog_snapshot() is not None
+
+    write_wikipedia_output_file(file_path=source_file_path, records_count=3)
+    assert open_catalog_snapshot() is None
+
+    assert (
+        CatalogSnapshot.open(
+            file_path=tmp_path / "missing.snapshot",
+            source_file_paths=[source_file_path],
+            cache_max_size=1,
+        )
+        is None
+    )
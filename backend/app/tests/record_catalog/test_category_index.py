@@ -0,0 +1,107 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from pytest_mock import MockFixture
+
+from app.models import wikipedia
+from app.readers.reader import WikipediaReader
+from app.record_catalog import (
+    CatalogSnapshot,
+    CategoryIndex,
+    LazyRecordStore,
+    RecordCatalog,
+    compile_catalog_snapshot,
+)
+
+RECORD_KEYS = tuple(f"Article_{index:03}" for index in range(100))
+
+
+def _category_index() -> CategoryIndex:
+    """Return a CategoryIndex where every Record is in "Broad", every tenth Record is in "Narrow", and only the first is in "Rare"."""
+
+    return CategoryIndex(
+        sorted_record_keys=RECORD_KEYS,
+        record_category_texts=(
+            [
+                "Broad",
+                *(["Narrow"] if index % 10 == 0 else []),
+                *(["Rare"] if index == 0 else []),
+            ]
+            for index in range(len(RECORD_KEYS))
+        ),
+    )
+
+
+def test_filter() -> None:
+    """Test that CategoryIndex.filter keeps the RecordKeys in any included category, and in no excluded category, for broad and narrow categories."""
+
+    category_index = _category_index()
+    record_keys = ("Article_000", "Article_010", "Article_011", "Missing")
+
+    assert category_index.filter(record_keys=record_keys) == record_keys[:3]
+    assert category_index.filter(
+        record_keys=record_keys, include_categories=("Narrow",)
+    ) == ("Article_000", "Article_010")
+    assert category_index.filter(
+        record_keys=record_keys,
+        include_categories=("Broad",),
+        exclude_categories=("Rare",),
+    ) == ("Article_010", "Article_011")
+    assert not category_index.filter(
+        record_keys=record_keys, include_categories=("Unknown",)
+    )
+
+
+def test_record_catalog_category_index(records: tuple[wikipedia.Article, ...]) -> None:
+    """Test that RecordCatalog.category_index indexes the Categories of every Record in the catalog."""
+
+    assert RecordCatalog(records=records).category_index.filter(
+        record_keys=[record.key for record in records],
+        include_categories=("Determinism",),
+    ) == (records[1].key,)
+
+
+def test_category_index_of_stored_records(
+    mocker: MockFixture,
+    tmp_path: Path,
+    write_wikipedia_output_file: Callable[..., None],
+) -> None:
+    """Test that the CategoryIndex of a LazyRecordStore or CatalogSnapshot is built from its stored category texts, without parsing any Record."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=150)
+    compile_catalog_snapshot(
+        records=WikipediaReader(file_path=file_path).read(),
+        source_file_paths=[file_path],
+        snapshot_file_path=tmp_path / "catalog.snapshot",
+    )
+
+    catalog_snapshot = CatalogSnapshot.open(
+        file_path=tmp_path / "catalog.snapshot",
+        source_file_paths=[file_path],
+        cache_max_size=1,
+    )
+    assert catalog_snapshot is not None
+    # The second LazyRecordStore reads the category texts from the sidecar index that the first one wrote.
+    record_stores = [
+        catalog_snapshot,
+        *(
+            LazyRecordStore(
+                file_paths=[file_path],
+                cache_max_size=1,
+                index_directory_path=tmp_path / "index",
+            )
+            for _ in range(2)
+        ),
+    ]
+    parse_json_line = mocker.spy(WikipediaReader, "parse_json_line")
+    model_validate_json = mocker.spy(wikipedia.Article, "model_validate_json")
+
+    for record_store in record_stores:
+        assert RecordCatalog(records=record_store).category_index.filter(
+            record_keys=("Article_0", "Article_1", "Article_100"),
+            include_categories=("Category 0",),
+        ) == ("Article_0", "Article_100")
+
+    parse_json_line.assert_not_called()
+    model_validate_json.assert_not_called()
@@ -0,0 +1,51 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from app.models import wikipedia
+from app.readers.reader import WikipediaReader
+from app.record_catalog import CategoryRegistry, CompactRecordStore
+
+
+def test_register() -> None:
+    """Test that a CategoryRegistry assigns consecutive IDs to distinct Categories, and the same ID to equal Categories."""
+
+    category_registry = CategoryRegistry()
+    physicists = wikipedia.Category(text="Physicists", link="Category:Physicists")
+    inventors = wikipedia.Category(text="Inventors", link="Category:Inventors")
+
+    assert category_registry.register_all(
+        categories=[physicists, inventors, physicists]
+    ).tolist() == [0, 1, 0]
+    assert len(category_registry) == 2  # noqa: PLR2004
+    assert category_registry[1] == inventors
+    assert category_registry.category_id(category=physicists) == 0
+    assert (
+        category_registry.category_id(category=wikipedia.Category(text="Chemists"))
+        is None
+    )
+
+
+def test_share_categories(
+    tmp_path: Path, write_wikipedia_output_file: Callable[..., None]
+) -> None:
+    """Test that the Articles of a CompactRecordStore share the Categories of its CategoryRegistry."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=101)
+    compact_record_store = CompactRecordStore(
+        records=WikipediaReader(file_path=file_path).read(), cache_max_size=2
+    )
+
+    first_article = compact_record_store["Article_0"]
+    last_article = compact_record_store["Article_100"]
+    assert isinstance(first_article, wikipedia.Article)
+    assert isinstance(last_article, wikipedia.Article)
+    assert first_article.categories
+    assert last_article.categories
+
+    assert first_article.categories[0] is last_article.categories[0]
+    assert compact_record_store.category_ids(
+        record_key="Article_0"
+    ) == compact_record_store.category_registry.register_all(
+        categories=first_article.categories
+    )
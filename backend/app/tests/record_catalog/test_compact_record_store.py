@@ -0,0 +1,82 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+from app.models import Record
+from app.readers.reader import WikipediaReader
+from app.record_catalog import CompactRecordStore, RecordCatalog
+
+
+def test_compact_record_store(records: tuple[Record, ...]) -> None:
+    """Test that a RecordCatalog of a CompactRecordStore holds the same Records, in the same order, as a RecordCatalog of the Records."""
+
+    record_catalog = RecordCatalog(records=records)
+    compact_record_catalog = RecordCatalog(
+        records=CompactRecordStore(records=records, cache_max_size=1)
+    )
+
+    assert list(compact_record_catalog) == list(record_catalog)
+    assert dict(compact_record_catalog) == dict(record_catalog)
+
+
+def test_share_categories(
+    tmp_path: Path, write_wikipedia_output_file: Callable[..., None]
+) -> None:
+    """Test that a CompactRecordStore builds Articles equal to the original ones, when Articles share Categories."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=201)
+    articles = list(WikipediaReader(file_path=file_path).read())
+
+    compact_record_store = CompactRecordStore(records=articles, cache_max_size=1)
+
+    assert list(compact_record_store.values()) == articles
+
+
+def test_share_external_links(tmp_path: Path) -> None:
+    """Test that a CompactRecordStore shares the pooled links of the externallinks field of Articles, and does not hold their abstract_info twice."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    file_path.write_text(
+        "".join(
+            json.dumps(
+                {
+                    "type": "RECORD",
+                    "record": {
+                        "abstract_info": {
+                            "title": title,
+                            "abstract": f"The abstract of {title}.",
+                            "url": f"https://en.wikipedia.org/wiki/{title}",
+                        },
+                        "externallinks": [
+                            {"title": "X", "link": "https://en.wikipedia.org/wiki/X"}
+                        ],
+                    },
+                }
+            )
+            + "\n"
+            for title in ("Article_0", "Article_1")
+        ),
+        encoding="utf-8",
+    )
+    articles = list(WikipediaReader(file_path=file_path).read())
+
+    compact_record_store = CompactRecordStore(records=articles, cache_max_size=1)
+    compact_articles = list(
+        compact_record_store._CompactRecordStore__records_by_key.values()  # type: ignore[attr-defined] # noqa: SLF001
+    )
+
+    assert (
+        compact_articles[0].extra_external_links
+        is compact_articles[1].extra_external_links
+    )
+    assert compact_articles[0].extra is None
+    assert list(compact_record_store.values()) == articles
+    assert compact_record_store["Article_0"].model_extra == {
+        "abstract_info": {
+            "title": "Article_0",
+            "abstract": "The abstract of Article_0.",
+            "url": "https://en.wikipedia.org/wiki/Article_0",
+        },
+        "externallinks": [{"title": "X", "link": "https://en.wikipedia.org/wiki/X"}],
+    }
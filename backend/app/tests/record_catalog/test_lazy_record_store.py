@@ -0,0 +1,100 @@
+import gzip
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from app.readers.reader import WikipediaReader
+from app.record_catalog import LazyRecordStore, RecordCatalog
+
+
+def test_lazy_record_store(wikipedia_output_file_path: Path) -> None:
+    """Test that a RecordCatalog of a LazyRecordStore holds the same Records, in the same order, as a RecordCatalog of every Record read."""
+
+    record_catalog = RecordCatalog(
+        records=WikipediaReader(file_path=wikipedia_output_file_path).read()
+    )
+    lazy_record_catalog = RecordCatalog(
+        records=LazyRecordStore(
+            file_paths=[wikipedia_output_file_path], cache_max_size=2
+        )
+    )
+
+    assert list(lazy_record_catalog) == list(record_catalog)
+    assert lazy_record_catalog.first_record_key == record_catalog.first_record_key
+    assert dict(lazy_record_catalog) == dict(record_catalog)
+
+
+def test_get_cached_record(
+    tmp_path: Path, write_wikipedia_output_file: Callable[..., None]
+) -> None:
+    """Test that a LazyRecordStore returns a recently used Record without parsing it again, and a later duplicate RecordKey replaces an earlier one."""
+
+    file_paths = [tmp_path / "first.output.txt", tmp_path / "second.output.txt"]
+    write_wikipedia_output_file(file_path=file_paths[0], records_count=3)
+    write_wikipedia_output_file(file_path=file_paths[1], records_count=1)
+
+    lazy_record_store = LazyRecordStore(file_paths=file_paths, cache_max_size=2)
+
+    assert list(lazy_record_store) == ["Article_0", "Article_1", "Article_2"]
+    assert lazy_record_store["Article_1"] is lazy_record_store["Article_1"]
+    assert "Article_3" not in lazy_record_store
+    assert lazy_record_store["Article_0"] == next(
+        iter(WikipediaReader(file_path=file_paths[1]).read())
+    )
+
+
+def test_reuse_index(
+    mocker: MockFixture,
+    tmp_path: Path,
+    write_wikipedia_output_file: Callable[..., None],
+) -> None:
+    """Test that a LazyRecordStore reads record offsets from its sidecar index, unless the output file changed after the index was written."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=3)
+    index_directory_path = tmp_path / "index"
+
+    LazyRecordStore(
+        file_paths=[file_path],
+        cache_max_size=1,
+        index_directory_path=index_directory_path,
+    )
+    read_record_offsets = mocker.spy(WikipediaReader, "read_record_offsets")
+
+    assert (
+        len(
+            LazyRecordStore(
+                file_paths=[file_path],
+                cache_max_size=1,
+                index_directory_path=index_directory_path,
+            )
+        )
+        == 3  # noqa: PLR2004
+    )
+    read_record_offsets.assert_not_called()
+
+    write_wikipedia_output_file(file_path=file_path, records_count=4)
+
+    assert (
+        len(
+            LazyRecordStore(
+                file_paths=[file_path],
+                cache_max_size=1,
+                index_directory_path=index_directory_path,
+            )
+        )
+        == 4  # noqa: PLR2004
+    )
+    read_record_offsets.assert_called_once()
+
+
+def test_compressed_file(wikipedia_output_file_path: Path, tmp_path: Path) -> None:
+    """Test that LazyRecordStore refuses a compressed output file, which can't be memory mapped."""
+
+    file_path = tmp_path / "wikipedia.output.txt.gz"
+    file_path.write_bytes(gzip.compress(wikipedia_output_file_path.read_bytes()))
+
+    with pytest.raises(ValueError, match="compressed"):
+        LazyRecordStore(file_paths=(file_path,), cache_max_size=10)
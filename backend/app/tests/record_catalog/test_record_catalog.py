@@ -0,0 +1,26 @@
+from app.models import Record
+from app.record_catalog import RecordCatalog
+
+
+def test_get_record(record_catalog: RecordCatalog, records: tuple[Record, ...]) -> None:
+    """Test that a RecordCatalog returns the Record that matches a record key."""
+
+    assert record_catalog[records[0].key] == records[0]
+
+
+def test_first_record_key(
+    record_catalog: RecordCatalog, records: tuple[Record, ...]
+) -> None:
+    """Test that RecordCatalog.first_record_key is the key of the first Record read into the catalog."""
+
+    assert record_catalog.first_record_key == records[0].key
+
+
+def test_sorted_record_keys(
+    record_catalog: RecordCatalog, records: tuple[Record, ...]
+) -> None:
+    """Test that RecordCatalog.sorted_record_keys contains every record key in sorted order."""
+
+    assert record_catalog.sorted_record_keys == tuple(
+        sorted(record.key for record in records)
+    )
@@ -0,0 +1,145 @@
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from app.models import Settings
+from app.record_catalog import RecordCatalog, RecordCatalogReloader
+from app.record_catalog import record_catalog_reloader as record_catalog_reloader_module
+
+
+def _settings(*, settings: Settings, file_path: Path, **update: object) -> Settings:
+    return settings.model_copy(
+        update={
+            "catalog_reload_interval": None,
+            "catalog_snapshot_file_path": None,
+            "output_file_paths": frozenset([file_path]),
+            "reader_max_workers": 1,
+            "record_store_lazy": False,
+            **update,
+        }
+    )
+
+
+def test_reload_appended_lines(
+    mocker: MockFixture,
+    settings: Settings,
+    tmp_path: Path,
+    write_wikipedia_output_file: Callable[..., None],
+) -> None:
+    """Test that RecordCatalogReloader only reads the lines appended to an output file, and swaps in a new version without changing the previous one."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=10)
+    reloaded_record_catalogs: list[RecordCatalog] = []
+    record_catalog_reloader = RecordCatalogReloader(
+        settings=_settings(settings=settings, file_path=file_path)
+    )
+    record_catalog_reloader.start(on_reload=reloaded_record_catalogs.append)
+    record_catalog = record_catalog_reloader.record_catalog
+
+    assert record_catalog_reloader.reload() is None
+
+    create_record_catalog = mocker.spy(
+        record_catalog_reloader_module, "create_record_catalog"
+    )
+    # The first 10 records are written again as they were, so the last 5 are appended to them.
+    write_wikipedia_output_file(file_path=file_path, records_count=15)
+    reloaded_record_catalog = record_catalog_reloader.reload()
+
+    create_record_catalog.assert_not_called()
+    assert reloaded_record_catalogs == [reloaded_record_catalog]
+    assert record_catalog_reloader.record_catalog is reloaded_record_catalog
+    assert record_catalog_reloader.version == 2  # noqa: PLR2004
+    assert len(record_catalog) == 10  # noqa: PLR2004
+    assert reloaded_record_catalog is not None
+    assert list(reloaded_record_catalog) == [f"Article_{index}" for index in range(15)]
+    assert reloaded_record_catalog["Article_0"] is record_catalog["Article_0"]
+
+
+def test_reload_rewritten_file(
+    mocker: MockFixture,
+    settings: Settings,
+    tmp_path: Path,
+    write_wikipedia_output_file: Callable[..., None],
+) -> None:
+    """Test that RecordCatalogReloader reads the whole catalog again when an output file is rewritten."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=10)
+    record_catalog_reloader = RecordCatalogReloader(
+        settings=_settings(settings=settings, file_path=file_path)
+    )
+
+    create_record_catalog = mocker.spy(
+        record_catalog_reloader_module, "create_record_catalog"
+    )
+    write_wikipedia_output_file(file_path=file_path, records_count=4)
+    reloaded_record_catalog = record_catalog_reloader.reload()
+
+    create_record_catalog.assert_called_once()
+    assert reloaded_record_catalog is not None
+    assert len(reloaded_record_catalog) == 4  # noqa: PLR2004
+
+
+def test_reload_compact_record_catalog(
+    settings: Settings, tmp_path: Path, write_wikipedia_output_file: Callable[..., None]
+) -> None:
+    """Test that RecordCatalogReloader extends a compact RecordCatalog with appended lines, and that its Records match a catalog read from scratch."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=10)
+    compact_settings = _settings(
+        settings=settings, file_path=file_path, record_store_compact=True
+    )
+    record_catalog_reloader = RecordCatalogReloader(settings=compact_settings)
+
+    write_wikipedia_output_file(file_path=file_path, records_count=15)
+    reloaded_record_catalog = record_catalog_reloader.reload()
+
+    assert reloaded_record_catalog is not None
+    assert dict(reloaded_record_catalog) == dict(
+        RecordCatalogReloader(settings=compact_settings).record_catalog
+    )
+
+
+def test_reload_periodically_after_failure(
+    caplog: pytest.LogCaptureFixture,
+    settings: Settings,
+    tmp_path: Path,
+    write_wikipedia_output_file: Callable[..., None],
+) -> None:
+    """Test that the background thread of a RecordCatalogReloader logs a reload that fails, and keeps reloading."""
+
+    file_path = tmp_path / "wikipedia.output.txt"
+    write_wikipedia_output_file(file_path=file_path, records_count=10)
+    reloaded_record_catalogs: list[RecordCatalog] = []
+    failed, reloaded = threading.Event(), threading.Event()
+
+    def on_reload(record_catalog: RecordCatalog) -> None:
+        reloaded_record_catalogs.append(record_catalog)
+
+        if not failed.is_set():
+            failed.set()
+            message = "on_reload failed"
+            raise RuntimeError(message)
+
+        reloaded.set()
+
+    record_catalog_reloader = RecordCatalogReloader(
+        settings=_settings(
+            settings=settings, file_path=file_path, catalog_reload_interval=0.01
+        )
+    )
+    record_catalog_reloader.start(on_reload=on_reload)
+
+    write_wikipedia_output_file(file_path=file_path, records_count=15)
+    assert failed.wait(timeout=5)
+    write_wikipedia_output_file(file_path=file_path, records_count=20)
+    assert reloaded.wait(timeout=5)
+    record_catalog_reloader.close()
+
+    assert len(reloaded_record_catalogs[-1]) == 20  # noqa: PLR2004
+    assert "Reloading the record catalog failed" in caplog.text
@@ -1,12 +1,18 @@
+import json
+
 import gotrue.types as gotrue
 import pytest
 from fastapi import FastAPI, status
 from fastapi.security import OAuth2PasswordRequestForm
 from httpx import ASGITransport, AsyncClient
+from pydantic import SecretStr
 from pytest_mock import MockFixture
 from supabase import SupabaseAuthClient
 
+from app.auth.supabase import SupabaseAuthService
+from app.models import AuthToken, Settings
 from app.models.types import RecordKey
+from app.record_catalog import RecordCatalogReloader
 
 
 @pytest.mark.anyio(loop_scope="session")
@@ -99,6 +105,30 @@ async def test_sign_out(app: FastAPI) -> None:
     assert response.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.anyio(loop_scope="session")
+async def test_sign_out_revokes_access_token(
+    app: FastAPI, authentication_token: AuthToken, mocker: MockFixture
+) -> None:
+    """
+    Test that the /sign_out endpoint revokes the bearer access token.
+    """
+
+    revoke = mocker.patch.object(SupabaseAuthService, "revoke")
+    access_token = authentication_token.access_token.get_secret_value()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test.nerdswipe.com"
+    ) as client:
+        response = await client.get(
+            url="/api/v1/sign_out", headers={"Authorization": f"Bearer {access_token}"}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    revoke.assert_called_once_with(
+        authentication_token=AuthToken(access_token=SecretStr(access_token))
+    )
+
+
 @pytest.mark.anyio(loop_scope="session")
 async def test_next_records(
     app: FastAPI,
@@ -121,6 +151,55 @@ async def test_next_records(
     assert response.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.anyio(loop_scope="session")
+async def test_next_records_with_category_filters(
+    app: FastAPI,
+    auth_header: dict[str, str],
+    mock_get_user: None,  # noqa: ARG001
+    record_key: RecordKey,
+) -> None:
+    """Test that the /next_records endpoint only returns Records that pass its category filters."""
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test.nerdswipe.com"
+    ) as client:
+        response = await client.get(
+            url=f"/api/v1/next_records/{record_key}",
+            params={
+                "include_categories": ["Determinism", "1452 births"],
+                "exclude_categories": ["Leonardo da Vinci"],
+            },
+            headers=auth_header,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [record["key"] for record in response.json()] == ["Laplace's_demon"]
+
+
+@pytest.mark.anyio(loop_scope="session")
+async def test_stream_next_records(
+    app: FastAPI,
+    auth_header: dict[str, str],
+    mock_get_user: None,  # noqa: ARG001
+    record_key: RecordKey,
+) -> None:
+    """
+    Test the streaming variant of the /next_records endpoint.
+    """
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test.nerdswipe.com"
+    ) as client:
+        response = await client.get(
+            url=f"/api/v1/next_records/{record_key}/stream",
+            headers=auth_header,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert all(json.loads(line)["key"] for line in response.text.splitlines())
+
+
 @pytest.mark.anyio(loop_scope="session")
 async def test_previous_records(
     app: FastAPI,
@@ -155,3 +234,74 @@ async def test_initial_records(
         response = await client.get(url="/api/v1/initial_records", headers=auth_header)
 
     assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio(loop_scope="session")
+async def test_reload_catalog(
+    app: FastAPI,
+    monkeypatch: pytest.MonkeyPatch,
+    record_catalog_reloader: RecordCatalogReloader,
+    settings: Settings,
+) -> None:
+    """Test that the /admin/reload_catalog endpoint is only available with the admin token, and keeps the catalog when the output files have not changed."""
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test.nerdswipe.com"
+    ) as client:
+        assert (
+            await client.post(url="/api/v1/admin/reload_catalog")
+        ).status_code == status.HTTP_404_NOT_FOUND
+
+        monkeypatch.setattr(settings, "admin_token", SecretStr("admin-token"))
+
+        assert (
+            await client.post(
+                url="/api/v1/admin/reload_catalog",
+                headers={"X-Admin-Token": "wrong-token"},
+            )
+        ).status_code == status.HTTP_403_FORBIDDEN
+
+        response = await client.post(
+            url="/api/v1/admin/reload_catalog",
+            headers={"X-Admin-Token": "admin-token"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "records_count": len(record_catalog_reloader.record_catalog),
+        "reloaded": False,
+        "version": 1,
+    }
+
+
+@pytest.mark.anyio(loop_scope="session")
+async def test_reload_arkg(
+    app: FastAPI, monkeypatch: pytest.MonkeyPatch, settings: Settings
+) -> None:
+    """Test that the /admin/reload_arkg endpoint swaps in a new version of the ARKG, whose metrics the /admin/arkg_reload_metrics endpoint returns."""
+
+    monkeypatch.setattr(settings, "admin_token", SecretStr("admin-token"))
+    headers = {"X-Admin-Token": "admin-token"}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test.nerdswipe.com"
+    ) as client:
+        assert (
+            await client.post(
+                url="/api/v1/admin/reload_arkg",
+                params={"delta_file_name": "../wikipedia_arkg_file.ttl"},
+                headers=headers,
+            )
+        ).status_code == status.HTTP_400_BAD_REQUEST
+
+        reload_response = await client.post(
+            url="/api/v1/admin/reload_arkg", headers=headers
+        )
+        metrics_response = await client.get(
+            url="/api/v1/admin/arkg_reload_metrics", headers=headers
+        )
+
+    assert reload_response.status_code == status.HTTP_200_OK
+    assert metrics_response.status_code == status.HTTP_200_OK
+    assert metrics_response.json()["version"] == reload_response.json()["version"]
+    assert metrics_response.json()["previous_version_released"]
@@ -0,0 +1,304 @@
+import threading
+import uuid
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.models import AntiRecommendationsSelector, Settings
+from app.models.types import RecordKey, UserId
+from app.user import UserService, UserServiceException, WriteBehindUserService
+
+
+@pytest.fixture
+def user_id() -> UserId:
+    """Return a random User ID."""
+
+    return uuid.uuid4()
+
+
+@pytest.fixture
+def backing_user_service(mocker: MockerFixture, record_key: RecordKey) -> MagicMock:
+    """Return a mock UserService that holds a one-key anti-recommendations history for every User."""
+
+    backing_user_service = mocker.create_autospec(UserService, instance=True)
+    backing_user_service.get_user_anti_recommendations_history.return_value = (
+        record_key,
+    )
+    backing_user_service.aget_user_anti_recommendations_history.return_value = (
+        record_key,
+    )
+
+    return backing_user_service
+
+
+@pytest.fixture
+def write_behind_user_service(
+    backing_user_service: MagicMock, settings: Settings
+) -> Iterator[WriteBehindUserService]:
+    """Yield a WriteBehindUserService that only flushes when it is asked to."""
+
+    write_behind_settings = settings.model_copy(
+        update={
+            "user_history_flush_interval": 3600.0,
+            "user_history_flush_threshold": 1000,
+        }
+    )
+    write_behind_user_service = WriteBehindUserService(
+        user_service=backing_user_service, settings=write_behind_settings
+    )
+
+    yield write_behind_user_service
+
+    write_behind_user_service.close()
+
+
+def test_add_to_user_anti_recommendations_history(
+    write_behind_user_service: WriteBehindUserService,
+    backing_user_service: MagicMock,
+    record_key: RecordKey,
+    user_id: UserId,
+) -> None:
+    """Test that anti-recommendations are appended in process, without writing to the underlying UserService."""
+
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Laplace's_demon"
+    )
+
+    assert write_behind_user_service.get_user_anti_recommendations_history(
+        user_id=user_id
+    ) == (record_key, "Leonardo_da_Vinci", "Laplace's_demon")
+    assert (
+        write_behind_user_service.get_user_last_seen_anti_recommendation(
+            user_id=user_id
+        )
+        == "Laplace's_demon"
+    )
+    backing_user_service.get_user_anti_recommendations_history.assert_called_once()
+    backing_user_service.update_user_anti_recommendations_histories.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_aadd_to_user_anti_recommendations_history(
+    write_behind_user_service: WriteBehindUserService,
+    backing_user_service: MagicMock,
+    record_key: RecordKey,
+    user_id: UserId,
+) -> None:
+    """Test that anti-recommendations are appended in process by the async counterparts, and histories are loaded with the underlying UserService's async counterpart."""
+
+    await write_behind_user_service.aadd_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+
+    assert await write_behind_user_service.aget_user_anti_recommendations_history(
+        user_id=user_id
+    ) == (record_key, "Leonardo_da_Vinci")
+    assert (
+        await write_behind_user_service.aget_user_last_seen_anti_recommendation(
+            user_id=user_id
+        )
+        == "Leonardo_da_Vinci"
+    )
+    backing_user_service.aget_user_anti_recommendations_history.assert_awaited_once()
+    backing_user_service.get_user_anti_recommendations_history.assert_not_called()
+
+
+def test_flush(
+    write_behind_user_service: WriteBehindUserService,
+    backing_user_service: MagicMock,
+    record_key: RecordKey,
+    user_id: UserId,
+) -> None:
+    """Test that WriteBehindUserService.flush writes coalesced histories to the underlying UserService in one batch."""
+
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Laplace's_demon"
+    )
+    write_behind_user_service.remove_anti_recommendations_from_user_history(
+        user_id=user_id, selector=AntiRecommendationsSelector.LAST_TWO_RECORDS
+    )
+
+    write_behind_user_service.flush()
+    write_behind_user_service.flush()
+
+    backing_user_service.update_user_anti_recommendations_histories.assert_called_once_with(
+        anti_recommendations_histories={user_id: (record_key,)}
+    )
+
+
+@pytest.mark.parametrize("exception_type", [UserServiceException, ConnectionError])
+def test_flush_failure_is_retried(
+    write_behind_user_service: WriteBehindUserService,
+    backing_user_service: MagicMock,
+    exception_type: type[BaseException],
+    user_id: UserId,
+) -> None:
+    """Test that a history which could not be written is written by the next flush, whatever the underlying UserService raised."""
+
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+
+    backing_user_service.update_user_anti_recommendations_histories.side_effect = (
+        exception_type
+    )
+    with pytest.raises(exception_type):
+        write_behind_user_service.flush()
+
+    backing_user_service.update_user_anti_recommendations_histories.side_effect = None
+    write_behind_user_service.flush()
+
+    assert (
+        user_id
+        in backing_user_service.update_user_anti_recommendations_histories.call_args.kwargs[
+            "anti_recommendations_histories"
+        ]
+    )
+
+
+def test_close(
+    backing_user_service: MagicMock,
+    settings: Settings,
+    user_id: UserId,
+) -> None:
+    """Test that closing a WriteBehindUserService writes every changed history."""
+
+    write_behind_user_service = WriteBehindUserService(
+        user_service=backing_user_service, settings=settings
+    )
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+
+    write_behind_user_service.close()
+
+    backing_user_service.update_user_anti_recommendations_histories.assert_called()
+
+
+def test_periodic_flush_survives_unexpected_errors(
+    backing_user_service: MagicMock,
+    settings: Settings,
+    user_id: UserId,
+) -> None:
+    """Test that the background flush thread keeps running after an unexpected error, and that closing still writes the history it could not write."""
+
+    flushed = threading.Event()
+
+    def fail_once(**_: object) -> None:
+        backing_user_service.update_user_anti_recommendations_histories.side_effect = (
+            None
+        )
+        flushed.set()
+        raise ConnectionError
+
+    backing_user_service.update_user_anti_recommendations_histories.side_effect = (
+        fail_once
+    )
+    write_behind_user_service = WriteBehindUserService(
+        user_service=backing_user_service,
+        settings=settings.model_copy(update={"user_history_flush_interval": 0.01}),
+    )
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+
+    assert flushed.wait(timeout=5)
+    write_behind_user_service.close()
+
+    assert (
+        user_id
+        in backing_user_service.update_user_anti_recommendations_histories.call_args.kwargs[
+            "anti_recommendations_histories"
+        ]
+    )
+
+
+def test_failed_flush_keeps_unwritten_changes_count(
+    backing_user_service: MagicMock,
+    settings: Settings,
+    user_id: UserId,
+) -> None:
+    """Test that the changes of a flush that failed still count towards the threshold of the next flush."""
+
+    flushed = threading.Event()
+    write_behind_user_service = WriteBehindUserService(
+        user_service=backing_user_service,
+        settings=settings.model_copy(
+            update={
+                "user_history_flush_interval": 3600.0,
+                "user_history_flush_threshold": 2,
+            }
+        ),
+    )
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+
+    backing_user_service.update_user_anti_recommendations_histories.side_effect = (
+        ConnectionError
+    )
+    with pytest.raises(ConnectionError):
+        write_behind_user_service.flush()
+
+    backing_user_service.update_user_anti_recommendations_histories.side_effect = (
+        lambda **_: flushed.set()
+    )
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Alan_Turing"
+    )
+
+    assert flushed.wait(timeout=5)
+    write_behind_user_service.close()
+
+
+def test_released_history_is_loaded_again(
+    write_behind_user_service: WriteBehindUserService,
+    backing_user_service: MagicMock,
+    mocker: MockerFixture,
+    record_key: RecordKey,
+    user_id: UserId,
+) -> None:
+    """Test that a history released by end_user_session right after it was loaded is loaded again, without holding the lock of the in-process state."""
+
+    lock = write_behind_user_service._WriteBehindUserService__lock  # type: ignore[attr-defined] # noqa: SLF001
+    load_anti_recommendations_history = write_behind_user_service._WriteBehindUserService__load_anti_recommendations_history  # type: ignore[attr-defined] # noqa: SLF001
+    loads_count = 0
+
+    def load_and_release(*, user_id: UserId) -> None:
+        nonlocal loads_count
+        loads_count += 1
+        load_anti_recommendations_history(user_id=user_id)
+        if loads_count == 1:
+            write_behind_user_service.end_user_session(user_id=user_id)
+
+    def get_unlocked_anti_recommendations_history(
+        **_: object,
+    ) -> tuple[RecordKey, ...]:
+        assert not lock.locked()
+        return (record_key,)
+
+    backing_user_service.get_user_anti_recommendations_history.side_effect = (
+        get_unlocked_anti_recommendations_history
+    )
+    mocker.patch.object(
+        write_behind_user_service,
+        "_WriteBehindUserService__load_anti_recommendations_history",
+        load_and_release,
+    )
+
+    write_behind_user_service.add_to_user_anti_recommendations_history(
+        user_id=user_id, anti_recommendation_key="Leonardo_da_Vinci"
+    )
+
+    assert loads_count == 2  # noqa: PLR2004
+    assert write_behind_user_service.get_user_anti_recommendations_history(
+        user_id=user_id
+    ) == (record_key, "Leonardo_da_Vinci")
@@ -3,3 +3,6 @@ from .user_service import UserService as UserService
 from .user import User as User
 from .user_service_exception import UserServiceException as UserServiceException
 from .supabase.supabase_user_service import SupabaseUserService as SupabaseUserService
+from .write_behind_user_service import (
+    WriteBehindUserService as WriteBehindUserService,
+)
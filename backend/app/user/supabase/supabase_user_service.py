@@ -1,5 +1,7 @@
+from collections.abc import Mapping
 from typing import override
 
+import httpx
 import supabase
 from postgrest import APIError, APIResponse
 from supabase import Client
@@ -78,11 +80,13 @@ class SupabaseUserService(UserService):
             .execute()
         )
 
+    @override
     def create_user_from_id(self, *, user_id: UserId) -> User:
         """Return a new User, with an ID that matches user_id."""
 
         return User(id=user_id, _service=self)
 
+    @override
     def create_user_from_token(self, *, authentication_token: AuthToken) -> User:
         """Return a new User with an ID retrieved from a Supabase AuthService."""
 
@@ -117,7 +121,7 @@ class SupabaseUserService(UserService):
                 },
                 constraint=str(user_id),
             )
-        except APIError as exception:
+        except (APIError, httpx.HTTPError) as exception:
             raise UserServiceException from exception
 
     @override
@@ -132,7 +136,7 @@ class SupabaseUserService(UserService):
                 columns="anti_recommendations_history",
                 eq={"column": "user_id", "value": str(user_id)},
             )
-        except APIError as exception:
+        except (APIError, httpx.HTTPError) as exception:
             raise UserServiceException from exception
 
         return tuple(database_service_result.data[0]["anti_recommendations_history"])
@@ -152,6 +156,34 @@ class SupabaseUserService(UserService):
 
         return None
 
+    @override
+    def update_user_anti_recommendations_histories(
+        self,
+        *,
+        anti_recommendations_histories: Mapping[UserId, tuple[RecordKey, ...]],
+    ) -> None:
+        """Replace the anti-recommendation histories of several Users with a single UPSERT query."""
+
+        if not anti_recommendations_histories:
+            return
+
+        try:
+            self.__upsert_into_database(
+                table_name=ARKG_ANTI_RECOMMENDER_USER_STATE_TABLE_NAME,
+                json=tuple(
+                    {
+                        "user_id": str(user_id),
+                        "anti_recommendations_history": list(
+                            anti_recommendations_history
+                        ),
+                    }
+                    for user_id, anti_recommendations_history in anti_recommendations_histories.items()
+                ),
+                constraint="user_id",
+            )
+        except (APIError, httpx.HTTPError) as exception:
+            raise UserServiceException from exception
+
     @override
     def remove_anti_recommendations_from_user_history(
         self,
@@ -179,5 +211,5 @@ class SupabaseUserService(UserService):
                 constraint=str(user_id),
             )
 
-        except APIError as exception:
+        except (APIError, httpx.HTTPError) as exception:
             raise UserServiceException from exception
@@ -47,3 +47,35 @@ class User:
         self._service.remove_anti_recommendations_from_user_history(
             user_id=self.id, selector=selector
         )
+
+    async def aget_anti_recommendations_history(self) -> tuple[RecordKey, ...]:
+        """Return the anti-recommendations history of a User, without blocking the event loop."""
+
+        return await self._service.aget_user_anti_recommendations_history(
+            user_id=self.id
+        )
+
+    async def aget_last_seen_anti_recommendation_key(self) -> RecordKey | None:
+        """Return the last anti-recommendation that was seen by a User, without blocking the event loop."""
+
+        return await self._service.aget_user_last_seen_anti_recommendation(
+            user_id=self.id
+        )
+
+    async def aadd_anti_recommendation_to_history(
+        self, *, anti_recommendation_key: RecordKey
+    ) -> None:
+        """Add anti_recommendation_key to a User's history, without blocking the event loop."""
+
+        await self._service.aadd_to_user_anti_recommendations_history(
+            user_id=self.id, anti_recommendation_key=anti_recommendation_key
+        )
+
+    async def aremove_anti_recommendations_from_history(
+        self, *, selector: AntiRecommendationsSelector
+    ) -> None:
+        """Remove anti-recommendations from a User's history, without blocking the event loop."""
+
+        await self._service.aremove_anti_recommendations_from_user_history(
+            user_id=self.id, selector=selector
+        )
@@ -1,11 +1,31 @@
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
 
+from app.concurrency import run_in_thread_pool
+from app.models import AuthToken
 from app.models.anti_recommendations_selector import AntiRecommendationsSelector
 from app.models.types import RecordKey, UserId
 
+if TYPE_CHECKING:
+    from app.user import User
+
 
 class UserService(ABC):
-    """An interface to manage the state of a User."""
+    """
+    An interface to manage the state of a User.
+
+    Methods that are called while handling a request have an async counterpart that does not block the event loop.
+    By default, an async counterpart runs its synchronous method on the bounded thread pool.
+    """
+
+    @abstractmethod
+    def create_user_from_id(self, *, user_id: UserId) -> "User":
+        pass
+
+    @abstractmethod
+    def create_user_from_token(self, *, authentication_token: AuthToken) -> "User":
+        pass
 
     @abstractmethod
     def add_to_user_anti_recommendations_history(
@@ -25,6 +45,14 @@ class UserService(ABC):
     ) -> RecordKey | None:
         pass
 
+    @abstractmethod
+    def update_user_anti_recommendations_histories(
+        self,
+        *,
+        anti_recommendations_histories: Mapping[UserId, tuple[RecordKey, ...]],
+    ) -> None:
+        pass
+
     @abstractmethod
     def remove_anti_recommendations_from_user_history(
         self,
@@ -33,3 +61,51 @@ class UserService(ABC):
         selector: AntiRecommendationsSelector,
     ) -> None:
         pass
+
+    def end_user_session(self, *, user_id: UserId) -> None:  # noqa: B027
+        """Release any state that is held for the session of a User. Nothing is held by default."""
+
+    async def acreate_user_from_token(
+        self, *, authentication_token: AuthToken
+    ) -> "User":
+        return await run_in_thread_pool(
+            self.create_user_from_token, authentication_token=authentication_token
+        )
+
+    async def aadd_to_user_anti_recommendations_history(
+        self, *, user_id: UserId, anti_recommendation_key: RecordKey
+    ) -> None:
+        await run_in_thread_pool(
+            self.add_to_user_anti_recommendations_history,
+            user_id=user_id,
+            anti_recommendation_key=anti_recommendation_key,
+        )
+
+    async def aget_user_anti_recommendations_history(
+        self, *, user_id: UserId
+    ) -> tuple[RecordKey, ...]:
+        return await run_in_thread_pool(
+            self.get_user_anti_recommendations_history, user_id=user_id
+        )
+
+    async def aget_user_last_seen_anti_recommendation(
+        self, *, user_id: UserId
+    ) -> RecordKey | None:
+        return await run_in_thread_pool(
+            self.get_user_last_seen_anti_recommendation, user_id=user_id
+        )
+
+    async def aremove_anti_recommendations_from_user_history(
+        self,
+        *,
+        user_id: UserId,
+        selector: AntiRecommendationsSelector,
+    ) -> None:
+        await run_in_thread_pool(
+            self.remove_anti_recommendations_from_user_history,
+            user_id=user_id,
+            selector=selector,
+        )
+
+    async def aend_user_session(self, *, user_id: UserId) -> None:
+        await run_in_thread_pool(self.end_user_session, user_id=user_id)
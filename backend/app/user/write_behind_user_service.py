@@ -0,0 +1,401 @@
+import functools
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from typing import TypeVar, override
+
+from app.models import AntiRecommendationsSelector, AuthToken, Settings
+from app.models.types import RecordKey, UserId
+from app.user import User, UserService, UserServiceException
+
+T = TypeVar("T")
+
+
+class WriteBehindUserService(UserService):
+    """
+    A concrete implementation of UserService.
+
+    A WriteBehindUserService keeps the anti-recommendations history of each User in process,
+    and writes changed histories back to another UserService in batches.
+
+    Changed histories are written back:
+        - Every user_history_flush_interval seconds, on a background thread.
+        - On the background thread, as soon as user_history_flush_threshold changes are waiting to be written.
+        - When a User's session ends.
+        - When the WriteBehindUserService is closed.
+    """
+
+    def __init__(self, *, user_service: UserService, settings: Settings) -> None:
+        self.__user_service = user_service
+        self.__flush_interval = settings.user_history_flush_interval
+        self.__flush_threshold = settings.user_history_flush_threshold
+
+        self.__anti_recommendations_histories: dict[UserId, list[RecordKey]] = {}
+        self.__changed_user_ids: set[UserId] = set()
+        self.__unwritten_changes_count = 0
+
+        # __lock guards the in-process state, __flush_lock keeps flushes in order.
+        self.__lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+
+        self.__closed = threading.Event()
+        self.__flush_requested = threading.Event()
+        self.__flush_thread = threading.Thread(
+            target=self.__flush_periodically,
+            name="write-behind-user-service",
+            daemon=True,
+        )
+        self.__flush_thread.start()
+
+    def __flush_periodically(self) -> None:
+        """Flush changed histories every __flush_interval seconds, or when a flush is requested."""
+
+        while not self.__closed.is_set():
+            self.__flush_requested.wait(timeout=self.__flush_interval)
+            self.__flush_requested.clear()
+
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001, S112
+                # Histories that could not be written are retried on the next flush, whatever failed, so the thread must keep running.
+                continue
+
+    def __load_anti_recommendations_history(self, *, user_id: UserId) -> None:
+        """Read the anti-recommendations history of a User from the underlying UserService, the first time the User is seen."""
+
+        with self.__lock:
+            if user_id in self.__anti_recommendations_histories:
+                return
+
+        # The underlying UserService is called without holding __lock, so that other Users are not blocked.
+        self.__store_anti_recommendations_history(
+            user_id=user_id,
+            anti_recommendations_history=self.__user_service.get_user_anti_recommendations_history(
+                user_id=user_id
+            ),
+        )
+
+    async def __aload_anti_recommendations_history(self, *, user_id: UserId) -> None:
+        """Read the anti-recommendations history of a User from the underlying UserService without blocking the event loop, the first time the User is seen."""
+
+        with self.__lock:
+            if user_id in self.__anti_recommendations_histories:
+                return
+
+        self.__store_anti_recommendations_history(
+            user_id=user_id,
+            anti_recommendations_history=await self.__user_service.aget_user_anti_recommendations_history(
+                user_id=user_id
+            ),
+        )
+
+    def __store_anti_recommendations_history(
+        self, *, user_id: UserId, anti_recommendations_history: tuple[RecordKey, ...]
+    ) -> None:
+        """Keep a loaded anti-recommendations history in process, unless another call has loaded it first."""
+
+        with self.__lock:
+            self.__anti_recommendations_histories.setdefault(
+                user_id, list(anti_recommendations_history)
+            )
+
+    def __with_anti_recommendations_history(
+        self, *, user_id: UserId, operation: Callable[[list[RecordKey]], T]
+    ) -> T:
+        """
+        Load the anti-recommendations history of a User, and apply operation to it while holding __lock.
+
+        A history that was released by end_user_session after it was loaded is loaded again, without holding __lock.
+        """
+
+        while True:
+            self.__load_anti_recommendations_history(user_id=user_id)
+
+            with self.__lock:
+                anti_recommendations_history = (
+                    self.__anti_recommendations_histories.get(user_id)
+                )
+                if anti_recommendations_history is not None:
+                    return operation(anti_recommendations_history)
+
+    async def __awith_anti_recommendations_history(
+        self, *, user_id: UserId, operation: Callable[[list[RecordKey]], T]
+    ) -> T:
+        """Load the anti-recommendations history of a User without blocking the event loop, and apply operation to it while holding __lock."""
+
+        while True:
+            await self.__aload_anti_recommendations_history(user_id=user_id)
+
+            with self.__lock:
+                anti_recommendations_history = (
+                    self.__anti_recommendations_histories.get(user_id)
+                )
+                if anti_recommendations_history is not None:
+                    return operation(anti_recommendations_history)
+
+    def __record_change(self, *, user_id: UserId) -> None:
+        """
+        Mark the history of a User as changed, and request a flush if enough changes are waiting to be written.
+
+        Callers must hold __lock.
+        """
+
+        self.__changed_user_ids.add(user_id)
+        self.__unwritten_changes_count += 1
+
+        if self.__unwritten_changes_count >= self.__flush_threshold:
+            self.__flush_requested.set()
+
+    def __append_to_anti_recommendations_history(
+        self,
+        anti_recommendations_history: list[RecordKey],
+        *,
+        user_id: UserId,
+        anti_recommendation_key: RecordKey,
+    ) -> None:
+        """
+        Append anti_recommendation_key to a User's in-process anti-recommendation history.
+
+        Callers must hold __lock.
+        """
+
+        anti_recommendations_history.append(anti_recommendation_key)
+        self.__record_change(user_id=user_id)
+
+    @staticmethod
+    def __last_seen_anti_recommendation(
+        anti_recommendations_history: list[RecordKey],
+    ) -> RecordKey | None:
+        """Return the last Record key in a User's in-process anti-recommendation history."""
+
+        return (
+            anti_recommendations_history[-1] if anti_recommendations_history else None
+        )
+
+    def __remove_from_anti_recommendations_history(
+        self,
+        anti_recommendations_history: list[RecordKey],
+        *,
+        user_id: UserId,
+        selector: AntiRecommendationsSelector,
+    ) -> None:
+        """
+        Use selector to remove anti-recommendations from a User's in-process history.
+
+        Callers must hold __lock.
+        """
+
+        match selector:
+            case AntiRecommendationsSelector.LAST_TWO_RECORDS:
+                del anti_recommendations_history[-2:]
+            case _:
+                raise UserServiceException from ValueError
+
+        self.__record_change(user_id=user_id)
+
+    @override
+    def create_user_from_id(self, *, user_id: UserId) -> User:
+        """Return a new User, with an ID that matches user_id."""
+
+        return User(id=user_id, _service=self)
+
+    @override
+    def create_user_from_token(self, *, authentication_token: AuthToken) -> User:
+        """Return a new User with an ID retrieved from the underlying UserService."""
+
+        return self.create_user_from_id(
+            user_id=self.__user_service.create_user_from_token(
+                authentication_token=authentication_token
+            ).id
+        )
+
+    @override
+    async def acreate_user_from_token(self, *, authentication_token: AuthToken) -> User:
+        """Return a new User with an ID retrieved from the underlying UserService, without blocking the event loop."""
+
+        user = await self.__user_service.acreate_user_from_token(
+            authentication_token=authentication_token
+        )
+
+        return self.create_user_from_id(user_id=user.id)
+
+    @override
+    def add_to_user_anti_recommendations_history(
+        self, *, user_id: UserId, anti_recommendation_key: RecordKey
+    ) -> None:
+        """Append anti_recommendation_key to a User's in-process anti-recommendation history."""
+
+        self.__with_anti_recommendations_history(
+            user_id=user_id,
+            operation=functools.partial(
+                self.__append_to_anti_recommendations_history,
+                user_id=user_id,
+                anti_recommendation_key=anti_recommendation_key,
+            ),
+        )
+
+    @override
+    async def aadd_to_user_anti_recommendations_history(
+        self, *, user_id: UserId, anti_recommendation_key: RecordKey
+    ) -> None:
+        """Append anti_recommendation_key to a User's in-process anti-recommendation history, without blocking the event loop."""
+
+        await self.__awith_anti_recommendations_history(
+            user_id=user_id,
+            operation=functools.partial(
+                self.__append_to_anti_recommendations_history,
+                user_id=user_id,
+                anti_recommendation_key=anti_recommendation_key,
+            ),
+        )
+
+    @override
+    def get_user_anti_recommendations_history(
+        self, *, user_id: UserId
+    ) -> tuple[RecordKey, ...]:
+        """Return a tuple containing Record keys in a User's in-process anti-recommendation history."""
+
+        return self.__with_anti_recommendations_history(
+            user_id=user_id, operation=tuple
+        )
+
+    @override
+    async def aget_user_anti_recommendations_history(
+        self, *, user_id: UserId
+    ) -> tuple[RecordKey, ...]:
+        """Return a tuple containing Record keys in a User's in-process anti-recommendation history, without blocking the event loop."""
+
+        return await self.__awith_anti_recommendations_history(
+            user_id=user_id, operation=tuple
+        )
+
+    @override
+    def get_user_last_seen_anti_recommendation(
+        self, *, user_id: UserId
+    ) -> RecordKey | None:
+        """Return the last Record key in a User's in-process anti-recommendation history."""
+
+        return self.__with_anti_recommendations_history(
+            user_id=user_id, operation=self.__last_seen_anti_recommendation
+        )
+
+    @override
+    async def aget_user_last_seen_anti_recommendation(
+        self, *, user_id: UserId
+    ) -> RecordKey | None:
+        """Return the last Record key in a User's in-process anti-recommendation history, without blocking the event loop."""
+
+        return await self.__awith_anti_recommendations_history(
+            user_id=user_id, operation=self.__last_seen_anti_recommendation
+        )
+
+    @override
+    def update_user_anti_recommendations_histories(
+        self,
+        *,
+        anti_recommendations_histories: Mapping[UserId, tuple[RecordKey, ...]],
+    ) -> None:
+        """Replace the in-process anti-recommendation histories of several Users."""
+
+        with self.__lock:
+            for (
+                user_id,
+                anti_recommendations_history,
+            ) in anti_recommendations_histories.items():
+                self.__anti_recommendations_histories[user_id] = list(
+                    anti_recommendations_history
+                )
+                self.__record_change(user_id=user_id)
+
+    @override
+    def remove_anti_recommendations_from_user_history(
+        self,
+        *,
+        user_id: UserId,
+        selector: AntiRecommendationsSelector,
+    ) -> None:
+        """Use selector to remove anti-recommendations from a User's in-process history."""
+
+        self.__with_anti_recommendations_history(
+            user_id=user_id,
+            operation=functools.partial(
+                self.__remove_from_anti_recommendations_history,
+                user_id=user_id,
+                selector=selector,
+            ),
+        )
+
+    @override
+    async def aremove_anti_recommendations_from_user_history(
+        self,
+        *,
+        user_id: UserId,
+        selector: AntiRecommendationsSelector,
+    ) -> None:
+        """Use selector to remove anti-recommendations from a User's in-process history, without blocking the event loop."""
+
+        await self.__awith_anti_recommendations_history(
+            user_id=user_id,
+            operation=functools.partial(
+                self.__remove_from_anti_recommendations_history,
+                user_id=user_id,
+                selector=selector,
+            ),
+        )
+
+    def flush(self, *, user_ids: Iterable[UserId] | None = None) -> None:
+        """
+        Write changed anti-recommendation histories back to the underlying UserService in a single batch.
+
+        Only the histories of user_ids are written if user_ids is given.
+
+        Histories that cannot be written remain marked as changed, and the exception of the underlying UserService is raised.
+        """
+
+        with self.__flush_lock:
+            with self.__lock:
+                flushed_user_ids = (
+                    self.__changed_user_ids.intersection(user_ids)
+                    if user_ids is not None
+                    else set(self.__changed_user_ids)
+                )
+                changed_anti_recommendations_histories = {
+                    user_id: tuple(self.__anti_recommendations_histories[user_id])
+                    for user_id in flushed_user_ids
+                }
+                self.__changed_user_ids -= flushed_user_ids
+
+                if not self.__changed_user_ids:
+                    self.__unwritten_changes_count = 0
+
+            if not changed_anti_recommendations_histories:
+                return
+
+            try:
+                self.__user_service.update_user_anti_recommendations_histories(
+                    anti_recommendations_histories=changed_anti_recommendations_histories
+                )
+            except BaseException:
+                with self.__lock:
+                    self.__changed_user_ids |= flushed_user_ids
+                    # The reset count is restored, so that a later change still triggers a threshold flush.
+                    self.__unwritten_changes_count += len(flushed_user_ids)
+                raise
+
+    @override
+    def end_user_session(self, *, user_id: UserId) -> None:
+        """Write back the history of a User whose session has ended, and release its in-process copy."""
+
+        self.flush(user_ids=(user_id,))
+
+        with self.__lock:
+            if user_id not in self.__changed_user_ids:
+                self.__anti_recommendations_histories.pop(user_id, None)
+
+    def close(self) -> None:
+        """Stop the background flush thread, and write back every changed history."""
+
+        self.__closed.set()
+        self.__flush_requested.set()
+        self.__flush_thread.join()
+
+        self.flush()